@@ -1,4 +1,5 @@
-from flask import Flask
+import hmac
+from flask import Flask, request
 from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
@@ -22,20 +23,84 @@ def create_app():
     from routes.food import food_bp
     from routes.user import user_bp
     from routes.analytics import analytics_bp
+    from routes.sync import sync_bp
     
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(food_bp, url_prefix='/api/food')
     app.register_blueprint(user_bp, url_prefix='/api/user')
     app.register_blueprint(analytics_bp, url_prefix='/api/analytics')
+    app.register_blueprint(sync_bp, url_prefix='/api/sync')
     
-    # Create tables
+    # Create tables and add columns and indexes missing from older databases
+    from utils.schema import ensure_columns, ensure_indexes
     with app.app_context():
         db.create_all()
+        ensure_columns(db, backfill={
+            'food_log.updated_at': 'COALESCE(created_at, consumed_at)',
+            'image_analysis.last_accessed_at': 'created_at'
+        })
+        ensure_indexes(db)
+    
+    # Backfill daily nutrition summaries for databases that predate them
+    from services.rollup_service import backfill_rollups
+    with app.app_context():
+        backfill_rollups()
+    
+    # Full-text search over custom foods
+    from services.search_index import custom_food_index
+    custom_food_index.init_app(app)
+    
+    # Load the reference nutrition index (imports the bundled dataset on first run)
+    from services.nutrition_service import nutrition_index
+    nutrition_index.init_app(app)
+    
+    # Analytics response cache
+    from services.response_cache import response_cache
+    response_cache.init_app(app)
+    
+    # Per-request latency, SQL, OpenAI and image timings
+    from services.metrics_service import metrics
+    metrics.init_app(app)
+    
+    # Log slow SQL statements with their query plans
+    from services.slow_query_log import slow_query_log
+    slow_query_log.init_app(app)
+    
+    # Configure the shared OpenAI client
+    from services.openai_client import openai_client
+    openai_client.init_app(app)
+    
+    # Start background analysis workers; serving processes also pick up unfinished jobs
+    from services.job_service import job_runner
+    job_runner.init_app(app)
+    if app.config.get('JOB_RESUME_ON_START', False):
+        job_runner.resume_pending()
+    
+    # Register CLI commands
+    from cli import register_commands
+    register_commands(app)
     
     @app.route('/api/health')
     def health_check():
         return {'status': 'healthy', 'message': 'Calorie Detection API is running'}
     
+    @app.route('/api/health/openai')
+    def openai_health():
+        stats = openai_client.stats()
+        status = 'degraded' if stats['circuit_breaker']['state'] != 'closed' else 'healthy'
+        return {'status': status, 'openai': stats}
+    
+    @app.route('/api/metrics')
+    def prometheus_metrics():
+        # Per-route traffic and OpenAI failure counts are not public: scrapers send METRICS_TOKEN
+        token = app.config.get('METRICS_TOKEN')
+        if not metrics.enabled or not token:
+            return {'error': 'Metrics are disabled'}, 404
+        supplied = request.headers.get('Authorization', '').encode('utf-8')
+        if not hmac.compare_digest(supplied, f'Bearer {token}'.encode('utf-8')):
+            return {'error': 'Invalid metrics token'}, 401
+        return app.response_class(metrics.render(), mimetype='text/plain; version=0.0.4')
+    
     return app
 
 if __name__ == '__main__':
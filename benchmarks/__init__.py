@@ -0,0 +1,4 @@
+"""
+Performance benchmarks for the Calorie Detection API.
+Each module can be run directly, e.g. python -m benchmarks.custom_food_search
+"""
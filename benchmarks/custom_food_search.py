@@ -0,0 +1,85 @@
+"""
+Compare custom food search through the FTS5 index against the ILIKE scan.
+
+Usage: python -m benchmarks.custom_food_search --foods 100000 --runs 20
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+WORDS = [
+    'chicken', 'beef', 'salad', 'protein', 'bar', 'shake', 'greek', 'yogurt', 'oat',
+    'granola', 'almond', 'butter', 'rice', 'bowl', 'spicy', 'tofu', 'wrap', 'pasta',
+    'tomato', 'soup', 'berry', 'smoothie', 'vanilla', 'chocolate', 'cookie', 'bagel'
+]
+BRANDS = ['Acme', 'FitFoods', 'GreenFarm', 'Homemade', 'QuickMeal', None]
+CATEGORIES = ['Snacks', 'Dairy', 'Meals', 'Beverages', 'Baked Goods']
+QUERIES = ['chicken', 'greek yog', 'protein bar', 'acme', 'choc cookie', 'snacks']
+
+def seed(db, CustomFood, foods, users):
+    """Insert synthetic custom foods in one bulk statement"""
+    random.seed(42)
+    rows = [{
+        'user_id': random.randint(1, users),
+        'name': ' '.join(random.sample(WORDS, 3)).title(),
+        'brand': random.choice(BRANDS),
+        'category': random.choice(CATEGORIES),
+        'calories_per_100g': random.uniform(20, 600)
+    } for _ in range(foods)]
+    db.session.execute(db.insert(CustomFood), rows)
+    db.session.commit()
+
+def time_query(build_query, runs):
+    timings = []
+    count = 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        count = len(build_query().limit(50).all())
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), count
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--foods', type=int, default=50000)
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='calorie-bench-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ.setdefault('REFERENCE_FOODS_AUTO_IMPORT', 'false')
+
+    from app import create_app, db
+    from models.custom_food import CustomFood
+    from services.search_index import custom_food_index
+
+    app = create_app()
+    with app.app_context():
+        seed(db, CustomFood, args.foods, args.users)
+
+        if not custom_food_index.enabled:
+            print("FTS5 is not available in this SQLite build; nothing to compare")
+            return
+
+        print(f"{args.foods} custom foods across {args.users} users, median of {args.runs} runs")
+        print(f"{'query':<14}{'ilike ms':>10}{'fts ms':>10}{'speedup':>10}{'rows':>12}")
+
+        for search_text in QUERIES:
+            user_query = lambda: CustomFood.query.filter_by(user_id=1)
+
+            # The pre-index implementation: unindexable leading-wildcard scan
+            ilike_ms, ilike_rows = time_query(
+                lambda: user_query().filter(CustomFood.name.ilike(f'%{search_text}%')), args.runs
+            )
+            fts_ms, fts_rows = time_query(
+                lambda: custom_food_index.filter(user_query(), search_text, 1, ranked=True), args.runs
+            )
+
+            speedup = ilike_ms / fts_ms if fts_ms else float('inf')
+            print(f"{search_text:<14}{ilike_ms:>10.2f}{fts_ms:>10.2f}{speedup:>9.1f}x{ilike_rows:>6}/{fts_rows:<5}")
+
+if __name__ == '__main__':
+    main()
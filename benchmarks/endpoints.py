@@ -0,0 +1,243 @@
+"""
+Time the analytics, food and user endpoints through the Flask test client
+against a seeded database, counting SQL queries per request. Results are
+written as JSON and can be compared with an earlier run.
+
+Usage: python -m benchmarks.endpoints --logs 100000 --runs 20 --output benchmarks/results/latest.json
+       python -m benchmarks.endpoints --logs 100000 --baseline benchmarks/results/baseline.json
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+
+DEFAULT_OUTPUT = os.path.join('benchmarks', 'results', 'latest.json')
+
+def endpoint_cases(today):
+    """
+    (name, method, path or path(run), request kwargs or kwargs(run)).
+    Callables get the run number so AI lookups and writes don't repeat.
+    """
+    day = today.isoformat()
+    return [
+        # Analytics
+        ('analytics.daily', 'GET', f'/api/analytics/daily/{day}', None),
+        ('analytics.weekly', 'GET', '/api/analytics/weekly', None),
+        ('analytics.monthly', 'GET', '/api/analytics/monthly', None),
+        ('analytics.summary', 'GET', '/api/analytics/summary', None),
+        ('analytics.progress_30', 'GET', '/api/analytics/progress?period=30', None),
+        ('analytics.progress_365', 'GET', '/api/analytics/progress?period=365', None),
+        # Food
+        ('food.logs', 'GET', '/api/food/logs?limit=50', None),
+        ('food.logs_day', 'GET', f'/api/food/logs?date={day}', None),
+        ('food.logs_count', 'GET', '/api/food/logs?limit=50&count=true', None),
+        ('food.export_ndjson', 'GET', '/api/food/logs/export?format=ndjson', None),
+        ('food.search_cached', 'GET', '/api/food/search?q=granola%20bowl', None),
+        ('food.search_ai', 'GET', lambda run: f'/api/food/search?q=bench%20dish%20{run}&refresh=true', None),
+        ('food.search_batch', 'POST', '/api/food/search-batch',
+            lambda run: {'json': {'items': [{'name': f'batch dish {run} {index}'} for index in range(5)]}}),
+        ('food.analyze_recipe', 'POST', '/api/food/analyze-recipe',
+            lambda run: {'json': {'recipe_text': f'benchmark pancakes {run}', 'servings': 4}}),
+        ('food.analyze_image', 'POST', '/api/food/analyze-image',
+            lambda run: {'data': {'image_base64': sample_image_base64(), 'refresh': 'true'}}),
+        ('food.log', 'POST', '/api/food/log',
+            lambda run: {'json': {'food_name': 'Bench Snack', 'calories': 120 + run, 'serving_size': 50}}),
+        ('food.log_batch', 'POST', '/api/food/log/batch',
+            lambda run: {'json': {'entries': [
+                {'food_name': f'Bench Item {index}', 'calories': 80 + index, 'serving_size': 40}
+                for index in range(20)
+            ]}}),
+        # User
+        ('user.profile', 'GET', '/api/user/profile', None),
+        ('user.custom_foods', 'GET', '/api/user/custom-foods?limit=50', None),
+        ('user.custom_foods_search', 'GET', '/api/user/custom-foods?search=chicken', None),
+        ('user.preferences', 'GET', '/api/user/preferences', None),
+        # Sync
+        ('sync.full', 'GET', '/api/sync', None)
+    ]
+
+_image_base64 = None
+
+def sample_image_base64():
+    """A small JPEG, built once"""
+    global _image_base64
+    if _image_base64 is None:
+        import base64
+        from PIL import Image
+        image = Image.new('RGB', (640, 480), (200, 120, 60))
+        buffer = io.BytesIO()
+        image.save(buffer, format='JPEG', quality=85)
+        _image_base64 = base64.b64encode(buffer.getvalue()).decode('ascii')
+    return _image_base64
+
+class QueryCounter:
+    """Counts statements executed on an engine"""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+        self.count = 0
+        event.listen(engine, 'before_cursor_execute', self._increment)
+
+    def _increment(self, *args):
+        self.count += 1
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))
+    return ordered[index]
+
+def run_case(client, headers, counter, case, runs, warmup):
+    name, method, path, kwargs = case
+    timings = []
+    queries = []
+    response_bytes = 0
+    status = None
+
+    for run in range(warmup + runs):
+        url = path(run) if callable(path) else path
+        options = kwargs(run) if callable(kwargs) else dict(kwargs or {})
+
+        queries_before = counter.count
+        start = time.perf_counter()
+        response = client.open(url, method=method, headers=headers, **options)
+        body = response.get_data()  # drains streamed responses
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        status = response.status_code
+        if run >= warmup:
+            timings.append(elapsed_ms)
+            queries.append(counter.count - queries_before)
+            response_bytes = len(body)
+
+    return {
+        'status': status,
+        'runs': runs,
+        'median_ms': round(statistics.median(timings), 3),
+        'p95_ms': round(percentile(timings, 0.95), 3),
+        'min_ms': round(min(timings), 3),
+        'max_ms': round(max(timings), 3),
+        'queries': round(statistics.median(queries), 1),
+        'bytes': response_bytes
+    }
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline, threshold, min_delta_ms):
+    """
+    Print per-endpoint change against a baseline; returns names that got
+    slower by more than threshold (and min_delta_ms) or ran more queries.
+    """
+    regressions = []
+    print(f"\n{'endpoint':<28}{'baseline':>10}{'current':>10}{'change':>9}{'queries':>12}")
+    for name, current in results['results'].items():
+        previous = baseline.get('results', {}).get(name)
+        if previous is None:
+            print(f"{name:<28}{'-':>10}{current['median_ms']:>10.2f}{'new':>9}")
+            continue
+
+        delta_ms = current['median_ms'] - previous['median_ms']
+        change = delta_ms / previous['median_ms'] if previous['median_ms'] else 0
+        queries = f"{previous['queries']:g}->{current['queries']:g}"
+        flag = ''
+        if (change > threshold and delta_ms > min_delta_ms) or current['queries'] > previous['queries']:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print(f"{name:<28}{previous['median_ms']:>10.2f}{current['median_ms']:>10.2f}{change:>+9.0%}{queries:>12}{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--logs', type=int, default=10000, help='food logs for the measured user')
+    parser.add_argument('--users', type=int, default=5, help='users in the database, including the measured one')
+    parser.add_argument('--background-logs', type=int, default=1000, help='food logs for each other user')
+    parser.add_argument('--custom-foods', type=int, default=500)
+    parser.add_argument('--years', type=float, default=3)
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--latency-ms', type=float, default=0, help='simulated OpenAI latency')
+    parser.add_argument('--jitter-ms', type=float, default=0)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--response-cache', action='store_true', help='leave the analytics response cache on')
+    parser.add_argument('--only', help='comma separated endpoint name prefixes, e.g. analytics,food.logs')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    parser.add_argument('--baseline', help='earlier results file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2, help='median slowdown that counts as a regression')
+    parser.add_argument('--min-delta-ms', type=float, default=1.0, help='ignore slowdowns smaller than this')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='calorie-bench-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ.setdefault('OPENAI_API_KEY', 'benchmark')
+    # Measure the query path, not repeated cache hits
+    os.environ['ANALYTICS_CACHE_ENABLED'] = 'true' if args.response_cache else 'false'
+
+    from app import create_app, db
+    from flask_jwt_extended import create_access_token
+    from benchmarks import fake_openai
+    from benchmarks.seed import seed
+
+    app = create_app()
+    fake_openai.install(args.latency_ms, args.jitter_ms)
+
+    today = date.today()
+    with app.app_context():
+        start = time.perf_counter()
+        user_id = seed(args.logs, args.users, args.background_logs, args.custom_foods, args.years, today, args.seed)
+        print(f"Seeded {args.logs} logs for the measured user ({args.users} users) in {time.perf_counter() - start:.1f}s")
+        token = create_access_token(identity=str(user_id))
+        counter = QueryCounter(db.engine)
+
+    client = app.test_client()
+    headers = {'Authorization': f'Bearer {token}'}
+
+    cases = endpoint_cases(today)
+    if args.only:
+        prefixes = tuple(prefix.strip() for prefix in args.only.split(','))
+        cases = [case for case in cases if case[0].startswith(prefixes)]
+
+    results = {
+        'meta': {
+            'created_at': datetime.utcnow().isoformat(),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'params': {key: value for key, value in vars(args).items() if key not in ('output', 'baseline')}
+        },
+        'results': {}
+    }
+
+    print(f"{'endpoint':<28}{'status':>7}{'median ms':>11}{'p95 ms':>10}{'queries':>9}{'bytes':>11}")
+    for case in cases:
+        result = run_case(client, headers, counter, case, args.runs, args.warmup)
+        results['results'][case[0]] = result
+        print(f"{case[0]:<28}{result['status']:>7}{result['median_ms']:>11.2f}{result['p95_ms']:>10.2f}"
+              f"{result['queries']:>9g}{result['bytes']:>11}")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as output:
+            json.dump(results, output, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.threshold, args.min_delta_ms)
+        if regressions:
+            print(f"\n{len(regressions)} endpoint(s) regressed: {', '.join(regressions)}")
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
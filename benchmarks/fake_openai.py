@@ -0,0 +1,84 @@
+"""
+Stand-in for OpenAIService that answers from canned data after a
+configurable delay, so endpoint benchmarks measure the app and not the
+network. Only the raw completion methods are replaced; caching,
+coalescing and deduplication layers run unchanged.
+"""
+import random
+import threading
+import time
+from services.openai_service import OpenAIService
+
+class FakeOpenAIService(OpenAIService):
+    def __init__(self, latency_ms=0, jitter_ms=0, seed=42):
+        super().__init__()
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = {}
+
+    def _wait(self, operation):
+        with self._lock:
+            self.calls[operation] = self.calls.get(operation, 0) + 1
+            delay = self.latency_ms + (self._rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0)
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+
+    @staticmethod
+    def _food(food_name, calories=250):
+        return {
+            'food_name': food_name.title(),
+            'serving_size_grams': 100,
+            'serving_description': '1 serving',
+            'nutrition': {
+                'calories': calories,
+                'proteins': 12,
+                'carbs': 30,
+                'fats': 8,
+                'fiber': 3,
+                'sodium': 300,
+                'sugars': 6
+            },
+            'confidence_score': 0.85,
+            'meal_category': 'lunch',
+            'common_brands': []
+        }
+
+    def analyze_food_image(self, image_data, user_description="", detail="high"):
+        self._wait('analyze_image')
+        result = self._food(user_description or 'mixed plate', calories=540)
+        result.update({
+            'brand': None,
+            'estimated_weight_grams': 320,
+            'ingredients': ['rice', 'chicken', 'vegetables'],
+            'analysis_notes': 'benchmark stub'
+        })
+        return result
+
+    def search_food_by_name(self, food_name, portion_description=""):
+        self._wait('search_food')
+        return self._food(food_name)
+
+    def search_foods_batch(self, items):
+        self._wait('search_food_batch')
+        return [self._food(name) for name, _ in items]
+
+    def analyze_recipe(self, recipe_text, servings=1):
+        self._wait('analyze_recipe')
+        return {
+            'recipe_name': 'Benchmark Recipe',
+            'total_servings': servings,
+            'per_serving_nutrition': self._food('recipe', calories=450)['nutrition'],
+            'ingredients_analyzed': ['flour', 'eggs', 'milk'],
+            'estimated_weight_per_serving': 250,
+            'confidence_score': 0.8,
+            'cooking_notes': 'benchmark stub'
+        }
+
+def install(latency_ms=0, jitter_ms=0):
+    """Swap the fake into the food routes and return it"""
+    import routes.food
+    service = FakeOpenAIService(latency_ms, jitter_ms)
+    routes.food.openai_service = service
+    return service
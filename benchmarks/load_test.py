@@ -0,0 +1,203 @@
+"""
+Load test the Flask development server against gunicorn with the same
+seeded database and a fake OpenAI with fixed latency.
+
+Usage: python -m benchmarks.load_test --concurrency 32 --duration 20 --latency-ms 800
+       python -m benchmarks.load_test --servers gunicorn --gunicorn-pool ai
+"""
+import argparse
+import http.client
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date
+
+# Weighted request mix: mostly reads, some AI lookups and writes
+REQUEST_MIX = [
+    (5, 'GET', '/api/analytics/weekly'),
+    (3, 'GET', '/api/analytics/summary'),
+    (6, 'GET', '/api/food/logs?limit=50'),
+    (3, 'GET', '/api/user/profile'),
+    (2, 'GET', '/api/food/search?q=load%20test%20dish%20{n}&refresh=true'),
+    (1, 'POST', '/api/food/log')
+]
+
+def create_bench_app():
+    """App factory used by both servers: the real app with the fake OpenAI installed"""
+    from app import create_app
+    from benchmarks import fake_openai
+
+    app = create_app()
+    fake_openai.install(float(os.environ.get('BENCH_AI_LATENCY_MS', 0)))
+    return app
+
+def serve_dev(port):
+    """What run.py does: Flask's development server with threaded=True"""
+    create_bench_app().run(host='127.0.0.1', port=port, threaded=True)
+
+def start_server(kind, port, env, pool, log_path):
+    if kind == 'dev':
+        command = [sys.executable, '-m', 'benchmarks.load_test', '--serve-dev', str(port)]
+    else:
+        command = [
+            sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py',
+            '--bind', f'127.0.0.1:{port}', '--access-logfile', '/dev/null',
+            'benchmarks.load_test:create_bench_app()'
+        ]
+        env = dict(env, GUNICORN_POOL=pool)
+    # A file, not a pipe: the dev server logs every request and would block on a full pipe
+    with open(log_path, 'w') as log_file:
+        return subprocess.Popen(command, env=env, stdout=log_file, stderr=subprocess.STDOUT)
+
+def wait_until_up(port, process, log_path, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            with open(log_path) as log_file:
+                raise RuntimeError(log_file.read()[-2000:])
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            connection.request('GET', '/api/health')
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'Server on port {port} did not start')
+
+def expand_mix():
+    plan = []
+    for weight, method, path in REQUEST_MIX:
+        plan.extend([(method, path)] * weight)
+    return plan
+
+def run_load(port, token, concurrency, duration):
+    """Closed-loop load: each client thread sends its next request as soon as the last returns"""
+    plan = expand_mix()
+    headers = {'Authorization': f'Bearer {token}', 'Content-Type': 'application/json'}
+    body = json.dumps({'food_name': 'Load Test Snack', 'calories': 150, 'serving_size': 50})
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client(index):
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=120)
+        count = index
+        while time.perf_counter() < deadline:
+            method, path = plan[count % len(plan)]
+            path = path.format(n=f'{index}-{count}')
+            count += concurrency
+            started = time.perf_counter()
+            try:
+                connection.request(method, path, body=body if method == 'POST' else None, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                status = response.status
+            except (OSError, http.client.HTTPException) as e:
+                status = type(e).__name__
+                connection.close()
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=120)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            with lock:
+                if status in (200, 201):
+                    latencies.append(elapsed_ms)
+                else:
+                    errors.append(status)
+        connection.close()
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(index,)) for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'error_kinds': sorted(set(map(str, errors)))[:5],
+        'throughput_rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(statistics.median(latencies), 1) if latencies else None,
+        'p95_ms': round(latencies[int(0.95 * (len(latencies) - 1))], 1) if latencies else None,
+        'p99_ms': round(latencies[int(0.99 * (len(latencies) - 1))], 1) if latencies else None
+    }
+
+def prepare_database(path, logs, users):
+    """Seed once; every server run starts from a copy of this file"""
+    os.environ['DATABASE_URL'] = f'sqlite:///{path}'
+    from benchmarks.seed import seed
+    from flask_jwt_extended import create_access_token
+
+    app = create_bench_app()
+    with app.app_context():
+        user_id = seed(logs, users, end_date=date.today())
+        return create_access_token(identity=str(user_id))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--servers', default='dev,gunicorn', help='comma separated: dev, gunicorn')
+    parser.add_argument('--gunicorn-pool', default='all', help='GUNICORN_POOL profile to load test')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=15, help='seconds per server')
+    parser.add_argument('--latency-ms', type=float, default=500, help='simulated OpenAI latency')
+    parser.add_argument('--logs', type=int, default=20000)
+    parser.add_argument('--users', type=int, default=5)
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--output', help='write results as JSON')
+    parser.add_argument('--serve-dev', type=int, metavar='PORT', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve_dev:
+        serve_dev(args.serve_dev)
+        return
+
+    workdir = tempfile.mkdtemp(prefix='calorie-load-')
+    seeded_path = os.path.join(workdir, 'seed.db')
+    token = prepare_database(seeded_path, args.logs, args.users)
+
+    results = {}
+    for kind in [server.strip() for server in args.servers.split(',')]:
+        db_path = os.path.join(workdir, f'{kind}.db')
+        with open(seeded_path, 'rb') as source, open(db_path, 'wb') as target:
+            target.write(source.read())
+
+        env = dict(
+            os.environ,
+            DATABASE_URL=f'sqlite:///{db_path}',
+            BENCH_AI_LATENCY_MS=str(args.latency_ms),
+            ANALYTICS_CACHE_ENABLED='false',
+            REFERENCE_FOODS_AUTO_IMPORT='false'
+        )
+        env.setdefault('OPENAI_API_KEY', 'benchmark')
+        log_path = os.path.join(workdir, f'{kind}.log')
+        process = start_server(kind, args.port, env, args.gunicorn_pool, log_path)
+        try:
+            wait_until_up(args.port, process, log_path)
+            label = kind if kind == 'dev' else f'gunicorn ({args.gunicorn_pool})'
+            print(f"Loading {label} with {args.concurrency} clients for {args.duration:g}s...")
+            results[label] = run_load(args.port, token, args.concurrency, args.duration)
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    print(f"\n{'server':<20}{'req/s':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'requests':>10}{'errors':>8}")
+    for label, result in results.items():
+        print(f"{label:<20}{result['throughput_rps']:>8}{result['p50_ms']:>9}{result['p95_ms']:>9}"
+              f"{result['p99_ms']:>9}{result['requests']:>10}{result['errors']:>8}")
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump({'params': vars(args), 'results': results}, output, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""
+Deterministic synthetic data for benchmarks: users, multi-year food logs
+and custom foods. The same seed and end date always produce the same rows.
+"""
+import random
+from datetime import date, datetime, time, timedelta
+
+FOODS = [
+    # name, serving grams, calories, proteins, carbs, fats, fiber, sodium, sugars
+    ('Oatmeal', 240, 150, 5, 27, 3, 4, 115, 1),
+    ('Greek Yogurt', 170, 100, 17, 6, 0.7, 0, 61, 4),
+    ('Scrambled Eggs', 120, 200, 13, 2, 15, 0, 340, 1.5),
+    ('Banana', 118, 105, 1.3, 27, 0.4, 3.1, 1, 14),
+    ('Chicken Salad', 250, 350, 30, 12, 20, 4, 600, 5),
+    ('Turkey Sandwich', 220, 420, 28, 40, 14, 5, 980, 6),
+    ('Rice Bowl', 350, 520, 22, 75, 14, 6, 850, 4),
+    ('Pasta Bolognese', 300, 610, 32, 70, 20, 6, 720, 9),
+    ('Grilled Salmon', 180, 370, 40, 0, 22, 0, 110, 0),
+    ('Tofu Stir Fry', 300, 380, 22, 30, 18, 6, 890, 10),
+    ('Protein Bar', 60, 210, 20, 22, 7, 3, 180, 6),
+    ('Almonds', 28, 164, 6, 6, 14, 3.5, 0, 1.2),
+    ('Apple', 182, 95, 0.5, 25, 0.3, 4.4, 2, 19),
+    ('Chocolate Cookie', 40, 190, 2, 26, 9, 1, 120, 14)
+]
+BRANDS = ['Acme', 'FitFoods', 'GreenFarm', 'Homemade', 'QuickMeal', None]
+CATEGORIES = ['Snacks', 'Dairy', 'Meals', 'Beverages', 'Baked Goods']
+WORDS = [
+    'chicken', 'beef', 'salad', 'protein', 'bar', 'shake', 'greek', 'yogurt', 'oat',
+    'granola', 'almond', 'butter', 'rice', 'bowl', 'spicy', 'tofu', 'wrap', 'pasta'
+]
+# Meal and the hour range it is eaten in
+MEALS = [('breakfast', 6, 10), ('lunch', 11, 14), ('dinner', 17, 21), ('snack', 9, 23)]
+
+INSERT_CHUNK = 20000
+BENCH_PASSWORD = 'BenchPassw0rd'
+
+def create_users(db, User, count, rng):
+    """Insert benchmark users; the password is hashed once and shared"""
+    template = User(email='template@bench.local', name='Template')
+    template.set_password(BENCH_PASSWORD)
+
+    users = []
+    for index in range(count):
+        user = User(
+            email=f'bench{index}@bench.local',
+            password_hash=template.password_hash,
+            name=f'Bench User {index}',
+            age=rng.randint(20, 65),
+            weight=round(rng.uniform(50, 110), 1),
+            height=round(rng.uniform(155, 195), 1),
+            gender=rng.choice(['male', 'female']),
+            activity_level=rng.choice(['sedentary', 'light', 'moderate', 'very_active']),
+            goal_type=rng.choice(['lose_weight', 'maintain', 'gain_weight']),
+            daily_calorie_goal=rng.choice([1800, 2000, 2200, 2500])
+        )
+        db.session.add(user)
+        users.append(user)
+    db.session.commit()
+    return [user.id for user in users]
+
+def food_log_rows(user_id, count, years, end_date, rng):
+    """
+    Yield food log dicts spread evenly over the years before end_date,
+    several per day, oldest first.
+    """
+    days = max(1, int(years * 365))
+    start = end_date - timedelta(days=days - 1)
+
+    for index in range(count):
+        day = start + timedelta(days=index * days // count)
+        meal_type, first_hour, last_hour = rng.choice(MEALS)
+        consumed_at = datetime.combine(day, time(rng.randint(first_hour, last_hour), rng.randint(0, 59)))
+        name, serving, calories, proteins, carbs, fats, fiber, sodium, sugars = rng.choice(FOODS)
+        yield {
+            'user_id': user_id,
+            'food_name': name,
+            'brand': rng.choice(BRANDS),
+            'serving_size': serving,
+            'servings_consumed': rng.choice([0.5, 1.0, 1.0, 1.0, 1.5, 2.0]),
+            'calories': calories,
+            'proteins': proteins,
+            'carbs': carbs,
+            'fats': fats,
+            'fiber': fiber,
+            'sodium': sodium,
+            'sugars': sugars,
+            'meal_type': meal_type,
+            'confidence_score': round(rng.uniform(0.6, 0.98), 2),
+            'consumed_at': consumed_at,
+            'created_at': consumed_at,
+            'updated_at': consumed_at
+        }
+
+def custom_food_rows(user_id, count, rng):
+    for _ in range(count):
+        yield {
+            'user_id': user_id,
+            'name': ' '.join(rng.sample(WORDS, 3)).title(),
+            'brand': rng.choice(BRANDS),
+            'category': rng.choice(CATEGORIES),
+            'calories_per_100g': round(rng.uniform(20, 600), 1),
+            'proteins_per_100g': round(rng.uniform(0, 40), 1),
+            'carbs_per_100g': round(rng.uniform(0, 80), 1),
+            'fats_per_100g': round(rng.uniform(0, 40), 1),
+            'usage_count': rng.randint(0, 50)
+        }
+
+def bulk_insert(db, model, rows):
+    """Insert an iterable of dicts in INSERT_CHUNK sized statements"""
+    total = 0
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= INSERT_CHUNK:
+            db.session.execute(db.insert(model), chunk)
+            total += len(chunk)
+            chunk = []
+    if chunk:
+        db.session.execute(db.insert(model), chunk)
+        total += len(chunk)
+    db.session.commit()
+    return total
+
+def seed(logs, users=5, background_logs=1000, custom_foods=500, years=3, end_date=None, seed=42):
+    """
+    Populate the current app's database. The first user is the one the
+    benchmarks measure and gets `logs` food logs; the other users get
+    `background_logs` each so per-user filtering has rows to skip.
+    Returns the measured user's id. Must run inside an app context.
+    """
+    from app import db
+    from models.user import User
+    from models.food_log import FoodLog
+    from models.custom_food import CustomFood
+    from services.rollup_service import rebuild_rollups
+
+    rng = random.Random(seed)
+    end_date = end_date or date.today()
+
+    user_ids = create_users(db, User, max(1, users), rng)
+    for position, user_id in enumerate(user_ids):
+        count = logs if position == 0 else background_logs
+        bulk_insert(db, FoodLog, food_log_rows(user_id, count, years, end_date, rng))
+        bulk_insert(db, CustomFood, custom_food_rows(user_id, custom_foods if position == 0 else custom_foods // 10, rng))
+
+    # Bulk inserts skip the write path, so build the daily summaries in one pass
+    rebuild_rollups()
+    return user_ids[0]
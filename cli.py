@@ -0,0 +1,101 @@
+import click
+from flask import current_app
+
+def register_commands(app):
+    """Register maintenance commands on the Flask CLI"""
+
+    @app.cli.command('import-reference-foods')
+    @click.argument('path', required=False)
+    @click.option('--append', is_flag=True, help='Keep existing rows instead of replacing them')
+    def import_reference_foods(path, append):
+        """Bulk import a reference nutrition CSV and rebuild the search index"""
+        from services.nutrition_service import nutrition_index
+
+        path = path or current_app.config['REFERENCE_FOODS_PATH']
+        count = nutrition_index.import_csv(path, replace=not append)
+        click.echo(f"Imported {count} reference foods from {path}")
+        click.echo(f"Index now holds {nutrition_index.stats()['foods']} foods")
+
+    @app.cli.command('rebuild-search-index')
+    def rebuild_search_index():
+        """Rebuild the custom food full-text search index"""
+        from services.search_index import custom_food_index
+
+        if not custom_food_index.enabled:
+            click.echo("Full-text search is not available on this database, nothing to rebuild")
+            return
+
+        count = custom_food_index.rebuild()
+        click.echo(f"Rebuilt search index over {count} custom foods")
+
+    @app.cli.command('rebuild-rollups')
+    @click.option('--user-id', type=int, help='Only rebuild this user\'s summaries')
+    def rebuild_rollups_command(user_id):
+        """Recompute daily nutrition summaries from the raw food logs"""
+        from services.rollup_service import rebuild_rollups
+
+        count = rebuild_rollups(user_id)
+        click.echo(f"Rebuilt {count} daily nutrition summaries")
+
+    @app.cli.command('check-rollups')
+    @click.option('--user-id', type=int, help='Only check this user\'s summaries')
+    @click.option('--fix', is_flag=True, help='Rebuild the summaries when mismatches are found')
+    def check_rollups_command(user_id, fix):
+        """Compare daily nutrition summaries against the raw food logs"""
+        from services.rollup_service import check_rollups, rebuild_rollups
+
+        mismatches = check_rollups(user_id)
+        if not mismatches:
+            click.echo("Daily nutrition summaries match the food logs")
+            return
+
+        for mismatch in mismatches:
+            click.echo(f"user {mismatch['user_id']} {mismatch['day']}: {mismatch['differences']}")
+        click.echo(f"{len(mismatches)} inconsistent days")
+
+        if fix:
+            count = rebuild_rollups(user_id)
+            click.echo(f"Rebuilt {count} daily nutrition summaries")
+        else:
+            raise SystemExit(1)
+
+    @app.cli.command('prune-sync-tombstones')
+    @click.option('--days', type=int, help='Keep tombstones newer than this many days')
+    def prune_sync_tombstones(days):
+        """Delete sync tombstones older than the retention window"""
+        from services.sync_service import prune_tombstones
+
+        days = days or current_app.config['SYNC_TOMBSTONE_RETENTION_DAYS']
+        count = prune_tombstones(days)
+        click.echo(f"Deleted {count} sync tombstones older than {days} days")
+
+    @app.cli.command('slow-queries')
+    @click.option('--top', type=int, default=10, help='How many statements to show')
+    @click.option('--hours', type=float, help='Only include statements logged in the last N hours')
+    @click.option('--route', help='Only include statements run by this endpoint, e.g. analytics.get_summary')
+    @click.option('--clear', is_flag=True, help='Delete the log after reporting')
+    def slow_queries(top, hours, route, clear):
+        """Report the slowest logged SQL statements, grouped and ranked by total time"""
+        from datetime import datetime, timedelta
+        from services.slow_query_log import slow_query_log
+
+        since = datetime.utcnow() - timedelta(hours=hours) if hours else None
+        groups = slow_query_log.report(top, since, route)
+        if not groups:
+            click.echo(f"No slow queries logged in {slow_query_log.path}")
+        else:
+            for rank, group in enumerate(groups, 1):
+                routes = ', '.join(f"{name} ({count})" for name, count in sorted(group['routes'].items(), key=lambda item: -item[1]))
+                click.echo(f"#{rank} {group['count']}x  total {group['total_ms']} ms  avg {group['avg_ms']} ms  max {group['max_ms']} ms")
+                click.echo(f"   routes: {routes}")
+                click.echo(f"   {group['statement'][:500]}")
+                if group['slowest'].get('parameters') is not None:
+                    click.echo(f"   slowest parameters: {group['slowest']['parameters']}")
+                for line in group['slowest'].get('plan') or []:
+                    marker = '  <- full table scan' if line in group['full_scans'] else ''
+                    click.echo(f"   plan: {line}{marker}")
+                click.echo()
+
+        if clear:
+            slow_query_log.clear()
+            click.echo(f"Cleared {slow_query_log.path}")
@@ -1,6 +1,8 @@
 import os
 from datetime import timedelta
 
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+
 class Config:
     # Database
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///calorie_app.db'
@@ -13,6 +15,88 @@ class Config:
     # OpenAI
     OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
     
+    # OpenAI client resilience (timeouts in seconds, per operation)
+    OPENAI_TIMEOUTS = {
+        'analyze_image': float(os.environ.get('OPENAI_TIMEOUT_IMAGE', 60)),
+        'search_food': float(os.environ.get('OPENAI_TIMEOUT_SEARCH', 20)),
+        'search_food_batch': float(os.environ.get('OPENAI_TIMEOUT_SEARCH_BATCH', 60)),
+        'analyze_recipe': float(os.environ.get('OPENAI_TIMEOUT_RECIPE', 45))
+    }
+    OPENAI_DEFAULT_TIMEOUT = float(os.environ.get('OPENAI_DEFAULT_TIMEOUT', 30))
+    OPENAI_MAX_RETRIES = int(os.environ.get('OPENAI_MAX_RETRIES', 2))
+    OPENAI_BACKOFF_BASE = float(os.environ.get('OPENAI_BACKOFF_BASE', 0.5))
+    OPENAI_BACKOFF_MAX = float(os.environ.get('OPENAI_BACKOFF_MAX', 8))
+    OPENAI_MAX_CONCURRENCY = int(os.environ.get('OPENAI_MAX_CONCURRENCY', 8))
+    OPENAI_QUEUE_TIMEOUT = float(os.environ.get('OPENAI_QUEUE_TIMEOUT', 10))
+    OPENAI_BREAKER_THRESHOLD = int(os.environ.get('OPENAI_BREAKER_THRESHOLD', 5))
+    OPENAI_BREAKER_RESET_SECONDS = float(os.environ.get('OPENAI_BREAKER_RESET_SECONDS', 30))
+    
+    # Reference nutrition dataset
+    REFERENCE_FOODS_PATH = os.environ.get('REFERENCE_FOODS_PATH') or os.path.join(BASE_DIR, 'data', 'reference_foods.csv')
+    REFERENCE_FOODS_AUTO_IMPORT = os.environ.get('REFERENCE_FOODS_AUTO_IMPORT', 'true').lower() == 'true'
+    REFERENCE_MATCH_MIN_COVERAGE = float(os.environ.get('REFERENCE_MATCH_MIN_COVERAGE', 0.6))
+    
+    # Custom food full-text search (SQLite FTS5)
+    CUSTOM_FOOD_FTS_ENABLED = os.environ.get('CUSTOM_FOOD_FTS_ENABLED', 'true').lower() == 'true'
+    
+    # Batch food search
+    FOOD_SEARCH_BATCH_MAX_ITEMS = int(os.environ.get('FOOD_SEARCH_BATCH_MAX_ITEMS', 20))
+    
+    # Batch food logging
+    FOOD_LOG_BATCH_MAX_ITEMS = int(os.environ.get('FOOD_LOG_BATCH_MAX_ITEMS', 500))
+    
+    # Delta sync
+    SYNC_TOMBSTONE_RETENTION_DAYS = int(os.environ.get('SYNC_TOMBSTONE_RETENTION_DAYS', 90))
+    SYNC_OVERLAP_SECONDS = int(os.environ.get('SYNC_OVERLAP_SECONDS', 5))
+    
+    # Analytics
+    PROGRESS_MAX_PERIOD_DAYS = int(os.environ.get('PROGRESS_MAX_PERIOD_DAYS', 3650))
+    ANALYTICS_CACHE_ENABLED = os.environ.get('ANALYTICS_CACHE_ENABLED', 'true').lower() == 'true'
+    ANALYTICS_CACHE_MAX_BYTES = int(os.environ.get('ANALYTICS_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+    
+    # AI response cache
+    AI_CACHE_ENABLED = os.environ.get('AI_CACHE_ENABLED', 'true').lower() == 'true'
+    AI_CACHE_TTL_SECONDS = int(os.environ.get('AI_CACHE_TTL_SECONDS', 7 * 24 * 3600))
+    AI_CACHE_MAX_ENTRIES = int(os.environ.get('AI_CACHE_MAX_ENTRIES', 10000))
+    AI_CACHE_EVICT_INTERVAL = int(os.environ.get('AI_CACHE_EVICT_INTERVAL', 100))  # writes between eviction passes
+    
+    # Image deduplication (max Hamming distance between 64-bit perceptual hashes)
+    IMAGE_DEDUP_ENABLED = os.environ.get('IMAGE_DEDUP_ENABLED', 'true').lower() == 'true'
+    IMAGE_DEDUP_MAX_DISTANCE = int(os.environ.get('IMAGE_DEDUP_MAX_DISTANCE', 6))
+    IMAGE_DEDUP_TTL_SECONDS = int(os.environ.get('IMAGE_DEDUP_TTL_SECONDS', 30 * 24 * 3600))
+    IMAGE_DEDUP_MAX_ENTRIES = int(os.environ.get('IMAGE_DEDUP_MAX_ENTRIES', 10000))
+    IMAGE_DEDUP_RESYNC_SECONDS = int(os.environ.get('IMAGE_DEDUP_RESYNC_SECONDS', 300))  # full reload of the in-memory hash index
+    
+    # Vision payload: detail is auto, low or high
+    VISION_DETAIL = os.environ.get('VISION_DETAIL', 'auto')
+    VISION_TARGET_BYTES = int(os.environ.get('VISION_TARGET_BYTES', 250 * 1024))
+    
+    # Background analysis jobs
+    JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 4))
+    JOB_QUEUE_SIZE = int(os.environ.get('JOB_QUEUE_SIZE', 100))
+    JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', 3))
+    JOB_STALE_SECONDS = int(os.environ.get('JOB_STALE_SECONDS', 600))
+    JOB_STREAM_POLL_SECONDS = float(os.environ.get('JOB_STREAM_POLL_SECONDS', 1))
+    JOB_STREAM_TIMEOUT_SECONDS = int(os.environ.get('JOB_STREAM_TIMEOUT_SECONDS', 300))
+    # Only serving processes pick up unfinished jobs: run.py and wsgi.py turn
+    # this on, so CLI commands and scripts never start AI work. gunicorn keeps
+    # it off in the preloading master and resumes in each worker after fork
+    JOB_RESUME_ON_START = os.environ.get('JOB_RESUME_ON_START', 'false').lower() == 'true'
+    
+    # Request metrics (Prometheus text at /api/metrics) and Server-Timing headers.
+    # /api/metrics answers only with "Authorization: Bearer <METRICS_TOKEN>" and is off while it is unset
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    SERVER_TIMING_ENABLED = os.environ.get('SERVER_TIMING_ENABLED', 'false').lower() == 'true'
+    
+    # Slow-query log (JSONL with EXPLAIN output; defaults to instance/slow_queries.jsonl)
+    SLOW_QUERY_LOG_ENABLED = os.environ.get('SLOW_QUERY_LOG_ENABLED', 'true').lower() == 'true'
+    SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 200))
+    SLOW_QUERY_EXPLAIN = os.environ.get('SLOW_QUERY_EXPLAIN', 'true').lower() == 'true'
+    # Bound values are only written when enabled, and names like email or password are always redacted
+    SLOW_QUERY_LOG_PARAMETERS = os.environ.get('SLOW_QUERY_LOG_PARAMETERS', 'false').lower() == 'true'
+    SLOW_QUERY_LOG_PATH = os.environ.get('SLOW_QUERY_LOG_PATH')
+    
     # App settings
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key'
     
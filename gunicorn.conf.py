@@ -0,0 +1,102 @@
+"""
+Gunicorn settings for the Calorie Detection API.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+GUNICORN_POOL picks a profile:
+
+- all (default): one pool serves every route.
+- web: fast CRUD and analytics routes. Processes scale with CPUs and
+  there are few threads per process.
+- ai: routes that wait on OpenAI. These are I/O bound, so there are fewer
+  processes and many threads, and timeouts are sized to the OpenAI
+  retry budget.
+
+To split traffic, run a web pool and an ai pool on different ports. Send
+AI_ROUTES to the ai pool from the reverse proxy, e.g. for nginx:
+
+    location ~ ^/api/food/(analyze-image|analyze-recipe|search|search-batch)$ { proxy_pass http://ai_pool; }
+    location / { proxy_pass http://web_pool; }
+
+Every value can be overridden through the environment (WEB_CONCURRENCY,
+GUNICORN_THREADS, GUNICORN_TIMEOUT, ...). SQLite allows one writer at a
+time across all processes. Point DATABASE_URL at PostgreSQL before
+raising worker counts for write-heavy traffic.
+"""
+import multiprocessing
+import os
+
+# Workers resume queued analysis jobs after fork (see post_fork), not the preloading master
+os.environ['JOB_RESUME_ON_START'] = 'false'
+
+from config import Config
+
+# Routes that block on OpenAI calls, for the proxy split described above
+AI_ROUTES = [
+    '/api/food/analyze-image',
+    '/api/food/analyze-recipe',
+    '/api/food/search',
+    '/api/food/search-batch'
+]
+
+def ai_request_budget():
+    """Worst case seconds for one AI request: every attempt times out, plus backoff and queueing"""
+    attempts = Config.OPENAI_MAX_RETRIES + 1
+    slowest = max(list(Config.OPENAI_TIMEOUTS.values()) + [Config.OPENAI_DEFAULT_TIMEOUT])
+    return int(slowest * attempts + Config.OPENAI_BACKOFF_MAX * Config.OPENAI_MAX_RETRIES + Config.OPENAI_QUEUE_TIMEOUT)
+
+pool = os.environ.get('GUNICORN_POOL', 'all')
+cpus = multiprocessing.cpu_count()
+
+if pool == 'ai':
+    default_workers = max(2, cpus)
+    # One in-flight OpenAI call per thread; OPENAI_MAX_CONCURRENCY caps them per process
+    default_threads = max(8, Config.OPENAI_MAX_CONCURRENCY * 2)
+    default_timeout = ai_request_budget()
+    default_port = 8001
+else:
+    default_workers = cpus * 2 + 1
+    default_threads = 4
+    default_timeout = 30
+    default_port = 8000
+
+bind = os.environ.get('GUNICORN_BIND', f"0.0.0.0:{os.environ.get('PORT', default_port)}")
+workers = int(os.environ.get('WEB_CONCURRENCY', default_workers))
+threads = int(os.environ.get('GUNICORN_THREADS', default_threads))
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+
+# Build the app once in the master and fork it: faster restarts and shared memory pages
+preload_app = True
+
+# A gthread worker heartbeats from its main loop, so timeout only catches a
+# wedged worker; graceful_timeout is how long in-flight requests get to
+# finish on reload or shutdown and must cover a full OpenAI retry cycle
+# wherever AI routes are served
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', default_timeout))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', default_timeout if pool == 'web' else ai_request_budget()))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+# Recycle workers now and then to bound memory growth (caches, fragmentation)
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 200))
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+proc_name = f'calorie-api-{pool}'
+
+def post_fork(server, worker):
+    """Undo state a forked worker must not share with the master"""
+    from app import db
+    from services.job_service import job_runner
+
+    # The preloaded application (whatever module:callable was given)
+    app = server.app.wsgi()
+
+    # Pooled connections opened during create_app belong to the master
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+    resumed = job_runner.after_fork()
+    if resumed:
+        server.log.info(f"Worker {worker.pid} resumed {resumed} analysis jobs")
@@ -0,0 +1,30 @@
+from app import db
+from datetime import datetime
+
+class AICacheEntry(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+
+    # Cache identification
+    namespace = db.Column(db.String(50), nullable=False)  # food_search, recipe, ...
+    cache_key = db.Column(db.String(64), unique=True, nullable=False, index=True)
+
+    # Cached AI response (JSON string)
+    payload = db.Column(db.Text, nullable=False)
+
+    # Timestamps
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_accessed_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    def is_expired(self, ttl_seconds):
+        """Check if the entry is older than the given TTL"""
+        if not ttl_seconds or not self.created_at:
+            return False
+        return (datetime.utcnow() - self.created_at).total_seconds() > ttl_seconds
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'namespace': self.namespace,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'last_accessed_at': self.last_accessed_at.isoformat() if self.last_accessed_at else None
+        }
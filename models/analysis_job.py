@@ -0,0 +1,41 @@
+from app import db
+from datetime import datetime
+import json
+
+class AnalysisJob(db.Model):
+    id = db.Column(db.String(32), primary_key=True)  # uuid4 hex
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False, index=True)
+
+    # Job definition
+    job_type = db.Column(db.String(50), nullable=False)  # analyze_image, analyze_recipe
+    params = db.Column(db.Text)  # JSON string of handler arguments
+
+    # Execution state
+    status = db.Column(db.String(20), nullable=False, default='queued', index=True)  # queued, running, succeeded, failed
+    attempts = db.Column(db.Integer, default=0)
+    result = db.Column(db.Text)  # JSON string of the response payload
+    status_code = db.Column(db.Integer)
+    error = db.Column(db.Text)
+
+    # Timestamps
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    def is_finished(self):
+        """Check if the job reached a terminal state"""
+        return self.status in ('succeeded', 'failed')
+
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'job_type': self.job_type,
+            'status': self.status,
+            'attempts': self.attempts,
+            'result': json.loads(self.result) if self.result else None,
+            'status_code': self.status_code,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
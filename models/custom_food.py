@@ -2,6 +2,11 @@ from app import db
 from datetime import datetime
 
 class CustomFood(db.Model):
+    __table_args__ = (
+        # Serves delta sync (rows changed since a point in time)
+        db.Index('ix_custom_food_user_updated_at', 'user_id', 'updated_at'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     
@@ -67,5 +72,6 @@ class CustomFood(db.Model):
             'category': self.category,
             'is_verified': self.is_verified,
             'usage_count': self.usage_count,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
\ No newline at end of file
@@ -0,0 +1,59 @@
+from app import db
+from datetime import datetime
+
+MEAL_TYPES = ['breakfast', 'lunch', 'dinner', 'snack']
+
+class DailyNutritionSummary(db.Model):
+    # One row per user and calendar day that has at least one food log
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+
+    # Nutrient totals (servings already applied)
+    calories = db.Column(db.Float, nullable=False, default=0)
+    proteins = db.Column(db.Float, nullable=False, default=0)
+    carbs = db.Column(db.Float, nullable=False, default=0)
+    fats = db.Column(db.Float, nullable=False, default=0)
+    fiber = db.Column(db.Float, nullable=False, default=0)
+    sodium = db.Column(db.Float, nullable=False, default=0)
+    sugars = db.Column(db.Float, nullable=False, default=0)
+
+    # Item counts
+    item_count = db.Column(db.Integer, nullable=False, default=0)
+
+    # Meal breakdown
+    breakfast_calories = db.Column(db.Float, nullable=False, default=0)
+    breakfast_count = db.Column(db.Integer, nullable=False, default=0)
+    lunch_calories = db.Column(db.Float, nullable=False, default=0)
+    lunch_count = db.Column(db.Integer, nullable=False, default=0)
+    dinner_calories = db.Column(db.Float, nullable=False, default=0)
+    dinner_count = db.Column(db.Integer, nullable=False, default=0)
+    snack_calories = db.Column(db.Float, nullable=False, default=0)
+    snack_count = db.Column(db.Integer, nullable=False, default=0)
+
+    # Timestamps
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def meal_breakdown(self):
+        """Calories and item count per meal type"""
+        return {
+            meal_type: {
+                'calories': getattr(self, f'{meal_type}_calories'),
+                'count': getattr(self, f'{meal_type}_count')
+            }
+            for meal_type in MEAL_TYPES
+        }
+
+    def to_dict(self):
+        return {
+            'user_id': self.user_id,
+            'day': self.day.isoformat() if self.day else None,
+            'calories': self.calories,
+            'proteins': self.proteins,
+            'carbs': self.carbs,
+            'fats': self.fats,
+            'fiber': self.fiber,
+            'sodium': self.sodium,
+            'sugars': self.sugars,
+            'item_count': self.item_count,
+            'meal_breakdown': self.meal_breakdown()
+        }
@@ -2,6 +2,13 @@ from app import db
 from datetime import datetime
 
 class FoodLog(db.Model):
+    __table_args__ = (
+        # Serves every per-user time range query (logs listing, analytics)
+        db.Index('ix_food_log_user_consumed_at', 'user_id', 'consumed_at'),
+        # Serves delta sync (rows changed since a point in time)
+        db.Index('ix_food_log_user_updated_at', 'user_id', 'updated_at'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     
@@ -36,6 +43,7 @@ class FoodLog(db.Model):
     # Timestamps
     consumed_at = db.Column(db.DateTime, default=datetime.utcnow)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     def total_calories(self):
         """Calculate total calories consumed"""
@@ -74,5 +82,6 @@ class FoodLog(db.Model):
             'total_calories': self.total_calories(),
             'total_nutrients': self.total_nutrients(),
             'consumed_at': self.consumed_at.isoformat() if self.consumed_at else None,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
\ No newline at end of file
@@ -0,0 +1,24 @@
+from app import db
+from datetime import datetime
+
+class ImageAnalysis(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), index=True)  # uploader; scopes near-duplicate matches
+
+    # Image fingerprints
+    content_hash = db.Column(db.String(64), nullable=False, index=True)  # sha256 of raw bytes
+    dhash = db.Column(db.String(16), nullable=False)  # 64-bit perceptual difference hash (hex)
+    description_key = db.Column(db.String(64), nullable=False)  # sha256 of normalized user description
+
+    # Stored analysis result (JSON string)
+    result = db.Column(db.Text, nullable=False)
+
+    # Timestamps
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_accessed_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    def is_expired(self, ttl_seconds):
+        """Check if the analysis is older than the given TTL"""
+        if not ttl_seconds or not self.created_at:
+            return False
+        return (datetime.utcnow() - self.created_at).total_seconds() > ttl_seconds
@@ -0,0 +1,55 @@
+from app import db
+from datetime import datetime
+
+class ReferenceFood(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+
+    # Source dataset identification
+    source = db.Column(db.String(50), nullable=False, default='usda')
+    source_id = db.Column(db.String(50))
+
+    # Food information
+    name = db.Column(db.String(200), nullable=False)
+    aliases = db.Column(db.Text)  # semicolon separated alternative names
+    category = db.Column(db.String(100))
+    meal_category = db.Column(db.String(20))
+
+    # Nutritional information per 100g
+    calories_per_100g = db.Column(db.Float, nullable=False)
+    proteins_per_100g = db.Column(db.Float, default=0)
+    carbs_per_100g = db.Column(db.Float, default=0)
+    fats_per_100g = db.Column(db.Float, default=0)
+    fiber_per_100g = db.Column(db.Float, default=0)
+    sodium_per_100g = db.Column(db.Float, default=0)
+    sugars_per_100g = db.Column(db.Float, default=0)
+
+    # Default serving size
+    serving_size_grams = db.Column(db.Float, default=100)
+    serving_description = db.Column(db.String(200))
+
+    # Timestamps
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def alias_list(self):
+        """Return aliases as a list"""
+        return [alias.strip() for alias in (self.aliases or '').split(';') if alias.strip()]
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'source': self.source,
+            'source_id': self.source_id,
+            'name': self.name,
+            'aliases': self.alias_list(),
+            'category': self.category,
+            'meal_category': self.meal_category,
+            'calories_per_100g': self.calories_per_100g,
+            'proteins_per_100g': self.proteins_per_100g,
+            'carbs_per_100g': self.carbs_per_100g,
+            'fats_per_100g': self.fats_per_100g,
+            'fiber_per_100g': self.fiber_per_100g,
+            'sodium_per_100g': self.sodium_per_100g,
+            'sugars_per_100g': self.sugars_per_100g,
+            'serving_size_grams': self.serving_size_grams,
+            'serving_description': self.serving_description
+        }
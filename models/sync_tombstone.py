@@ -0,0 +1,24 @@
+from app import db
+from datetime import datetime
+
+class SyncTombstone(db.Model):
+    __table_args__ = (
+        db.Index('ix_sync_tombstone_user_deleted_at', 'user_id', 'deleted_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, nullable=False)
+
+    # What was deleted
+    entity = db.Column(db.String(20), nullable=False)  # food_log, custom_food
+    entity_id = db.Column(db.Integer, nullable=False)
+
+    # Timestamps
+    deleted_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'entity': self.entity,
+            'id': self.entity_id,
+            'deleted_at': self.deleted_at.isoformat() if self.deleted_at else None
+        }
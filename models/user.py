@@ -26,6 +26,9 @@ class User(db.Model):
     # Relationships
     food_logs = db.relationship('FoodLog', backref='user', lazy=True, cascade='all, delete-orphan')
     custom_foods = db.relationship('CustomFood', backref='user', lazy=True, cascade='all, delete-orphan')
+    daily_summaries = db.relationship('DailyNutritionSummary', lazy=True, cascade='all, delete-orphan')
+    image_analyses = db.relationship('ImageAnalysis', lazy=True, cascade='all, delete-orphan')
+    analysis_jobs = db.relationship('AnalysisJob', lazy=True, cascade='all, delete-orphan')
     
     def set_password(self, password):
         """Hash and set password"""
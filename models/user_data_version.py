@@ -0,0 +1,16 @@
+from app import db
+from datetime import datetime
+
+class UserDataVersion(db.Model):
+    # Not a foreign key: the row outlives account deletion so a reused user id
+    # keeps counting up and never matches an ETag issued to the old account
+    user_id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'user_id': self.user_id,
+            'version': self.version,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
@@ -1,8 +1,17 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
 from models.user import User
 from models.food_log import FoodLog
+from models.daily_summary import MEAL_TYPES
+from services.aggregation_service import day_totals, daily_totals, logged_days, meal_foods, streaks, top_foods
+from services.version_service import conditional_response
+from services.response_cache import response_cache
+from services.trend_service import (
+    SERIES, DEFAULT_SERIES, load_arrays, date_labels, rolling_average, ewma, linear_slope, goal_adherence,
+    macro_percentages, to_json_list
+)
+from utils.helpers import month_range
 from datetime import datetime, timedelta, date
 from sqlalchemy import func, and_
 
@@ -10,6 +19,8 @@ analytics_bp = Blueprint('analytics', __name__)
 
 @analytics_bp.route('/daily/<date_str>', methods=['GET'])
 @jwt_required()
+@conditional_response
+@response_cache.cached
 def get_daily_analytics(date_str):
     """Get daily nutrition analytics for a specific date"""
     try:
@@ -25,30 +36,27 @@ def get_daily_analytics(date_str):
         except ValueError:
             return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
         
-        # Get all food logs for the date
-        food_logs = FoodLog.query.filter(
-            FoodLog.user_id == user_id,
-            func.date(FoodLog.consumed_at) == target_date
-        ).all()
+        # Totals and meal breakdown for the day
+        totals = day_totals(user_id, target_date)
         
-        # Calculate totals
-        total_calories = sum(log.total_calories() for log in food_logs)
-        total_proteins = sum(log.total_nutrients()['proteins'] for log in food_logs)
-        total_carbs = sum(log.total_nutrients()['carbs'] for log in food_logs)
-        total_fats = sum(log.total_nutrients()['fats'] for log in food_logs)
-        total_fiber = sum(log.total_nutrients()['fiber'] for log in food_logs)
-        total_sodium = sum(log.total_nutrients()['sodium'] for log in food_logs)
+        total_calories = totals.calories if totals else 0
+        total_proteins = totals.proteins if totals else 0
+        total_carbs = totals.carbs if totals else 0
+        total_fats = totals.fats if totals else 0
+        total_fiber = totals.fiber if totals else 0
+        total_sodium = totals.sodium if totals else 0
+        
+        # Food names per meal are the only detail read from the raw logs
+        foods = meal_foods(user_id, target_date) if totals else {meal_type: [] for meal_type in MEAL_TYPES}
         
         # Calculate meal breakdown
         meal_breakdown = {}
-        for meal_type in ['breakfast', 'lunch', 'dinner', 'snack']:
-            meal_logs = [log for log in food_logs if log.meal_type == meal_type]
-            meal_calories = sum(log.total_calories() for log in meal_logs)
-            
+        for meal_type in MEAL_TYPES:
+            meal_count = getattr(totals, f'{meal_type}_count') if totals else 0
             meal_breakdown[meal_type] = {
-                'calories': round(meal_calories, 2),
-                'count': len(meal_logs),
-                'foods': [log.food_name for log in meal_logs]
+                'calories': round(getattr(totals, f'{meal_type}_calories'), 2) if meal_count else 0,
+                'count': meal_count,
+                'foods': foods[meal_type]
             }
         
         # Calculate progress vs goals
@@ -56,7 +64,7 @@ def get_daily_analytics(date_str):
         calorie_progress = {
             'consumed': round(total_calories, 2),
             'goal': calorie_goal,
-            'remaining': max(0, calorie_goal - total_calories),
+            'remaining': round(max(0, calorie_goal - total_calories), 2),
             'percentage': round((total_calories / calorie_goal) * 100, 1) if calorie_goal > 0 else 0
         }
         
@@ -92,7 +100,7 @@ def get_daily_analytics(date_str):
             },
             'macro_breakdown': macro_breakdown,
             'meal_breakdown': meal_breakdown,
-            'food_count': len(food_logs)
+            'food_count': totals.item_count if totals else 0
         }
         
         return jsonify(response), 200
@@ -105,6 +113,8 @@ def get_daily_analytics(date_str):
 
 @analytics_bp.route('/weekly', methods=['GET'])
 @jwt_required()
+@conditional_response
+@response_cache.cached
 def get_weekly_analytics():
     """Get weekly nutrition analytics"""
     try:
@@ -124,34 +134,28 @@ def get_weekly_analytics():
         
         end_date = start_date + timedelta(days=6)  # Sunday
         
-        # Get all food logs for the week
-        food_logs = FoodLog.query.filter(
-            FoodLog.user_id == user_id,
-            func.date(FoodLog.consumed_at) >= start_date,
-            func.date(FoodLog.consumed_at) <= end_date
-        ).all()
+        # Per-day totals for the week
+        days_data = daily_totals(user_id, start_date, end_date)
         
         # Group by day
         daily_data = {}
         for i in range(7):
             current_date = start_date + timedelta(days=i)
             date_str = current_date.strftime('%Y-%m-%d')
-            
-            day_logs = [log for log in food_logs if log.consumed_at.date() == current_date]
-            daily_calories = sum(log.total_calories() for log in day_logs)
+            day = days_data.get(current_date)
             
             daily_data[date_str] = {
                 'date': date_str,
                 'day_name': current_date.strftime('%A'),
-                'calories': round(daily_calories, 2),
-                'food_count': len(day_logs)
+                'calories': round(day.calories, 2) if day else 0,
+                'food_count': day.item_count if day else 0
             }
         
         # Calculate weekly averages
-        total_calories = sum(log.total_calories() for log in food_logs)
-        total_proteins = sum(log.total_nutrients()['proteins'] for log in food_logs)
-        total_carbs = sum(log.total_nutrients()['carbs'] for log in food_logs)
-        total_fats = sum(log.total_nutrients()['fats'] for log in food_logs)
+        total_calories = sum(day.calories for day in days_data.values())
+        total_proteins = sum(day.proteins for day in days_data.values())
+        total_carbs = sum(day.carbs for day in days_data.values())
+        total_fats = sum(day.fats for day in days_data.values())
         
         days_with_data = len([day for day in daily_data.values() if day['calories'] > 0])
         
@@ -186,6 +190,8 @@ def get_weekly_analytics():
 
 @analytics_bp.route('/monthly', methods=['GET'])
 @jwt_required()
+@conditional_response
+@response_cache.cached
 def get_monthly_analytics():
     """Get monthly nutrition analytics"""
     try:
@@ -206,12 +212,8 @@ def get_monthly_analytics():
         else:
             end_date = date(year, month + 1, 1) - timedelta(days=1)
         
-        # Get all food logs for the month
-        food_logs = FoodLog.query.filter(
-            FoodLog.user_id == user_id,
-            func.date(FoodLog.consumed_at) >= start_date,
-            func.date(FoodLog.consumed_at) <= end_date
-        ).all()
+        # Per-day totals for the month
+        days_data = daily_totals(user_id, start_date, end_date)
         
         # Group by day
         days_in_month = (end_date - start_date).days + 1
@@ -220,31 +222,22 @@ def get_monthly_analytics():
         for i in range(days_in_month):
             current_date = start_date + timedelta(days=i)
             date_str = current_date.strftime('%Y-%m-%d')
-            
-            day_logs = [log for log in food_logs if log.consumed_at.date() == current_date]
-            daily_calories = sum(log.total_calories() for log in day_logs)
+            day = days_data.get(current_date)
             
             daily_data[date_str] = {
                 'date': date_str,
                 'day': current_date.day,
-                'calories': round(daily_calories, 2),
-                'food_count': len(day_logs)
+                'calories': round(day.calories, 2) if day else 0,
+                'food_count': day.item_count if day else 0
             }
         
         # Calculate monthly statistics
-        total_calories = sum(log.total_calories() for log in food_logs)
+        total_calories = sum(day.calories for day in days_data.values())
+        total_foods_logged = sum(day.item_count for day in days_data.values())
         days_with_data = len([day for day in daily_data.values() if day['calories'] > 0])
         
         # Most frequently logged foods
-        food_frequency = {}
-        for log in food_logs:
-            food_name = log.food_name
-            if food_name in food_frequency:
-                food_frequency[food_name] += 1
-            else:
-                food_frequency[food_name] = 1
-        
-        top_foods = sorted(food_frequency.items(), key=lambda x: x[1], reverse=True)[:10]
+        frequent_foods = top_foods(user_id, month_range(year, month), limit=10)
         
         response = {
             'month': f"{year}-{month:02d}",
@@ -256,9 +249,9 @@ def get_monthly_analytics():
                 'avg_daily_calories': round(total_calories / max(days_with_data, 1), 2),
                 'days_logged': days_with_data,
                 'total_days': days_in_month,
-                'total_foods_logged': len(food_logs)
+                'total_foods_logged': total_foods_logged
             },
-            'top_foods': [{'name': name, 'count': count} for name, count in top_foods]
+            'top_foods': [{'name': name, 'count': count} for name, count in frequent_foods]
         }
         
         return jsonify(response), 200
@@ -271,6 +264,8 @@ def get_monthly_analytics():
 
 @analytics_bp.route('/summary', methods=['GET'])
 @jwt_required()
+@conditional_response
+@response_cache.cached
 def get_summary():
     """Get overall user analytics summary"""
     try:
@@ -280,8 +275,9 @@ def get_summary():
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
-        # Get total stats
-        total_logs = FoodLog.query.filter_by(user_id=user_id).count()
+        # Every day with logs in one indexed query
+        days = logged_days(user_id)
+        total_logs = sum(day.item_count for day in days)
         
         if total_logs == 0:
             return jsonify({
@@ -290,16 +286,16 @@ def get_summary():
             }), 200
         
         # Get date range of logging
-        first_log = FoodLog.query.filter_by(user_id=user_id).order_by(FoodLog.consumed_at.asc()).first()
-        last_log = FoodLog.query.filter_by(user_id=user_id).order_by(FoodLog.consumed_at.desc()).first()
+        first_log_date = days[0].day
+        last_log_date = days[-1].day
         
-        days_since_start = (last_log.consumed_at.date() - first_log.consumed_at.date()).days + 1
+        days_since_start = (last_log_date - first_log_date).days + 1
         
         # Calculate unique days logged
-        unique_days = db.session.query(func.date(FoodLog.consumed_at)).filter_by(user_id=user_id).distinct().count()
+        unique_days = len(days)
         
         # Average calories per day (only counting days with logs)
-        total_calories = db.session.query(func.sum(FoodLog.calories * FoodLog.servings_consumed)).filter_by(user_id=user_id).scalar() or 0
+        total_calories = sum(day.calories for day in days)
         avg_daily_calories = total_calories / max(unique_days, 1)
         
         # Most common meal types
@@ -308,21 +304,8 @@ def get_summary():
             func.count(FoodLog.id)
         ).filter_by(user_id=user_id).group_by(FoodLog.meal_type).all()
         
-        # Streak calculation (consecutive days with logs)
-        current_streak = 0
-        today = date.today()
-        
-        for i in range(365):  # Check up to 1 year back
-            check_date = today - timedelta(days=i)
-            has_log = FoodLog.query.filter(
-                FoodLog.user_id == user_id,
-                func.date(FoodLog.consumed_at) == check_date
-            ).first()
-            
-            if has_log:
-                current_streak += 1
-            else:
-                break
+        # Streaks (consecutive days with logs)
+        current_streak, longest_streak = streaks([day.day for day in days], date.today())
         
         response = {
             'user_info': {
@@ -336,8 +319,9 @@ def get_summary():
                 'days_since_start': days_since_start,
                 'logging_frequency': round((unique_days / max(days_since_start, 1)) * 100, 1),
                 'current_streak': current_streak,
-                'first_log_date': first_log.consumed_at.strftime('%Y-%m-%d'),
-                'last_log_date': last_log.consumed_at.strftime('%Y-%m-%d')
+                'longest_streak': longest_streak,
+                'first_log_date': first_log_date.strftime('%Y-%m-%d'),
+                'last_log_date': last_log_date.strftime('%Y-%m-%d')
             },
             'nutrition_averages': {
                 'avg_daily_calories': round(avg_daily_calories, 2),
@@ -358,6 +342,8 @@ def get_summary():
 
 @analytics_bp.route('/progress', methods=['GET'])
 @jwt_required()
+@conditional_response
+@response_cache.cached
 def get_progress():
     """Get progress analytics over time"""
     try:
@@ -374,61 +360,65 @@ def get_progress():
         except ValueError:
             return jsonify({'error': 'Invalid period. Must be a number of days'}), 400
         
+        max_days = current_app.config.get('PROGRESS_MAX_PERIOD_DAYS', 3650)
+        if days < 1 or days > max_days:
+            return jsonify({'error': f'Invalid period. Must be between 1 and {max_days} days'}), 400
+        
+        # Series to include (daily_progress by default)
+        series = [name.strip() for name in request.args.get('series', ','.join(DEFAULT_SERIES)).split(',') if name.strip()]
+        unknown = [name for name in series if name not in SERIES]
+        if unknown:
+            return jsonify({
+                'error': f"Unknown series: {', '.join(unknown)}",
+                'available_series': SERIES
+            }), 400
+        
         # Calculate date range
         end_date = date.today()
         start_date = end_date - timedelta(days=days-1)
         
-        # Get food logs for the period
-        food_logs = FoodLog.query.filter(
-            FoodLog.user_id == user_id,
-            func.date(FoodLog.consumed_at) >= start_date,
-            func.date(FoodLog.consumed_at) <= end_date
-        ).order_by(FoodLog.consumed_at.asc()).all()
-        
-        # Group by date for trend analysis
-        daily_progress = {}
-        for i in range(days):
-            current_date = start_date + timedelta(days=i)
-            date_str = current_date.strftime('%Y-%m-%d')
-            
-            day_logs = [log for log in food_logs if log.consumed_at.date() == current_date]
+        # Per-day totals for the period as dense arrays
+        arrays = load_arrays(daily_totals(user_id, start_date, end_date), start_date, days)
+        logged = arrays['logged']
+        dates = date_labels(start_date, days)
+        
+        goal = user.daily_calorie_goal
+        goal_ratios, adherence = goal_adherence(arrays['calories'], logged, goal)
+        
+        progress_data = []
+        if 'daily' in series:
+            calories = arrays['calories'].tolist()
+            proteins = arrays['proteins'].tolist()
+            carbs = arrays['carbs'].tolist()
+            fats = arrays['fats'].tolist()
+            counts = arrays['item_count'].tolist()
+            ratios = goal_ratios.tolist()
             
-            if day_logs:
-                daily_calories = sum(log.total_calories() for log in day_logs)
-                daily_nutrients = {
-                    'proteins': sum(log.total_nutrients()['proteins'] for log in day_logs),
-                    'carbs': sum(log.total_nutrients()['carbs'] for log in day_logs),
-                    'fats': sum(log.total_nutrients()['fats'] for log in day_logs)
-                }
-                
-                # Calculate goal achievement
-                goal_achievement = 0
-                if user.daily_calorie_goal and user.daily_calorie_goal > 0:
-                    goal_achievement = round((daily_calories / user.daily_calorie_goal) * 100, 1)
-                
-                daily_progress[date_str] = {
-                    'date': date_str,
-                    'calories': round(daily_calories, 2),
-                    'proteins': round(daily_nutrients['proteins'], 2),
-                    'carbs': round(daily_nutrients['carbs'], 2),
-                    'fats': round(daily_nutrients['fats'], 2),
-                    'goal_achievement': goal_achievement,
-                    'food_count': len(day_logs)
-                }
-            else:
-                daily_progress[date_str] = {
-                    'date': date_str,
-                    'calories': 0,
-                    'proteins': 0,
-                    'carbs': 0,
-                    'fats': 0,
-                    'goal_achievement': 0,
-                    'food_count': 0
-                }
+            for i, date_str in enumerate(dates):
+                if counts[i]:
+                    progress_data.append({
+                        'date': date_str,
+                        'calories': round(calories[i], 2),
+                        'proteins': round(proteins[i], 2),
+                        'carbs': round(carbs[i], 2),
+                        'fats': round(fats[i], 2),
+                        'goal_achievement': round(ratios[i] * 100, 1) if adherence else 0,
+                        'food_count': counts[i]
+                    })
+                else:
+                    progress_data.append({
+                        'date': date_str,
+                        'calories': 0,
+                        'proteins': 0,
+                        'carbs': 0,
+                        'fats': 0,
+                        'goal_achievement': 0,
+                        'food_count': 0
+                    })
         
         # Calculate trends
-        progress_data = list(daily_progress.values())
-        calories_data = [day['calories'] for day in progress_data if day['calories'] > 0]
+        calories_data = [round(calories, 2) for calories in arrays['calories'][logged].tolist()]
+        calories_data = [calories for calories in calories_data if calories > 0]
         
         # Simple trend calculation (comparing first half vs second half)
         if len(calories_data) >= 4:
@@ -442,19 +432,41 @@ def get_progress():
             trend = "stable"
             trend_percentage = 0
         
+        # Requested series, aligned with the dates list
+        series_data = {}
+        if 'rolling_7' in series:
+            series_data['rolling_7'] = to_json_list(rolling_average(arrays['calories'], logged, 7))
+        if 'rolling_30' in series:
+            series_data['rolling_30'] = to_json_list(rolling_average(arrays['calories'], logged, 30))
+        if 'ewma' in series:
+            series_data['ewma'] = to_json_list(ewma(arrays['calories'], logged))
+        if 'adherence' in series:
+            series_data['adherence'] = to_json_list(goal_ratios * 100, 1)
+        if 'macros' in series:
+            daily_macros, period_macros = macro_percentages(arrays)
+            series_data['macros'] = {macro: to_json_list(values, 1) for macro, values in daily_macros.items()}
+            series_data['macros']['period'] = period_macros
+        if series_data:
+            series_data['dates'] = dates
+        
         response = {
             'period': f"{days} days",
             'start_date': start_date.strftime('%Y-%m-%d'),
             'end_date': end_date.strftime('%Y-%m-%d'),
-            'daily_progress': progress_data,
             'trend_analysis': {
                 'trend': trend,
                 'trend_percentage': trend_percentage,
                 'avg_daily_calories': round(sum(calories_data) / len(calories_data), 2) if calories_data else 0,
                 'days_with_data': len(calories_data),
-                'consistency_score': round((len(calories_data) / days) * 100, 1)
+                'consistency_score': round((len(calories_data) / days) * 100, 1),
+                'slope_calories_per_day': round(linear_slope(arrays['calories'], logged), 2),
+                'goal_adherence': adherence
             }
         }
+        if 'daily' in series:
+            response['daily_progress'] = progress_data
+        if series_data:
+            response['series'] = series_data
         
         return jsonify(response), 200
         
@@ -462,4 +474,17 @@ def get_progress():
         return jsonify({
             'error': 'Failed to get progress analytics', 
             'details': str(e)
-        }), 500
\ No newline at end of file
+        }), 500
+
+@analytics_bp.route('/cache-stats', methods=['GET'])
+@jwt_required()
+def get_analytics_cache_stats():
+    """Get size and per-endpoint hit ratios of the analytics response cache"""
+    try:
+        return jsonify(response_cache.stats()), 200
+        
+    except Exception as e:
+        return jsonify({
+            'error': 'Failed to get analytics cache stats', 
+            'details': str(e)
+        }), 500
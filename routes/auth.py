@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 from app import db
 from models.user import User
+from services.metrics_service import metrics
 from utils.validators import validate_email, validate_password
 
 auth_bp = Blueprint('auth', __name__)
@@ -40,7 +41,8 @@ def register():
             activity_level=data.get('activity_level', 'sedentary'),
             goal_type=data.get('goal_type', 'maintain')
         )
-        user.set_password(data['password'])
+        with metrics.timer('bcrypt', 'hash'):
+            user.set_password(data['password'])
         
         # Calculate daily calorie goal if profile info provided
         if user.weight and user.height and user.age and user.gender:
@@ -74,7 +76,11 @@ def login():
         # Find user by email
         user = User.query.filter_by(email=data['email'].lower().strip()).first()
         
-        if not user or not user.check_password(data['password']):
+        if not user:
+            return jsonify({'error': 'Invalid email or password'}), 401
+        with metrics.timer('bcrypt', 'check'):
+            password_matches = user.check_password(data['password'])
+        if not password_matches:
             return jsonify({'error': 'Invalid email or password'}), 401
         
         # Create access token
@@ -162,7 +168,9 @@ def change_password():
             return jsonify({'error': 'Missing current_password or new_password'}), 400
         
         # Verify current password
-        if not user.check_password(data['current_password']):
+        with metrics.timer('bcrypt', 'check'):
+            password_matches = user.check_password(data['current_password'])
+        if not password_matches:
             return jsonify({'error': 'Current password is incorrect'}), 401
         
         # Validate new password
@@ -171,7 +179,8 @@ def change_password():
             return jsonify({'error': password_validation['message']}), 400
         
         # Update password
-        user.set_password(data['new_password'])
+        with metrics.timer('bcrypt', 'hash'):
+            user.set_password(data['new_password'])
         db.session.commit()
         
         return jsonify({'message': 'Password changed successfully'}), 200
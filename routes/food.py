@@ -1,19 +1,103 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context, url_for
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from werkzeug.utils import secure_filename
 from app import db
 from models.user import User
 from models.food_log import FoodLog
 from models.custom_food import CustomFood
+from models.analysis_job import AnalysisJob
 from services.openai_service import OpenAIService
-from utils.helpers import save_uploaded_image
-import base64
+from services.job_service import job_runner, JobQueueFull
+from services.nutrition_service import nutrition_index
+from services.search_index import custom_food_index
+from services.rollup_service import add_log, add_log_rows, remove_log
+from services.version_service import bump_version, conditional_response
+from services.sync_service import record_deletion
+from services.export_service import EXPORT_FORMATS, export_rows, ndjson_chunks, csv_chunks, gzip_chunks
+from services.metrics_service import metrics
+from utils.validators import validate_nutritional_data
+from utils.helpers import (
+    allowed_file, day_range, decode_base64_image, filter_time_range, keyset_paginate,
+    process_food_image, save_processed_image
+)
 import json
+import os
+import time
 from datetime import datetime, date
 
 food_bp = Blueprint('food', __name__)
 openai_service = OpenAIService()
 
+def wants_async():
+    """Check if the client opted into background job mode"""
+    value = request.args.get('async') or request.form.get('async')
+    if value is None and request.is_json:
+        value = str((request.get_json(silent=True) or {}).get('async', ''))
+    return (value or '').lower() == 'true'
+
+def job_accepted_response(job):
+    """Build the 202 response returned when an analysis is queued"""
+    status_url = url_for('food.get_analysis_job', job_id=job.id)
+    response = jsonify({
+        'message': 'Analysis queued',
+        'job_id': job.id,
+        'status': job.status,
+        'status_url': status_url
+    })
+    response.headers['Location'] = status_url
+    return response, 202
+
+def process_image_upload(image_data):
+    """Run the shared decode-and-resize pipeline with the configured vision settings"""
+    with metrics.timer('image', 'process'):
+        return process_food_image(
+            image_data,
+            detail=current_app.config.get('VISION_DETAIL', 'auto'),
+            target_bytes=current_app.config.get('VISION_TARGET_BYTES', 250 * 1024)
+        )
+
+def run_image_analysis(processed_image, user_description, image_path, bypass_cache=False, user_id=None):
+    """Analyze a processed image and build the response payload"""
+    # Analyze image with OpenAI, reusing results for duplicate uploads
+    analysis_result, cache_info = openai_service.analyze_food_image_cached(
+        processed_image, user_description, bypass_cache, user_id
+    )
+    return image_analysis_response(analysis_result, cache_info, processed_image, image_path)
+
+def image_analysis_response(analysis_result, cache_info, processed_image, image_path):
+    """Response payload and status for an image analysis result"""
+    if 'error' in analysis_result:
+        return {
+            'error': 'Failed to analyze image',
+            'details': analysis_result['error']
+        }, 500
+    
+    # Format response for frontend
+    response = {
+        'analysis': analysis_result,
+        'suggestions': {
+            'food_name': analysis_result.get('food_name'),
+            'estimated_calories': analysis_result.get('nutrition', {}).get('calories'),
+            'confidence': analysis_result.get('confidence_score'),
+            'serving_description': analysis_result.get('serving_description')
+        },
+        'image_path': image_path,
+        'image_processing': processed_image['stats'],
+        'cache': cache_info
+    }
+    
+    return response, 200
+
+def image_analysis_job(image_path, user_description='', bypass_cache=False, user_id=None):
+    """Background job handler for image analysis"""
+    with open(os.path.join(os.getcwd(), image_path), 'rb') as image_file:
+        processed_image = process_image_upload(image_file.read())
+    return run_image_analysis(processed_image, user_description, image_path, bypass_cache, user_id)
+
+def recipe_analysis_job(recipe_text, servings=1):
+    """Background job handler for recipe analysis"""
+    return run_recipe_analysis(recipe_text, servings)
+
 @food_bp.route('/analyze-image', methods=['POST'])
 @jwt_required()
 def analyze_food_image():
@@ -26,6 +110,8 @@ def analyze_food_image():
             return jsonify({'error': 'No image provided'}), 400
         
         user_description = request.form.get('description', '')
+        bypass_cache = request.form.get('refresh', 'false').lower() == 'true'
+        run_async = wants_async()
         
         # Handle file upload or base64 image
         if 'image' in request.files:
@@ -33,38 +119,36 @@ def analyze_food_image():
             if image_file.filename == '':
                 return jsonify({'error': 'No image selected'}), 400
             
-            # Save image and get base64
-            image_path = save_uploaded_image(image_file, user_id)
+            if not allowed_file(image_file.filename):
+                raise ValueError("Invalid image file")
             image_data = image_file.read()
-            image_base64 = base64.b64encode(image_data).decode('utf-8')
         else:
             # Handle base64 image from mobile app
-            image_base64 = request.form.get('image_base64')
-            image_path = None
+            image_data = decode_base64_image(request.form.get('image_base64'))
         
-        # Analyze image with OpenAI
-        analysis_result = openai_service.analyze_food_image(image_base64, user_description)
+        # Decode and resize once; the result feeds both storage and the model
+        processed_image = process_image_upload(image_data)
         
-        if 'error' in analysis_result:
-            return jsonify({
-                'error': 'Failed to analyze image',
-                'details': analysis_result['error']
-            }), 500
+        # Uploaded files are always kept; background jobs read the image back from disk
+        if 'image' in request.files or run_async:
+            image_path = save_processed_image(processed_image, user_id)
+        else:
+            image_path = None
         
-        # Format response for frontend
-        response = {
-            'analysis': analysis_result,
-            'suggestions': {
-                'food_name': analysis_result.get('food_name'),
-                'estimated_calories': analysis_result.get('nutrition', {}).get('calories'),
-                'confidence': analysis_result.get('confidence_score'),
-                'serving_description': analysis_result.get('serving_description')
-            },
-            'image_path': image_path
-        }
+        if run_async:
+            job = job_runner.submit(user_id, 'analyze_image', {
+                'image_path': image_path,
+                'user_description': user_description,
+                'bypass_cache': bypass_cache,
+                'user_id': int(user_id)
+            })
+            return job_accepted_response(job)
         
-        return jsonify(response), 200
+        response, status_code = run_image_analysis(processed_image, user_description, image_path, bypass_cache, int(user_id))
+        return jsonify(response), status_code
         
+    except JobQueueFull as e:
+        return jsonify({'error': 'Analysis queue is full', 'details': str(e)}), 503
     except Exception as e:
         return jsonify({
             'error': 'Failed to analyze image', 
@@ -74,28 +158,36 @@ def analyze_food_image():
 @food_bp.route('/search', methods=['GET'])
 @jwt_required()
 def search_food():
-    """Search for food by name using OpenAI"""
+    """Search for food by name using the reference database, falling back to OpenAI"""
     try:
         query = request.args.get('q', '').strip()
         portion = request.args.get('portion', '')
+        bypass_cache = request.args.get('refresh', 'false').lower() == 'true'
         
         if not query:
             return jsonify({'error': 'Search query is required'}), 400
         
         # Search in user's custom foods first
         user_id = get_jwt_identity()
-        custom_foods = CustomFood.query.filter(
-            CustomFood.user_id == user_id,
-            CustomFood.name.ilike(f'%{query}%')
+        custom_foods = custom_food_index.filter(
+            CustomFood.query.filter(CustomFood.user_id == user_id), query, user_id, ranked=True
         ).limit(5).all()
         
-        # Get OpenAI analysis
-        ai_result = openai_service.search_food_by_name(query, portion)
+        # Try the local reference database before asking OpenAI
+        ai_result = None if bypass_cache else nutrition_index.lookup(query, portion)
+        if ai_result is not None:
+            source, cache_hit = 'reference', False
+        else:
+            # Get OpenAI analysis (served from the response cache when possible)
+            ai_result, cache_hit = openai_service.search_food_cached(query, portion, bypass_cache)
+            source = 'cache' if cache_hit else 'ai'
         
         response = {
             'query': query,
             'ai_result': ai_result,
-            'custom_foods': [food.to_dict() for food in custom_foods]
+            'custom_foods': [food.to_dict() for food in custom_foods],
+            'cached': cache_hit,
+            'source': source
         }
         
         return jsonify(response), 200
@@ -106,6 +198,89 @@ def search_food():
             'details': str(e)
         }), 500
 
+@food_bp.route('/search-batch', methods=['POST'])
+@jwt_required()
+def search_food_batch():
+    """Search for several foods at once, resolving all cache misses in one AI call"""
+    try:
+        data = request.get_json() or {}
+        raw_items = data.get('items')
+        bypass_cache = bool(data.get('refresh', False))
+        max_items = current_app.config.get('FOOD_SEARCH_BATCH_MAX_ITEMS', 20)
+        
+        if not isinstance(raw_items, list) or not raw_items:
+            return jsonify({'error': 'items must be a non-empty list'}), 400
+        
+        if len(raw_items) > max_items:
+            return jsonify({'error': f'At most {max_items} items can be searched at once'}), 400
+        
+        # Accept plain names or {"name": ..., "portion": ...} objects
+        items = []
+        for raw_item in raw_items:
+            if isinstance(raw_item, str):
+                name, portion = raw_item, ''
+            elif isinstance(raw_item, dict):
+                name, portion = raw_item.get('name', ''), raw_item.get('portion', '') or ''
+            else:
+                name, portion = '', ''
+            
+            if not str(name).strip():
+                return jsonify({'error': 'Every item needs a food name'}), 400
+            items.append((str(name).strip(), str(portion)))
+        
+        # Answer what the reference database knows, batch the rest
+        results = [None if bypass_cache else nutrition_index.lookup(name, portion) for name, portion in items]
+        sources = ['reference' if result is not None else None for result in results]
+        
+        remaining = [index for index, result in enumerate(results) if result is None]
+        if remaining:
+            batch_results = openai_service.search_foods_batch_cached(
+                [items[index] for index in remaining], bypass_cache
+            )
+            for index, (result, cache_hit) in zip(remaining, batch_results):
+                results[index] = result
+                sources[index] = 'cache' if cache_hit else 'ai'
+        
+        return jsonify({
+            'results': [
+                {
+                    'query': name,
+                    'portion': portion,
+                    'ai_result': result,
+                    'cached': source == 'cache',
+                    'source': source
+                }
+                for (name, portion), result, source in zip(items, results, sources)
+            ],
+            'total_count': len(items),
+            'cached_count': sources.count('cache'),
+            'reference_count': sources.count('reference')
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            'error': 'Batch search failed', 
+            'details': str(e)
+        }), 500
+
+@food_bp.route('/cache-stats', methods=['GET'])
+@jwt_required()
+def get_ai_cache_stats():
+    """Get hit/miss counters for the AI response caches"""
+    try:
+        return jsonify({
+            'search_cache': openai_service.search_cache.stats(),
+            'image_cache': openai_service.image_index.stats(),
+            'coalescing': openai_service.inflight.stats(),
+            'reference_index': nutrition_index.stats()
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            'error': 'Failed to get cache stats', 
+            'details': str(e)
+        }), 500
+
 @food_bp.route('/log', methods=['POST'])
 @jwt_required()
 def log_food():
@@ -142,6 +317,8 @@ def log_food():
         )
         
         db.session.add(food_log)
+        add_log(food_log)
+        bump_version(user_id)
         db.session.commit()
         
         return jsonify({
@@ -156,8 +333,132 @@ def log_food():
             'details': str(e)
         }), 500
 
+BATCH_TEXT_FIELDS = ['food_name', 'brand', 'barcode', 'meal_type', 'image_path']
+BATCH_NUMERIC_FIELDS = [
+    'serving_size', 'servings_consumed', 'calories', 'proteins', 'carbs', 'fats',
+    'fiber', 'sodium', 'sugars', 'confidence_score'
+]
+
+def build_food_log_row(user_id, entry):
+    """
+    Validate one batch entry and turn it into a food_log row.
+    Returns (row, errors); row is None when the entry is invalid.
+    """
+    if not isinstance(entry, dict):
+        return None, ['Entry must be an object']
+    
+    errors = [f'{field} is required' for field in ['food_name', 'serving_size', 'calories'] if entry.get(field) in (None, '')]
+    # JSON gives us any type; anything that would only fail at insert time must fail here
+    errors += [
+        f'{field} must be a string' for field in BATCH_TEXT_FIELDS
+        if entry.get(field) is not None and not isinstance(entry[field], str)
+    ]
+    errors += [f'{field} must be a valid number' for field in BATCH_NUMERIC_FIELDS if isinstance(entry.get(field), bool)]
+    if entry.get('confidence_score') is not None and not isinstance(entry['confidence_score'], bool):
+        try:
+            float(entry['confidence_score'])
+        except (ValueError, TypeError):
+            errors.append('confidence_score must be a valid number')
+    errors += [error for error in validate_nutritional_data(entry)['errors'] if error not in errors]
+    
+    servings_consumed = entry.get('servings_consumed', 1.0)
+    try:
+        servings_consumed = float(servings_consumed)
+        if servings_consumed <= 0:
+            errors.append('servings_consumed must be greater than 0')
+    except (ValueError, TypeError):
+        errors.append('servings_consumed must be a valid number')
+    
+    consumed_at = datetime.utcnow()
+    if entry.get('consumed_at'):
+        try:
+            consumed_at = datetime.fromisoformat(entry['consumed_at'])
+        except (ValueError, TypeError):
+            errors.append('consumed_at must be an ISO 8601 timestamp')
+    
+    if errors:
+        return None, errors
+    
+    return {
+        'user_id': user_id,
+        'food_name': entry['food_name'],
+        'brand': entry.get('brand'),
+        'barcode': entry.get('barcode'),
+        'serving_size': float(entry['serving_size']),
+        'servings_consumed': servings_consumed,
+        'calories': float(entry['calories']),
+        'proteins': float(entry.get('proteins') or 0),
+        'carbs': float(entry.get('carbs') or 0),
+        'fats': float(entry.get('fats') or 0),
+        'fiber': float(entry.get('fiber') or 0),
+        'sodium': float(entry.get('sodium') or 0),
+        'sugars': float(entry.get('sugars') or 0),
+        'meal_type': entry.get('meal_type', 'snack'),
+        'confidence_score': float(entry['confidence_score']) if entry.get('confidence_score') is not None else None,
+        'ai_analysis': json.dumps(entry.get('ai_analysis', {})),
+        'image_path': entry.get('image_path'),
+        'consumed_at': consumed_at
+    }, []
+
+@food_bp.route('/log/batch', methods=['POST'])
+@jwt_required()
+def log_food_batch():
+    """Log many food entries at once (e.g. replaying an offline queue)"""
+    try:
+        user_id = get_jwt_identity()
+        data = request.get_json()
+        
+        entries = data.get('entries') if isinstance(data, dict) else data
+        if not isinstance(entries, list) or not entries:
+            return jsonify({'error': 'entries must be a non-empty list'}), 400
+        
+        max_items = current_app.config.get('FOOD_LOG_BATCH_MAX_ITEMS', 500)
+        if len(entries) > max_items:
+            return jsonify({'error': f'At most {max_items} entries per batch'}), 400
+        
+        # Validate everything first, then insert the valid entries together
+        results = []
+        rows = []
+        for index, entry in enumerate(entries):
+            row, errors = build_food_log_row(user_id, entry)
+            result = {'index': index, 'client_id': entry.get('client_id') if isinstance(entry, dict) else None}
+            if row is None:
+                result.update({'status': 'error', 'errors': errors})
+            else:
+                result['status'] = 'created'
+                rows.append((result, row))
+            results.append(result)
+        
+        if rows:
+            inserted = db.session.execute(
+                db.insert(FoodLog).returning(FoodLog.id, sort_by_parameter_order=True),
+                [row for _, row in rows]
+            ).scalars().all()
+            for (result, _), food_log_id in zip(rows, inserted):
+                result['id'] = food_log_id
+            
+            # Rollups and the data version move once for the whole batch
+            add_log_rows([row for _, row in rows])
+            bump_version(user_id)
+            db.session.commit()
+        
+        return jsonify({
+            'message': f'Logged {len(rows)} of {len(entries)} entries',
+            'created': len(rows),
+            'failed': len(entries) - len(rows),
+            'results': results
+        }), 201 if rows else 400
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'error': 'Failed to log food batch', 
+            'details': str(e)
+        }), 500
+
 @food_bp.route('/logs', methods=['GET'])
 @jwt_required()
+@conditional_response
 def get_food_logs():
     """Get user's food logs with optional date filtering"""
     try:
@@ -166,7 +467,9 @@ def get_food_logs():
         # Parse query parameters
         date_str = request.args.get('date')  # YYYY-MM-DD format
         meal_type = request.args.get('meal_type')
-        limit = int(request.args.get('limit', 50))
+        limit = request.args.get('limit', 50)
+        cursor = request.args.get('cursor')
+        with_count = request.args.get('count', 'false').lower() == 'true'
         
         # Build query
         query = FoodLog.query.filter_by(user_id=user_id)
@@ -175,9 +478,7 @@ def get_food_logs():
         if date_str:
             try:
                 target_date = datetime.strptime(date_str, '%Y-%m-%d').date()
-                query = query.filter(
-                    db.func.date(FoodLog.consumed_at) == target_date
-                )
+                query = filter_time_range(query, FoodLog.consumed_at, day_range(target_date))
             except ValueError:
                 return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
         
@@ -185,8 +486,19 @@ def get_food_logs():
         if meal_type:
             query = query.filter_by(meal_type=meal_type)
         
-        # Order by consumption time (most recent first)
-        food_logs = query.order_by(FoodLog.consumed_at.desc()).limit(limit).all()
+        # Page by consumption time (most recent first), id breaks ties
+        try:
+            page = keyset_paginate(
+                query,
+                [(FoodLog.consumed_at, True), (FoodLog.id, True)],
+                cursor=cursor,
+                limit=limit,
+                max_limit=500,
+                with_count=with_count
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        food_logs = page['items']
         
         # Calculate daily totals if date is specified
         daily_totals = None
@@ -211,7 +523,15 @@ def get_food_logs():
         response = {
             'food_logs': [log.to_dict() for log in food_logs],
             'total_count': len(food_logs),
-            'daily_totals': daily_totals
+            'daily_totals': daily_totals,
+            'pagination': {
+                'limit': page['limit'],
+                'has_next': page['has_next'],
+                'has_prev': page['has_prev'],
+                'next_cursor': page['next_cursor'],
+                'prev_cursor': page['prev_cursor'],
+                'total': page['total']
+            }
         }
         
         return jsonify(response), 200
@@ -222,6 +542,46 @@ def get_food_logs():
             'details': str(e)
         }), 500
 
+@food_bp.route('/logs/export', methods=['GET'])
+@jwt_required()
+def export_food_logs():
+    """Stream the user's food log history as NDJSON or CSV"""
+    try:
+        user_id = get_jwt_identity()
+        
+        export_format = request.args.get('format', 'ndjson').lower()
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({'error': f"Invalid format. Use one of: {', '.join(EXPORT_FORMATS)}"}), 400
+        
+        # Optional inclusive date range
+        try:
+            start_date = datetime.strptime(request.args['start_date'], '%Y-%m-%d').date() if request.args.get('start_date') else None
+            end_date = datetime.strptime(request.args['end_date'], '%Y-%m-%d').date() if request.args.get('end_date') else None
+        except ValueError:
+            return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
+        if start_date and end_date and end_date < start_date:
+            return jsonify({'error': 'end_date must not be before start_date'}), 400
+        
+        compress = request.args.get('gzip', 'false').lower() == 'true'
+        
+        rows = export_rows(user_id, start_date, end_date)
+        chunks = ndjson_chunks(rows) if export_format == 'ndjson' else csv_chunks(rows)
+        if compress:
+            chunks = gzip_chunks(chunks)
+        
+        filename = f"food_logs.{export_format}{'.gz' if compress else ''}"
+        return Response(
+            stream_with_context(chunks),
+            mimetype='application/gzip' if compress else EXPORT_FORMATS[export_format],
+            headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+        )
+        
+    except Exception as e:
+        return jsonify({
+            'error': 'Failed to export food logs', 
+            'details': str(e)
+        }), 500
+
 @food_bp.route('/logs/<int:log_id>', methods=['DELETE'])
 @jwt_required()
 def delete_food_log(log_id):
@@ -233,7 +593,10 @@ def delete_food_log(log_id):
         if not food_log:
             return jsonify({'error': 'Food log not found'}), 404
         
+        remove_log(food_log)
+        record_deletion(user_id, 'food_log', food_log.id)
         db.session.delete(food_log)
+        bump_version(user_id)
         db.session.commit()
         
         return jsonify({'message': 'Food log deleted successfully'}), 200
@@ -262,6 +625,9 @@ def update_food_log(log_id):
             'servings_consumed', 'meal_type', 'consumed_at'
         ]
         
+        # Move the entry's old values out of its daily summary before changing it
+        remove_log(food_log)
+        
         for field in allowed_fields:
             if field in data:
                 if field == 'consumed_at':
@@ -269,6 +635,8 @@ def update_food_log(log_id):
                 else:
                     setattr(food_log, field, data[field])
         
+        add_log(food_log)
+        bump_version(user_id)
         db.session.commit()
         
         return jsonify({
@@ -314,6 +682,7 @@ def create_custom_food():
         )
         
         db.session.add(custom_food)
+        bump_version(user_id)
         db.session.commit()
         
         return jsonify({
@@ -328,6 +697,24 @@ def create_custom_food():
             'details': str(e)
         }), 500
 
+def run_recipe_analysis(recipe_text, servings=1):
+    """Analyze recipe text and build the response payload"""
+    # Analyze recipe with OpenAI (identical concurrent requests share one call)
+    analysis_result, _ = openai_service.analyze_recipe_coalesced(recipe_text, servings)
+    return recipe_analysis_response(analysis_result)
+
+def recipe_analysis_response(analysis_result):
+    """Response payload and status for a recipe analysis result"""
+    if 'error' in analysis_result:
+        return {
+            'error': 'Failed to analyze recipe',
+            'details': analysis_result['error']
+        }, 500
+    
+    return {
+        'recipe_analysis': analysis_result
+    }, 200
+
 @food_bp.route('/analyze-recipe', methods=['POST'])
 @jwt_required()
 def analyze_recipe():
@@ -341,21 +728,67 @@ def analyze_recipe():
         recipe_text = data['recipe_text']
         servings = data.get('servings', 1)
         
-        # Analyze recipe with OpenAI
-        analysis_result = openai_service.analyze_recipe(recipe_text, servings)
+        if wants_async():
+            job = job_runner.submit(get_jwt_identity(), 'analyze_recipe', {
+                'recipe_text': recipe_text,
+                'servings': servings
+            })
+            return job_accepted_response(job)
         
-        if 'error' in analysis_result:
-            return jsonify({
-                'error': 'Failed to analyze recipe',
-                'details': analysis_result['error']
-            }), 500
+        response, status_code = run_recipe_analysis(recipe_text, servings)
+        return jsonify(response), status_code
         
+    except JobQueueFull as e:
+        return jsonify({'error': 'Analysis queue is full', 'details': str(e)}), 503
+    except Exception as e:
         return jsonify({
-            'recipe_analysis': analysis_result
-        }), 200
+            'error': 'Failed to analyze recipe', 
+            'details': str(e)
+        }), 500
+
+@food_bp.route('/jobs/<job_id>', methods=['GET'])
+@jwt_required()
+def get_analysis_job(job_id):
+    """Get the status of a background analysis job, optionally as an event stream"""
+    try:
+        user_id = get_jwt_identity()
+        
+        job = AnalysisJob.query.filter_by(id=job_id, user_id=user_id).first()
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
+        
+        if request.args.get('stream', 'false').lower() != 'true':
+            return jsonify({'job': job.to_dict()}), 200
+        
+        poll_interval = current_app.config.get('JOB_STREAM_POLL_SECONDS', 1)
+        timeout = current_app.config.get('JOB_STREAM_TIMEOUT_SECONDS', 300)
+        
+        def generate():
+            # Server-sent events: emit on every status change until the job finishes
+            deadline = time.monotonic() + timeout
+            last_status = None
+            while True:
+                db.session.expire_all()
+                current = db.session.get(AnalysisJob, job_id)
+                if current is None:
+                    # Deleted while streaming (e.g. with the user's account)
+                    yield f"event: error\ndata: {json.dumps({'error': 'Job not found'})}\n\n"
+                    break
+                if current.status != last_status:
+                    last_status = current.status
+                    yield f"event: status\ndata: {json.dumps(current.to_dict())}\n\n"
+                if current.is_finished() or time.monotonic() > deadline:
+                    break
+                time.sleep(poll_interval)
+        
+        return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache'})
         
     except Exception as e:
         return jsonify({
-            'error': 'Failed to analyze recipe', 
+            'error': 'Failed to get job', 
             'details': str(e)
-        }), 500
\ No newline at end of file
+        }), 500
+
+job_runner.register('analyze_image', image_analysis_job)
+job_runner.register('analyze_recipe', recipe_analysis_job)
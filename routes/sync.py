@@ -0,0 +1,28 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from services.sync_service import changes_since, decode_sync_token
+
+sync_bp = Blueprint('sync', __name__)
+
+@sync_bp.route('', methods=['GET'])
+@jwt_required()
+def sync_changes():
+    """Get food logs and custom foods changed or deleted since a sync token"""
+    try:
+        user_id = get_jwt_identity()
+        
+        since = None
+        token = request.args.get('since')
+        if token:
+            try:
+                since = decode_sync_token(token)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+        
+        return jsonify(changes_since(user_id, since)), 200
+        
+    except Exception as e:
+        return jsonify({
+            'error': 'Failed to sync changes', 
+            'details': str(e)
+        }), 500
@@ -4,12 +4,17 @@ from app import db
 from models.user import User
 from models.food_log import FoodLog
 from models.custom_food import CustomFood
+from models.sync_tombstone import SyncTombstone
+from services.search_index import custom_food_index
 from utils.validators import validate_user_profile
+from utils.helpers import keyset_paginate
+from services.version_service import bump_version, conditional_response
 
 user_bp = Blueprint('user', __name__)
 
 @user_bp.route('/profile', methods=['GET'])
 @jwt_required()
+@conditional_response
 def get_user_profile():
     """Get detailed user profile with statistics"""
     try:
@@ -177,6 +182,7 @@ def update_user_goals():
 
 @user_bp.route('/custom-foods', methods=['GET'])
 @jwt_required()
+@conditional_response
 def get_user_custom_foods():
     """Get user's custom food items"""
     try:
@@ -185,8 +191,10 @@ def get_user_custom_foods():
         # Get query parameters
         category = request.args.get('category')
         search = request.args.get('search', '').strip()
-        sort_by = request.args.get('sort_by', 'usage_count')  # usage_count, name, created_at
-        limit = min(int(request.args.get('limit', 50)), 100)
+        sort_by = request.args.get('sort_by', 'usage_count')  # usage_count, name, created_at, relevance
+        limit = request.args.get('limit', 50)
+        cursor = request.args.get('cursor')
+        with_count = request.args.get('count', 'false').lower() == 'true'
         
         # Build query
         query = CustomFood.query.filter_by(user_id=user_id)
@@ -196,21 +204,47 @@ def get_user_custom_foods():
             query = query.filter(CustomFood.category.ilike(f'%{category}%'))
         
         if search:
-            query = query.filter(CustomFood.name.ilike(f'%{search}%'))
+            query = custom_food_index.filter(query, search, user_id, ranked=(sort_by == 'relevance'))
+        
+        # Relevance results are ranked by the search index and come as a single page
+        if sort_by == 'relevance' and search:
+            try:
+                limit = min(int(limit), 100)
+            except (ValueError, TypeError):
+                limit = 50
+            custom_foods = query.limit(limit).all()
+            
+            return jsonify({
+                'custom_foods': [food.to_dict() for food in custom_foods],
+                'total_count': len(custom_foods),
+                'pagination': None
+            }), 200
         
-        # Apply sorting
+        # Apply sorting, id breaks ties so cursors are stable
         if sort_by == 'name':
-            query = query.order_by(CustomFood.name.asc())
+            order_by = [(CustomFood.name, False), (CustomFood.id, False)]
         elif sort_by == 'created_at':
-            query = query.order_by(CustomFood.created_at.desc())
+            order_by = [(CustomFood.created_at, True), (CustomFood.id, True)]
         else:  # usage_count
-            query = query.order_by(CustomFood.usage_count.desc())
+            order_by = [(CustomFood.usage_count, True), (CustomFood.id, True)]
         
-        custom_foods = query.limit(limit).all()
+        try:
+            page = keyset_paginate(query, order_by, cursor=cursor, limit=limit, max_limit=100, with_count=with_count)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        custom_foods = page['items']
         
         return jsonify({
             'custom_foods': [food.to_dict() for food in custom_foods],
-            'total_count': len(custom_foods)
+            'total_count': len(custom_foods),
+            'pagination': {
+                'limit': page['limit'],
+                'has_next': page['has_next'],
+                'has_prev': page['has_prev'],
+                'next_cursor': page['next_cursor'],
+                'prev_cursor': page['prev_cursor'],
+                'total': page['total']
+            }
         }), 200
         
     except Exception as e:
@@ -270,7 +304,9 @@ def delete_user_account():
             }), 400
         
         # Delete user (cascade will handle food_logs and custom_foods)
+        SyncTombstone.query.filter_by(user_id=user.id).delete(synchronize_session=False)
         db.session.delete(user)
+        bump_version(user_id)
         db.session.commit()
         
         return jsonify({
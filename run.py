@@ -1,9 +1,14 @@
 #!/usr/bin/env python3
 """
-Run script for the Calorie Detection Flask Backend
+Run script for the Calorie Detection Flask Backend (development server).
+For production use gunicorn: gunicorn -c gunicorn.conf.py wsgi:app
 """
 
 import os
+
+# The development server resumes unfinished analysis jobs
+os.environ.setdefault('JOB_RESUME_ON_START', 'true')
+
 from dotenv import load_dotenv
 from app import create_app
 
@@ -28,12 +33,18 @@ if __name__ == '__main__':
     print("   - GET  /api/auth/profile - Get user profile")
     print("   - POST /api/food/analyze-image - Analyze food image")
     print("   - GET  /api/food/search - Search food by name")
+    print("   - POST /api/food/search-batch - Search several foods at once")
+    print("   - GET  /api/food/jobs/<id> - Background analysis job status")
     print("   - POST /api/food/log - Log consumed food")
+    print("   - POST /api/food/log/batch - Log many entries at once")
     print("   - GET  /api/food/logs - Get food logs")
+    print("   - GET  /api/food/logs/export - Stream log history as NDJSON or CSV")
+    print("   - GET  /api/sync?since=<token> - Changes since the last sync")
     print("   - GET  /api/analytics/daily/<date> - Daily analytics")
     print("   - GET  /api/analytics/weekly - Weekly analytics")
     print("   - GET  /api/analytics/summary - User summary")
     print("   - GET  /api/health - Health check")
+    print("   - GET  /api/metrics - Prometheus metrics (Bearer METRICS_TOKEN)")
     print("\n" + "="*50)
     
     app.run(
@@ -0,0 +1,86 @@
+from sqlalchemy import func
+from app import db
+from models.food_log import FoodLog
+from models.daily_summary import DailyNutritionSummary, MEAL_TYPES
+from utils.helpers import day_range, filter_time_range
+
+NUTRIENT_COLUMNS = ['calories', 'proteins', 'carbs', 'fats', 'fiber', 'sodium', 'sugars']
+MEAL_COLUMNS = [f'{meal_type}_{column}' for meal_type in MEAL_TYPES for column in ('calories', 'count')]
+DAILY_COLUMNS = ['calories', 'proteins', 'carbs', 'fats', 'item_count']
+
+def _summary_columns(columns):
+    return [getattr(DailyNutritionSummary, column) for column in columns]
+
+def day_totals(user_id, day):
+    """
+    Nutrient totals, item count and meal breakdown for one day as a single
+    row (attribute access by column name), or None when nothing was logged.
+    """
+    columns = NUTRIENT_COLUMNS + ['item_count'] + MEAL_COLUMNS
+    return db.session.query(*_summary_columns(columns)).filter(
+        DailyNutritionSummary.user_id == user_id,
+        DailyNutritionSummary.day == day
+    ).first()
+
+def daily_totals(user_id, start_date, end_date, columns=DAILY_COLUMNS):
+    """Per-day rows between two dates (inclusive) keyed by date; days without logs are absent"""
+    rows = db.session.query(DailyNutritionSummary.day, *_summary_columns(columns)).filter(
+        DailyNutritionSummary.user_id == user_id,
+        DailyNutritionSummary.day >= start_date,
+        DailyNutritionSummary.day <= end_date
+    ).order_by(DailyNutritionSummary.day).all()
+    return {row.day: row for row in rows}
+
+def meal_foods(user_id, day):
+    """Food names logged per meal type on one day, in logging order"""
+    foods = {meal_type: [] for meal_type in MEAL_TYPES}
+    rows = filter_time_range(
+        db.session.query(FoodLog.meal_type, FoodLog.food_name).filter(
+            FoodLog.user_id == user_id,
+            FoodLog.meal_type.in_(MEAL_TYPES)
+        ),
+        FoodLog.consumed_at,
+        day_range(day)
+    ).order_by(FoodLog.id).all()
+
+    for meal_type, food_name in rows:
+        foods[meal_type].append(food_name)
+    return foods
+
+def top_foods(user_id, time_range, limit=10):
+    """
+    Most frequently logged food names in a timestamp range as
+    (name, count) tuples. Ties keep the order the foods were first logged.
+    """
+    count = func.count(FoodLog.id)
+    query = db.session.query(FoodLog.food_name, count).filter(FoodLog.user_id == user_id)
+    query = filter_time_range(query, FoodLog.consumed_at, time_range)
+    rows = query.group_by(FoodLog.food_name).order_by(count.desc(), func.min(FoodLog.id)).limit(limit).all()
+    return [(name, total) for name, total in rows]
+
+def logged_days(user_id):
+    """(day, calories, item_count) rows for every day with logs, oldest first"""
+    return db.session.query(
+        DailyNutritionSummary.day,
+        DailyNutritionSummary.calories,
+        DailyNutritionSummary.item_count
+    ).filter(DailyNutritionSummary.user_id == user_id).order_by(DailyNutritionSummary.day).all()
+
+def streaks(days, today):
+    """
+    Current and longest runs of consecutive logged days from a sorted list
+    of dates (gaps and islands: consecutive days share day - position).
+    The current streak counts back from today and is 0 if today is empty.
+    """
+    current = longest = 0
+    island, length = None, 0
+
+    for position, day in enumerate(days):
+        key = day.toordinal() - position
+        length = length + 1 if key == island else 1
+        island = key
+        longest = max(longest, length)
+
+    if days and days[-1] == today:
+        current = length
+    return current, longest
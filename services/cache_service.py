@@ -0,0 +1,390 @@
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+from app import db
+from models.ai_cache import AICacheEntry
+from models.image_analysis import ImageAnalysis
+
+# Avoid a write on every hit: recency is only refreshed when it is older than this
+TOUCH_INTERVAL = timedelta(seconds=60)
+
+class AICache:
+    """
+    Persistent LRU cache for AI responses, stored in the application database
+    so entries survive process restarts and are shared between workers.
+    """
+
+    def __init__(self, namespace):
+        self.namespace = namespace
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return current_app.config.get('AI_CACHE_ENABLED', True)
+
+    @property
+    def evict_interval(self):
+        return max(1, current_app.config.get('AI_CACHE_EVICT_INTERVAL', 1))
+
+    @property
+    def ttl_seconds(self):
+        return current_app.config.get('AI_CACHE_TTL_SECONDS', 0)
+
+    @property
+    def max_entries(self):
+        return current_app.config.get('AI_CACHE_MAX_ENTRIES', 0)
+
+    def make_key(self, *parts):
+        """Build a stable cache key from already-normalized parts"""
+        raw = '\x1f'.join([self.namespace] + [str(part) for part in parts])
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _count(self, attribute):
+        with self._lock:
+            setattr(self, attribute, getattr(self, attribute) + 1)
+
+    def get(self, key):
+        """Return the cached value for key, or None on a miss"""
+        if not self.enabled:
+            return None
+
+        entry = AICacheEntry.query.filter_by(cache_key=key).first()
+
+        if not entry:
+            self._count('misses')
+            return None
+
+        if entry.is_expired(self.ttl_seconds):
+            # Bulk delete: a concurrent request may already have removed the row
+            AICacheEntry.query.filter_by(cache_key=key).delete(synchronize_session=False)
+            db.session.commit()
+            self._count('misses')
+            return None
+
+        now = datetime.utcnow()
+        if not entry.last_accessed_at or now - entry.last_accessed_at > TOUCH_INTERVAL:
+            entry.last_accessed_at = now
+            db.session.commit()
+
+        self._count('hits')
+        return json.loads(entry.payload)
+
+    def set(self, key, value):
+        """Store value under key, evicting least recently used entries every evict_interval writes"""
+        if not self.enabled:
+            return
+
+        try:
+            entry = AICacheEntry.query.filter_by(cache_key=key).first()
+            now = datetime.utcnow()
+
+            if entry:
+                entry.payload = json.dumps(value)
+                entry.created_at = now
+                entry.last_accessed_at = now
+            else:
+                db.session.add(AICacheEntry(
+                    namespace=self.namespace,
+                    cache_key=key,
+                    payload=json.dumps(value),
+                    created_at=now,
+                    last_accessed_at=now
+                ))
+
+            db.session.commit()
+        except IntegrityError:
+            # Another request stored the same key first
+            db.session.rollback()
+            return
+
+        # Counting and trimming the table on every write is wasted work; the
+        # namespace may overshoot the limit by up to evict_interval entries
+        with self._lock:
+            self._writes += 1
+            due = self._writes % self.evict_interval == 0
+        if due:
+            self.evict()
+
+    def evict(self):
+        """Drop expired entries and trim the namespace to the size limit"""
+        removed = 0
+
+        if self.ttl_seconds:
+            cutoff = datetime.utcnow() - timedelta(seconds=self.ttl_seconds)
+            removed += AICacheEntry.query.filter(
+                AICacheEntry.namespace == self.namespace,
+                AICacheEntry.created_at < cutoff
+            ).delete(synchronize_session=False)
+
+        if self.max_entries:
+            overflow = self.size() - self.max_entries
+            if overflow > 0:
+                stale_ids = [row.id for row in AICacheEntry.query.with_entities(AICacheEntry.id).filter_by(
+                    namespace=self.namespace
+                ).order_by(AICacheEntry.last_accessed_at.asc()).limit(overflow)]
+                removed += AICacheEntry.query.filter(
+                    AICacheEntry.id.in_(stale_ids)
+                ).delete(synchronize_session=False)
+
+        if removed:
+            db.session.commit()
+            with self._lock:
+                self.evictions += removed
+
+        return removed
+
+    def size(self):
+        return AICacheEntry.query.filter_by(namespace=self.namespace).count()
+
+    def clear(self):
+        """Remove every entry in this namespace"""
+        AICacheEntry.query.filter_by(namespace=self.namespace).delete(synchronize_session=False)
+        db.session.commit()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'namespace': self.namespace,
+            'enabled': self.enabled,
+            'entries': self.size(),
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl_seconds,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_ratio': round(self.hits / total, 3) if total else 0
+        }
+
+class ImageAnalysisIndex:
+    """
+    Deduplication index over analyzed images. Exact re-uploads are matched by
+    content hash; near-duplicates (re-encoded, resized or slightly cropped
+    copies) by Hamming distance between perceptual hashes. Stored analyses
+    expire and are evicted least recently used first, like AICache.
+
+    Exact matches are shared between users: the same bytes with the same
+    description always produce the same request. Near-duplicate matches
+    only consider the uploading user's own analyses.
+    """
+
+    def __init__(self):
+        self.exact_hits = 0
+        self.perceptual_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+        # (user_id, description_key) -> list of (dhash int, ImageAnalysis id)
+        self._hashes = {}
+        self._size = 0
+        self._last_id = 0
+        self._loaded_at = time.monotonic()
+
+    @property
+    def enabled(self):
+        return current_app.config.get('IMAGE_DEDUP_ENABLED', True)
+
+    @property
+    def max_distance(self):
+        return current_app.config.get('IMAGE_DEDUP_MAX_DISTANCE', 0)
+
+    @property
+    def ttl_seconds(self):
+        return current_app.config.get('IMAGE_DEDUP_TTL_SECONDS', 0)
+
+    @property
+    def max_entries(self):
+        return current_app.config.get('IMAGE_DEDUP_MAX_ENTRIES', 0)
+
+    @property
+    def evict_interval(self):
+        return max(1, current_app.config.get('AI_CACHE_EVICT_INTERVAL', 1))
+
+    @property
+    def resync_seconds(self):
+        return current_app.config.get('IMAGE_DEDUP_RESYNC_SECONDS', 300)
+
+    @staticmethod
+    def description_key(description):
+        normalized = ' '.join((description or '').lower().split())
+        return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+    def _reset(self):
+        with self._lock:
+            self._hashes = {}
+            self._size = 0
+            self._last_id = 0
+            self._loaded_at = time.monotonic()
+
+    def _sync(self):
+        """
+        Pull rows added since the last sync (including by other workers).
+        Rows evicted by other workers are dropped when a lookup finds them
+        missing, and the whole index is reloaded every resync_seconds so
+        evicted rows that never come up again don't stay in memory.
+        """
+        if time.monotonic() - self._loaded_at >= self.resync_seconds:
+            self._reset()
+
+        rows = db.session.query(
+            ImageAnalysis.id, ImageAnalysis.dhash, ImageAnalysis.user_id, ImageAnalysis.description_key
+        ).filter(ImageAnalysis.id > self._last_id).order_by(ImageAnalysis.id.asc()).all()
+
+        with self._lock:
+            for row_id, dhash, user_id, description_key in rows:
+                if row_id <= self._last_id:
+                    continue
+                if user_id is not None:
+                    self._hashes.setdefault((user_id, description_key), []).append((int(dhash, 16), row_id))
+                    self._size += 1
+                self._last_id = row_id
+
+    def _discard(self, key, row_id):
+        """Forget an id whose row is gone (evicted by another worker)"""
+        with self._lock:
+            candidates = self._hashes.get(key, [])
+            remaining = [candidate for candidate in candidates if candidate[1] != row_id]
+            self._size -= len(candidates) - len(remaining)
+            if remaining:
+                self._hashes[key] = remaining
+            else:
+                self._hashes.pop(key, None)
+
+    def _touch(self, entry):
+        now = datetime.utcnow()
+        if not entry.last_accessed_at or now - entry.last_accessed_at > TOUCH_INTERVAL:
+            entry.last_accessed_at = now
+            db.session.commit()
+
+    def _count(self, attribute):
+        with self._lock:
+            setattr(self, attribute, getattr(self, attribute) + 1)
+
+    def lookup(self, content_hash, dhash, description="", user_id=None):
+        """
+        Find a stored analysis for this image. Near-duplicates are only
+        matched among user_id's own analyses (none without a user).
+        Returns (result, match) where match describes the hit, or (None, None).
+        """
+        if not self.enabled:
+            return None, None
+
+        description_key = self.description_key(description)
+
+        entry = ImageAnalysis.query.filter_by(
+            content_hash=content_hash,
+            description_key=description_key
+        ).order_by(ImageAnalysis.id.desc()).first()
+        if entry and not entry.is_expired(self.ttl_seconds):
+            self._touch(entry)
+            self._count('exact_hits')
+            return json.loads(entry.result), {'match': 'exact', 'distance': 0, 'analysis_id': entry.id}
+
+        max_distance = self.max_distance
+        if max_distance > 0 and user_id is not None:
+            self._sync()
+            key = (int(user_id), description_key)
+            target = int(dhash, 16)
+            best = None
+
+            with self._lock:
+                candidates = list(self._hashes.get(key, []))
+
+            for candidate_hash, row_id in candidates:
+                distance = bin(target ^ candidate_hash).count('1')
+                if distance <= max_distance and (best is None or distance < best[0]):
+                    best = (distance, row_id)
+                    if distance == 0:
+                        break
+
+            if best:
+                entry = db.session.get(ImageAnalysis, best[1])
+                if entry is None:
+                    self._discard(key, best[1])
+                elif not entry.is_expired(self.ttl_seconds):
+                    self._touch(entry)
+                    self._count('perceptual_hits')
+                    return json.loads(entry.result), {
+                        'match': 'perceptual',
+                        'distance': best[0],
+                        'analysis_id': entry.id
+                    }
+
+        self._count('misses')
+        return None, None
+
+    def store(self, content_hash, dhash, description, result, user_id=None):
+        """Record a fresh analysis result for future lookups"""
+        if not self.enabled:
+            return
+
+        db.session.add(ImageAnalysis(
+            user_id=user_id,
+            content_hash=content_hash,
+            dhash=dhash,
+            description_key=self.description_key(description),
+            result=json.dumps(result)
+        ))
+        db.session.commit()
+
+        with self._lock:
+            self._writes += 1
+            due = self._writes % self.evict_interval == 0
+        if due:
+            self.evict()
+
+    def evict(self):
+        """Drop expired analyses and trim the table to the size limit"""
+        removed = 0
+
+        if self.ttl_seconds:
+            cutoff = datetime.utcnow() - timedelta(seconds=self.ttl_seconds)
+            removed += ImageAnalysis.query.filter(
+                ImageAnalysis.created_at < cutoff
+            ).delete(synchronize_session=False)
+
+        if self.max_entries:
+            overflow = self.size() - self.max_entries
+            if overflow > 0:
+                stale_ids = [row.id for row in ImageAnalysis.query.with_entities(ImageAnalysis.id).order_by(
+                    ImageAnalysis.last_accessed_at.asc()
+                ).limit(overflow)]
+                removed += ImageAnalysis.query.filter(
+                    ImageAnalysis.id.in_(stale_ids)
+                ).delete(synchronize_session=False)
+
+        if removed:
+            db.session.commit()
+            with self._lock:
+                self.evictions += removed
+            # Evicted ids may be anywhere in the in-memory index
+            self._reset()
+
+        return removed
+
+    def size(self):
+        return ImageAnalysis.query.count()
+
+    def stats(self):
+        total = self.exact_hits + self.perceptual_hits + self.misses
+        return {
+            'enabled': self.enabled,
+            'entries': self.size(),
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl_seconds,
+            'max_distance': self.max_distance,
+            'resync_seconds': self.resync_seconds,
+            'exact_hits': self.exact_hits,
+            'perceptual_hits': self.perceptual_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_ratio': round((self.exact_hits + self.perceptual_hits) / total, 3) if total else 0
+        }
@@ -0,0 +1,79 @@
+import csv
+import io
+import json
+import zlib
+from app import db
+from models.food_log import FoodLog
+from utils.helpers import day_range, filter_time_range
+
+EXPORT_COLUMNS = [
+    'id', 'food_name', 'brand', 'barcode', 'serving_size', 'servings_consumed',
+    'calories', 'proteins', 'carbs', 'fats', 'fiber', 'sodium', 'sugars',
+    'meal_type', 'confidence_score', 'image_path', 'consumed_at', 'created_at', 'updated_at'
+]
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+
+# Rows fetched per round trip and bytes buffered per yielded chunk
+FETCH_SIZE = 1000
+CHUNK_BYTES = 64 * 1024
+
+def export_rows(user_id, start_date=None, end_date=None):
+    """
+    Stream a user's food logs oldest first as plain rows (no ORM objects),
+    fetching FETCH_SIZE rows at a time from a server-side cursor.
+    """
+    query = db.session.query(*[getattr(FoodLog, column) for column in EXPORT_COLUMNS]).filter(FoodLog.user_id == user_id)
+    if start_date and end_date:
+        query = filter_time_range(query, FoodLog.consumed_at, day_range(start_date, (end_date - start_date).days + 1))
+    elif start_date:
+        query = query.filter(FoodLog.consumed_at >= day_range(start_date)[0])
+    elif end_date:
+        query = query.filter(FoodLog.consumed_at < day_range(end_date)[1])
+
+    query = query.order_by(FoodLog.consumed_at, FoodLog.id).execution_options(yield_per=FETCH_SIZE)
+    for row in query:
+        yield row
+
+def _serialize(value):
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+def ndjson_chunks(rows):
+    """One JSON object per line, yielded in ~CHUNK_BYTES pieces"""
+    buffer = []
+    size = 0
+    for row in rows:
+        line = json.dumps({column: _serialize(value) for column, value in zip(EXPORT_COLUMNS, row)}) + '\n'
+        buffer.append(line)
+        size += len(line)
+        if size >= CHUNK_BYTES:
+            yield ''.join(buffer).encode('utf-8')
+            buffer, size = [], 0
+    if buffer:
+        yield ''.join(buffer).encode('utf-8')
+
+def csv_chunks(rows):
+    """CSV with a header row, yielded in ~CHUNK_BYTES pieces"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for row in rows:
+        writer.writerow([_serialize(value) for value in row])
+        if buffer.tell() >= CHUNK_BYTES:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+def gzip_chunks(chunks, level=6):
+    """Compress a stream of byte chunks into a single gzip stream"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
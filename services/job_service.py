@@ -0,0 +1,164 @@
+import json
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from sqlalchemy import or_, and_
+from app import db
+from models.analysis_job import AnalysisJob
+
+class JobQueueFull(Exception):
+    """Raised when the background queue has no room for another job"""
+    pass
+
+class JobRunner:
+    """
+    Bounded worker pool for long-running AI analyses. Job state lives in the
+    database so queued and interrupted jobs are picked up again on restart.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self._handlers = {}
+        self._executor = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self._executor = ThreadPoolExecutor(
+            max_workers=app.config.get('JOB_WORKERS', 4),
+            thread_name_prefix='analysis-job'
+        )
+
+    def after_fork(self):
+        """
+        Give a forked server worker its own thread pool (threads don't survive
+        fork) and pick up any jobs left queued.
+        """
+        with self._lock:
+            self._pending = 0
+        self.init_app(self.app)
+        return self.resume_pending()
+
+    def register(self, job_type, handler):
+        """
+        Register a handler for a job type. Handlers are called with the job's
+        params as keyword arguments and return a (payload, status_code) tuple.
+        """
+        self._handlers[job_type] = handler
+
+    @property
+    def pending(self):
+        return self._pending
+
+    def submit(self, user_id, job_type, params):
+        """Persist a new job and schedule it; raises JobQueueFull when saturated"""
+        if job_type not in self._handlers:
+            raise ValueError(f"Unknown job type: {job_type}")
+
+        with self._lock:
+            if self._pending >= self.app.config.get('JOB_QUEUE_SIZE', 100):
+                raise JobQueueFull('Analysis queue is full, try again later')
+            self._pending += 1
+
+        try:
+            job = AnalysisJob(
+                id=uuid.uuid4().hex,
+                user_id=user_id,
+                job_type=job_type,
+                params=json.dumps(params),
+                status='queued'
+            )
+            db.session.add(job)
+            db.session.commit()
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+
+        self._executor.submit(self._run, job.id)
+        return job
+
+    def resume_pending(self):
+        """Reschedule jobs that were queued or abandoned mid-run by a previous process"""
+        stale_cutoff = datetime.utcnow() - timedelta(seconds=self.app.config.get('JOB_STALE_SECONDS', 600))
+
+        with self.app.app_context():
+            job_ids = [row.id for row in AnalysisJob.query.with_entities(AnalysisJob.id).filter(
+                or_(
+                    AnalysisJob.status == 'queued',
+                    and_(AnalysisJob.status == 'running', AnalysisJob.started_at < stale_cutoff)
+                )
+            ).all()]
+
+        for job_id in job_ids:
+            with self._lock:
+                self._pending += 1
+            self._executor.submit(self._run, job_id)
+
+        return len(job_ids)
+
+    def _claim(self, job_id):
+        """Atomically move a job to running so only one worker executes it"""
+        stale_cutoff = datetime.utcnow() - timedelta(seconds=self.app.config.get('JOB_STALE_SECONDS', 600))
+
+        claimed = AnalysisJob.query.filter(
+            AnalysisJob.id == job_id,
+            or_(
+                AnalysisJob.status == 'queued',
+                and_(AnalysisJob.status == 'running', AnalysisJob.started_at < stale_cutoff)
+            )
+        ).update({
+            'status': 'running',
+            'started_at': datetime.utcnow(),
+            'attempts': AnalysisJob.attempts + 1
+        }, synchronize_session=False)
+        db.session.commit()
+
+        return AnalysisJob.query.get(job_id) if claimed else None
+
+    def _run(self, job_id):
+        try:
+            with self.app.app_context():
+                job = self._claim(job_id)
+                if not job:
+                    return
+
+                try:
+                    if job.attempts > self.app.config.get('JOB_MAX_ATTEMPTS', 3):
+                        raise RuntimeError('Job exceeded maximum attempts')
+
+                    handler = self._handlers[job.job_type]
+                    payload, status_code = handler(**json.loads(job.params or '{}'))
+
+                    job.result = json.dumps(payload)
+                    job.status_code = status_code
+                    job.status = 'succeeded' if status_code < 400 else 'failed'
+                    if status_code >= 400:
+                        job.error = payload.get('details') or payload.get('error')
+                except Exception as e:
+                    db.session.rollback()
+                    job = AnalysisJob.query.get(job_id)
+                    job.status = 'failed'
+                    job.status_code = 500
+                    job.error = str(e)
+
+                job.finished_at = datetime.utcnow()
+                db.session.commit()
+                db.session.remove()
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def stats(self):
+        return {
+            'workers': self.app.config.get('JOB_WORKERS', 4) if self.app else 0,
+            'queue_size': self.app.config.get('JOB_QUEUE_SIZE', 100) if self.app else 0,
+            'pending': self._pending
+        }
+
+job_runner = JobRunner()
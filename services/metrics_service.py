@@ -0,0 +1,207 @@
+import threading
+import time
+from contextlib import contextmanager
+from flask import g, has_app_context, request
+from sqlalchemy import event
+
+METRIC_PREFIX = 'calorie_api_'
+
+# Seconds; request latency and per-stage (openai, image, bcrypt) timings
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _bucket_label(bound):
+    return f'le="{bound}"'
+
+class RequestMetrics:
+    """What one request spent its time on, for Server-Timing and the per-endpoint counters"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.stages = {}  # stage -> seconds
+
+class Metrics:
+    """
+    In-process request instrumentation exported in Prometheus text format.
+    Counts are per process; with several workers each one reports its own
+    series and Prometheus sums them.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = True
+        self.server_timing = False
+        self._lock = threading.Lock()
+        self._histograms = {}  # name -> (help, label names, buckets, {labels: [bucket counts, sum, count]})
+        self._counters = {}    # name -> (help, label names, {labels: value})
+        self._engines = set()
+
+        self._define_histogram('http_request_duration_seconds', 'Request latency by endpoint', ('endpoint', 'method'))
+        self._define_counter('http_requests_total', 'Requests by endpoint and status', ('endpoint', 'method', 'status'))
+        self._define_counter('db_statements_total', 'SQL statements executed while serving an endpoint', ('endpoint',))
+        self._define_counter('db_statement_seconds_total', 'Time spent in SQL statements by endpoint', ('endpoint',))
+        self._define_histogram('stage_duration_seconds', 'Time spent in OpenAI calls, image processing and password hashing', ('stage', 'operation'))
+        self._define_counter('openai_requests_total', 'OpenAI completions by operation and outcome', ('operation', 'outcome'))
+        self._define_counter('openai_tokens_total', 'OpenAI tokens reported in response usage', ('operation', 'type'))
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('METRICS_ENABLED', True)
+        self.server_timing = app.config.get('SERVER_TIMING_ENABLED', False)
+        if not self.enabled:
+            return
+
+        from app import db
+        with app.app_context():
+            self._watch_engine(db.engine)
+
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+
+    # Definitions and recording
+
+    def _define_histogram(self, name, help_text, label_names, buckets=LATENCY_BUCKETS):
+        self._histograms[METRIC_PREFIX + name] = (help_text, label_names, buckets, {})
+
+    def _define_counter(self, name, help_text, label_names):
+        self._counters[METRIC_PREFIX + name] = (help_text, label_names, {})
+
+    def observe(self, name, value, *labels):
+        if not self.enabled:
+            return
+        _, _, buckets, series = self._histograms[METRIC_PREFIX + name]
+        with self._lock:
+            entry = series.get(labels)
+            if entry is None:
+                entry = series[labels] = [[0] * len(buckets), 0.0, 0]
+            for index, bound in enumerate(buckets):
+                if value <= bound:
+                    entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def increment(self, name, *labels, amount=1):
+        if not self.enabled:
+            return
+        _, _, series = self._counters[METRIC_PREFIX + name]
+        with self._lock:
+            series[labels] = series.get(labels, 0) + amount
+
+    @staticmethod
+    def current_request():
+        """This request's accumulator, or None outside a request (background jobs, CLI)"""
+        return g.get('_request_metrics') if has_app_context() else None
+
+    @contextmanager
+    def timer(self, stage, operation=''):
+        """Time a block as a named stage of the current request"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.observe('stage_duration_seconds', elapsed, stage, operation)
+            current = self.current_request()
+            if current is not None:
+                current.stages[stage] = current.stages.get(stage, 0.0) + elapsed
+
+    def record_openai_usage(self, operation, response):
+        """Count tokens from a completion's usage block"""
+        usage = getattr(response, 'usage', None)
+        if usage is None:
+            return
+        for token_type in ('prompt_tokens', 'completion_tokens'):
+            tokens = getattr(usage, token_type, None)
+            if tokens:
+                self.increment('openai_tokens_total', operation, token_type.split('_')[0], amount=tokens)
+
+    # SQL
+
+    def _watch_engine(self, engine):
+        if engine in self._engines:
+            return
+        self._engines.add(engine)
+        event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+
+    @staticmethod
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._metrics_started = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, '_metrics_started', None)
+        current = self.current_request()
+        if started is None or current is None:
+            return
+        current.sql_count += 1
+        current.sql_seconds += time.perf_counter() - started
+
+    # Request hooks
+
+    def _start_request(self):
+        g._request_metrics = RequestMetrics()
+
+    def _finish_request(self, response):
+        current = g.pop('_request_metrics', None)
+        if current is None:
+            return response
+
+        elapsed = time.perf_counter() - current.started
+        endpoint = request.endpoint or 'unmatched'
+        self.observe('http_request_duration_seconds', elapsed, endpoint, request.method)
+        self.increment('http_requests_total', endpoint, request.method, str(response.status_code))
+        if current.sql_count:
+            self.increment('db_statements_total', endpoint, amount=current.sql_count)
+            self.increment('db_statement_seconds_total', endpoint, amount=current.sql_seconds)
+
+        if self.server_timing:
+            # Streamed bodies are still being generated, so app covers the view only
+            timings = [f'app;dur={elapsed * 1000:.1f}', f'db;dur={current.sql_seconds * 1000:.1f};desc="{current.sql_count} queries"']
+            timings.extend(f'{stage};dur={seconds * 1000:.1f}' for stage, seconds in current.stages.items())
+            response.headers['Server-Timing'] = ', '.join(timings)
+        return response
+
+    # Export
+
+    def render(self):
+        """All series in Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for name, (help_text, label_names, buckets, series) in self._histograms.items():
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} histogram')
+                for labels, (counts, total, count) in sorted(series.items()):
+                    for bound, bucket_count in zip(buckets, counts):
+                        lines.append(f'{name}_bucket{_labels(label_names, labels, _bucket_label(bound))} {bucket_count}')
+                    lines.append(f'{name}_bucket{_labels(label_names, labels, _bucket_label("+Inf"))} {count}')
+                    lines.append(f'{name}_sum{_labels(label_names, labels)} {total}')
+                    lines.append(f'{name}_count{_labels(label_names, labels)} {count}')
+
+            for name, (help_text, label_names, series) in self._counters.items():
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} counter')
+                for labels, value in sorted(series.items()):
+                    lines.append(f'{name}{_labels(label_names, labels)} {value}')
+
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        with self._lock:
+            for _, _, _, series in self._histograms.values():
+                series.clear()
+            for _, _, series in self._counters.values():
+                series.clear()
+
+metrics = Metrics()
@@ -0,0 +1,233 @@
+import csv
+import re
+import threading
+from bisect import bisect_left
+from app import db
+from models.reference_food import ReferenceFood
+
+NUTRIENTS = ['calories', 'proteins', 'carbs', 'fats', 'fiber', 'sodium', 'sugars']
+
+# Grams per unit for portions such as "150g" or "6 oz"
+PORTION_UNITS = {
+    'g': 1, 'gram': 1, 'grams': 1,
+    'kg': 1000,
+    'oz': 28.35, 'ounce': 28.35, 'ounces': 28.35,
+    'lb': 453.6, 'lbs': 453.6, 'pound': 453.6, 'pounds': 453.6
+}
+
+WEIGHT_PORTION = re.compile(r'^(\d+(?:\.\d+)?)\s*([a-z]+)$')
+SERVING_PORTION = re.compile(r'^(\d+(?:\.\d+)?)\s*(?:x|servings?|portions?)?$')
+
+def normalize_token(token):
+    """Reduce simple plurals so 'bananas' and 'banana' index the same"""
+    if len(token) > 4 and token.endswith('ies'):
+        return token[:-3] + 'y'
+    if len(token) > 4 and token.endswith('oes'):
+        return token[:-2]
+    if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+        return token[:-1]
+    return token
+
+def tokenize(text):
+    """Split text into normalized lowercase word tokens"""
+    return [normalize_token(token) for token in re.findall(r'[a-z0-9]+', (text or '').lower())]
+
+def parse_portion_grams(portion, serving_size_grams):
+    """
+    Turn a portion description into grams.
+    Supports weights ("150g", "6 oz") and serving counts ("2", "2 servings");
+    returns None for anything else so the caller can fall back to the AI.
+    """
+    portion = ' '.join((portion or '').lower().split())
+    if not portion:
+        return serving_size_grams
+
+    match = WEIGHT_PORTION.match(portion)
+    if match and match.group(2) in PORTION_UNITS:
+        return float(match.group(1)) * PORTION_UNITS[match.group(2)]
+
+    match = SERVING_PORTION.match(portion)
+    if match:
+        return float(match.group(1)) * serving_size_grams
+
+    return None
+
+class NutritionIndex:
+    """
+    In-memory token and prefix index over the reference nutrition table,
+    answering common food searches without calling OpenAI.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self._lock = threading.Lock()
+        self._foods = {}       # id -> plain dict of the reference row
+        self._variants = {}    # id -> list of token lists (name and aliases)
+        self._postings = {}    # token -> set of ids
+        self._tokens = []      # sorted tokens for prefix lookups
+        self.lookups = 0
+        self.matches = 0
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        with app.app_context():
+            if app.config.get('REFERENCE_FOODS_AUTO_IMPORT', True) and not ReferenceFood.query.first():
+                path = app.config.get('REFERENCE_FOODS_PATH')
+                if path:
+                    self.import_csv(path)
+                    return
+            self.load()
+
+    @property
+    def min_coverage(self):
+        return self.app.config.get('REFERENCE_MATCH_MIN_COVERAGE', 0.6) if self.app else 0.6
+
+    def load(self):
+        """Rebuild the in-memory index from the reference table"""
+        foods, variants, postings = {}, {}, {}
+
+        for food in ReferenceFood.query.all():
+            foods[food.id] = food.to_dict()
+            variants[food.id] = [tokenize(name) for name in [food.name] + food.alias_list()]
+            for tokens in variants[food.id]:
+                for token in tokens:
+                    postings.setdefault(token, set()).add(food.id)
+
+        # Swap in the new index at once so readers never see a partial build
+        with self._lock:
+            self._foods = foods
+            self._variants = variants
+            self._postings = postings
+            self._tokens = sorted(postings)
+
+        return len(foods)
+
+    def import_csv(self, path, replace=True):
+        """Bulk load a USDA-style CSV (values per 100g) and rebuild the index"""
+        rows = []
+        with open(path, newline='', encoding='utf-8') as csv_file:
+            for record in csv.DictReader(csv_file):
+                rows.append({
+                    'source': record.get('source') or 'usda',
+                    'source_id': record.get('source_id'),
+                    'name': record['name'].strip(),
+                    'aliases': record.get('aliases'),
+                    'category': record.get('category'),
+                    'meal_category': record.get('meal_category'),
+                    'serving_size_grams': float(record.get('serving_size_grams') or 100),
+                    'serving_description': record.get('serving_description'),
+                    **{
+                        f'{nutrient}_per_100g': float(record.get(nutrient) or 0)
+                        for nutrient in NUTRIENTS
+                    }
+                })
+
+        if replace:
+            ReferenceFood.query.delete()
+        if rows:
+            db.session.execute(db.insert(ReferenceFood), rows)
+        db.session.commit()
+
+        self.load()
+        return len(rows)
+
+    def _prefix_ids(self, prefix):
+        ids = set()
+        start = bisect_left(self._tokens, prefix)
+        for token in self._tokens[start:]:
+            if not token.startswith(prefix):
+                break
+            ids |= self._postings[token]
+        return ids
+
+    def search(self, query, limit=5):
+        """
+        Ranked matches for a query. All tokens must match exactly except the
+        last, which may be a prefix (for search-as-you-type).
+        Returns a list of (score, exact, food dict) tuples, best first.
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        with self._lock:
+            candidates = None
+            for token in tokens[:-1]:
+                ids = self._postings.get(token, set())
+                candidates = ids if candidates is None else candidates & ids
+            last_ids = self._prefix_ids(tokens[-1])
+            candidates = last_ids if candidates is None else candidates & last_ids
+
+            results = []
+            for food_id in candidates:
+                best_score, best_exact = 0, False
+                for variant in self._variants[food_id]:
+                    exact = all(token in variant for token in tokens)
+                    if not exact and not all(token in variant for token in tokens[:-1]):
+                        continue
+                    # Prefer names that consist of little more than the query
+                    score = len(tokens) / max(len(variant), len(tokens))
+                    if (exact, score) > (best_exact, best_score):
+                        best_score, best_exact = score, exact
+                if best_score:
+                    results.append((best_score, best_exact, self._foods[food_id]))
+
+        results.sort(key=lambda result: (result[1], result[0]), reverse=True)
+        return results[:limit]
+
+    def lookup(self, query, portion=''):
+        """
+        Return a confident reference match shaped like
+        OpenAIService.search_food_by_name, or None.
+        """
+        self.lookups += 1
+
+        for score, exact, food in self.search(query, limit=1):
+            if not exact or score < self.min_coverage:
+                return None
+
+            grams = parse_portion_grams(portion, food['serving_size_grams'])
+            if grams is None:
+                return None
+
+            self.matches += 1
+            return self.format_result(food, grams, portion)
+
+        return None
+
+    @staticmethod
+    def format_result(food, grams, portion=''):
+        multiplier = grams / 100.0
+        if portion and grams != food['serving_size_grams']:
+            serving_description = f"{round(grams, 1)} g"
+        else:
+            serving_description = food['serving_description']
+
+        return {
+            'food_name': food['name'],
+            'serving_size_grams': round(grams, 1),
+            'serving_description': serving_description,
+            'nutrition': {
+                nutrient: round((food[f'{nutrient}_per_100g'] or 0) * multiplier, 2)
+                for nutrient in NUTRIENTS
+            },
+            'confidence_score': 0.95,
+            'meal_category': food['meal_category'],
+            'common_brands': [],
+            'source': 'reference',
+            'reference_id': food['id']
+        }
+
+    def stats(self):
+        return {
+            'foods': len(self._foods),
+            'tokens': len(self._tokens),
+            'lookups': self.lookups,
+            'matches': self.matches,
+            'match_ratio': round(self.matches / self.lookups, 3) if self.lookups else 0
+        }
+
+nutrition_index = NutritionIndex()
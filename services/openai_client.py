@@ -0,0 +1,249 @@
+import random
+import threading
+import time
+import httpx
+import openai
+from dotenv import load_dotenv
+from services.metrics_service import metrics
+
+# Errors worth retrying: the request may succeed once upstream recovers
+RETRYABLE_ERRORS = (
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError
+)
+
+class CircuitOpenError(Exception):
+    """Raised when calls are rejected because upstream is degraded"""
+    pass
+
+class UpstreamBusyError(Exception):
+    """Raised when no concurrency slot frees up within the queue timeout"""
+    pass
+
+class CircuitBreaker:
+    """
+    Classic three-state breaker. After failure_threshold consecutive failures
+    it opens and rejects calls for reset_timeout seconds, then lets a single
+    trial call through (half-open) to decide whether to close again.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = None
+        self.times_opened = 0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Check if a call may proceed"""
+        with self._lock:
+            if self.state == 'closed':
+                return True
+
+            if self.state == 'open' and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = 'half_open'
+                self._trial_in_flight = False
+
+            if self.state == 'half_open' and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def cancel_trial(self):
+        """Give back a half-open trial slot that was never used"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                if self.state != 'open':
+                    self.times_opened += 1
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+    def stats(self):
+        retry_in = None
+        if self.state == 'open':
+            retry_in = round(max(0, self.reset_timeout - (time.monotonic() - self.opened_at)), 1)
+        return {
+            'state': self.state,
+            'consecutive_failures': self.failures,
+            'failure_threshold': self.failure_threshold,
+            'times_opened': self.times_opened,
+            'retry_in_seconds': retry_in
+        }
+
+class ResilientOpenAIClient:
+    """
+    Shared OpenAI client for all service calls: one pooled HTTP client,
+    per-operation timeouts, jittered exponential backoff, a circuit breaker
+    and a global cap on concurrent upstream requests.
+    """
+
+    def __init__(self, app=None):
+        self.config = {}
+        self.breaker = CircuitBreaker()
+        self._client = None
+        self._semaphore = None
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.waiting = 0
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        self.rejected = 0
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.config = {
+            'api_key': app.config.get('OPENAI_API_KEY'),
+            'timeouts': app.config.get('OPENAI_TIMEOUTS', {}),
+            'default_timeout': app.config.get('OPENAI_DEFAULT_TIMEOUT', 30),
+            'max_retries': app.config.get('OPENAI_MAX_RETRIES', 2),
+            'backoff_base': app.config.get('OPENAI_BACKOFF_BASE', 0.5),
+            'backoff_max': app.config.get('OPENAI_BACKOFF_MAX', 8),
+            'max_concurrency': app.config.get('OPENAI_MAX_CONCURRENCY', 8),
+            'queue_timeout': app.config.get('OPENAI_QUEUE_TIMEOUT', 10)
+        }
+        self.breaker = CircuitBreaker(
+            failure_threshold=app.config.get('OPENAI_BREAKER_THRESHOLD', 5),
+            reset_timeout=app.config.get('OPENAI_BREAKER_RESET_SECONDS', 30)
+        )
+        self._semaphore = threading.BoundedSemaphore(self.config['max_concurrency'])
+        self._client = None
+
+    @property
+    def client(self):
+        """Build the underlying client on first use, not at import time"""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    # Fall back to OPENAI_API_KEY from .env, as before
+                    load_dotenv()
+                    max_connections = self.config.get('max_concurrency', 8)
+                    self._client = openai.OpenAI(
+                        api_key=self.config.get('api_key'),
+                        max_retries=0,  # retries are handled here
+                        http_client=httpx.Client(limits=httpx.Limits(
+                            max_connections=max_connections,
+                            max_keepalive_connections=max_connections
+                        ))
+                    )
+        return self._client
+
+    def _count(self, attribute, delta=1):
+        with self._lock:
+            setattr(self, attribute, getattr(self, attribute) + delta)
+
+    def _backoff(self, attempt):
+        """Full-jitter exponential backoff"""
+        ceiling = min(self.config['backoff_max'], self.config['backoff_base'] * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+    def _acquire_slot(self):
+        self._count('waiting')
+        try:
+            acquired = self._semaphore.acquire(timeout=self.config['queue_timeout'])
+        finally:
+            self._count('waiting', -1)
+
+        if not acquired:
+            self._count('rejected')
+            raise UpstreamBusyError('Too many concurrent AI requests, try again later')
+        self._count('in_flight')
+
+    def _release_slot(self):
+        self._count('in_flight', -1)
+        self._semaphore.release()
+
+    def chat_completion(self, operation, **kwargs):
+        """Create a chat completion for the named operation (analyze_image, search_food, ...)"""
+        outcome = 'error'
+        try:
+            # Covers queueing, retries and backoff: what the caller waited for
+            with metrics.timer('openai', operation):
+                response = self._chat_completion(operation, **kwargs)
+            outcome = 'success'
+            metrics.record_openai_usage(operation, response)
+            return response
+        except (CircuitOpenError, UpstreamBusyError):
+            outcome = 'rejected'
+            raise
+        finally:
+            metrics.increment('openai_requests_total', operation, outcome)
+
+    def _chat_completion(self, operation, **kwargs):
+        if self._semaphore is None:
+            raise RuntimeError('ResilientOpenAIClient is not initialized')
+
+        timeout = self.config['timeouts'].get(operation, self.config['default_timeout'])
+        max_retries = self.config['max_retries']
+        self._count('calls')
+
+        for attempt in range(max_retries + 1):
+            if not self.breaker.allow():
+                self._count('rejected')
+                raise CircuitOpenError('AI service is temporarily unavailable')
+
+            try:
+                self._acquire_slot()
+            except UpstreamBusyError:
+                self.breaker.cancel_trial()
+                raise
+
+            try:
+                response = self.client.chat.completions.create(timeout=timeout, **kwargs)
+            except RETRYABLE_ERRORS:
+                self.breaker.record_failure()
+                if attempt == max_retries:
+                    self._count('failures')
+                    raise
+            except openai.APIStatusError:
+                # Client errors (bad request, auth) mean upstream itself is answering
+                self.breaker.record_success()
+                self._count('failures')
+                raise
+            except Exception:
+                self.breaker.record_failure()
+                self._count('failures')
+                raise
+            else:
+                self.breaker.record_success()
+                return response
+            finally:
+                self._release_slot()
+
+            self._count('retries')
+            time.sleep(self._backoff(attempt))
+
+    def stats(self):
+        return {
+            'circuit_breaker': self.breaker.stats(),
+            'in_flight': self.in_flight,
+            'queue_depth': self.waiting,
+            'max_concurrency': self.config.get('max_concurrency'),
+            'calls': self.calls,
+            'retries': self.retries,
+            'failures': self.failures,
+            'rejected': self.rejected
+        }
+
+openai_client = ResilientOpenAIClient()
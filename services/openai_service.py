@@ -1,18 +1,194 @@
-import openai
 import json
 import base64
-from io import BytesIO
-from PIL import Image
-import os
-from dotenv import load_dotenv
+import hashlib
+from services.openai_client import openai_client
+from services.singleflight import SingleFlight
+from services.cache_service import AICache, ImageAnalysisIndex
+from utils.helpers import clean_food_name, compute_image_hashes
+
+# JSON shape returned by food searches, shared by single and batch prompts
+FOOD_SEARCH_SCHEMA = """{
+                "food_name": "standardized food name",
+                "serving_size_grams": number,
+                "serving_description": "description of serving size",
+                "nutrition": {
+                    "calories": number,
+                    "proteins": number,
+                    "carbs": number,
+                    "fats": number,
+                    "fiber": number,
+                    "sodium": number,
+                    "sugars": number
+                },
+                "confidence_score": number between 0.1 and 1.0,
+                "meal_category": "breakfast/lunch/dinner/snack",
+                "common_brands": ["list", "of", "common", "brands"]
+            }"""
+
+def completion_text(response):
+    """Text of a completion with any markdown code fence removed"""
+    response_text = response.choices[0].message.content.strip()
+    if response_text.startswith('```json'):
+        response_text = response_text[7:-3]
+    elif response_text.startswith('```'):
+        response_text = response_text[3:-3]
+    return response_text
+
+def image_analysis_request(image_base64, user_description="", detail="high"):
+    """Completion arguments for analyzing a base64 JPEG"""
+    prompt = f"""
+    Analyze this food image carefully and provide detailed nutritional information.
+    
+    User description (if provided): {user_description}
+    
+    Please identify:
+    1. The specific food item(s) in the image
+    2. Estimated portion size/weight in grams
+    3. Detailed nutritional information per serving
+    
+    Respond ONLY with valid JSON in this exact format:
+    {{
+        "food_name": "specific food name",
+        "brand": "brand if identifiable, null otherwise",
+        "estimated_weight_grams": number,
+        "confidence_score": number between 0.1 and 1.0,
+        "nutrition": {{
+            "calories": number,
+            "proteins": number,
+            "carbs": number,
+            "fats": number,
+            "fiber": number,
+            "sodium": number,
+            "sugars": number
+        }},
+        "serving_description": "description of the portion",
+        "ingredients": ["list", "of", "likely", "ingredients"],
+        "meal_category": "breakfast/lunch/dinner/snack",
+        "analysis_notes": "any important observations"
+    }}
+    
+    BE VERY ACCURATE with nutritional values. If unsure, be conservative with estimates.
+    DO NOT include any text outside the JSON structure.
+    """
+
+    return dict(
+        model="gpt-4-vision-preview",
+        messages=[
+            {
+                "role": "user",
+                "content": [
+                    {"type": "text", "text": prompt},
+                    {
+                        "type": "image_url",
+                        "image_url": {
+                            "url": f"data:image/jpeg;base64,{image_base64}",
+                            "detail": detail
+                        }
+                    }
+                ]
+            }
+        ],
+        max_tokens=500,
+        temperature=0.1
+    )
+
+def food_search_request(food_name, portion_description=""):
+    """Completion arguments for a single food search"""
+    prompt = f"""
+    Provide detailed nutritional information for: {food_name}
+    Portion/serving description: {portion_description}
+    
+    If no specific portion is mentioned, assume a typical serving size.
+    
+    Respond ONLY with valid JSON in this exact format:
+    {FOOD_SEARCH_SCHEMA}
+    
+    BE ACCURATE with nutritional values based on USDA or other reliable sources.
+    DO NOT include any text outside the JSON structure.
+    """
+
+    return dict(
+        model="gpt-4",
+        messages=[{"role": "user", "content": prompt}],
+        max_tokens=400,
+        temperature=0.1
+    )
+
+def food_batch_search_request(items):
+    """Completion arguments for several (food_name, portion_description) searches at once"""
+    food_list = "\n".join(
+        f"{index + 1}. {name} | portion: {portion or 'typical serving'}"
+        for index, (name, portion) in enumerate(items)
+    )
+    
+    prompt = f"""
+    Provide detailed nutritional information for each of these {len(items)} foods:
+    {food_list}
+    
+    If no specific portion is mentioned, assume a typical serving size.
+    
+    Respond ONLY with a valid JSON array of exactly {len(items)} objects, in the
+    same order as the list, each in this exact format:
+    {FOOD_SEARCH_SCHEMA}
+    
+    BE ACCURATE with nutritional values based on USDA or other reliable sources.
+    DO NOT include any text outside the JSON array.
+    """
+
+    return dict(
+        model="gpt-4",
+        messages=[{"role": "user", "content": prompt}],
+        max_tokens=min(4000, 250 * len(items) + 100),
+        temperature=0.1
+    )
+
+def recipe_analysis_request(recipe_text, servings=1):
+    """Completion arguments for a recipe analysis"""
+    prompt = f"""
+    Analyze this recipe and calculate nutritional information per serving:
+    
+    Recipe: {recipe_text}
+    Number of servings: {servings}
+    
+    Respond ONLY with valid JSON in this exact format:
+    {{
+        "recipe_name": "recipe name",
+        "total_servings": {servings},
+        "per_serving_nutrition": {{
+            "calories": number,
+            "proteins": number,
+            "carbs": number,
+            "fats": number,
+            "fiber": number,
+            "sodium": number,
+            "sugars": number
+        }},
+        "ingredients_analyzed": ["list", "of", "main", "ingredients"],
+        "estimated_weight_per_serving": number,
+        "confidence_score": number between 0.1 and 1.0,
+        "cooking_notes": "any relevant cooking adjustments for calories"
+    }}
+    
+    Consider cooking methods that might affect caloric content.
+    DO NOT include any text outside the JSON structure.
+    """
+
+    return dict(
+        model="gpt-4",
+        messages=[{"role": "user", "content": prompt}],
+        max_tokens=500,
+        temperature=0.1
+    )
 
 class OpenAIService:
-    def __init__(self):
-        load_dotenv()
-        openai.api_key = os.environ.get('OPENAI_API_KEY')
-        self.client = openai.OpenAI()
+    def __init__(self, client=None):
+        # Shared resilient client; the underlying HTTP client is created on first use
+        self.client = client or openai_client
+        self.search_cache = AICache('food_search')
+        self.image_index = ImageAnalysisIndex()
+        self.inflight = SingleFlight()
     
-    def analyze_food_image(self, image_data, user_description=""):
+    def analyze_food_image(self, image_data, user_description="", detail="high"):
         """
         Analyze food image and return nutritional information
         """
@@ -23,70 +199,10 @@ class OpenAIService:
             else:
                 image_base64 = image_data
             
-            prompt = f"""
-            Analyze this food image carefully and provide detailed nutritional information.
-            
-            User description (if provided): {user_description}
-            
-            Please identify:
-            1. The specific food item(s) in the image
-            2. Estimated portion size/weight in grams
-            3. Detailed nutritional information per serving
-            
-            Respond ONLY with valid JSON in this exact format:
-            {{
-                "food_name": "specific food name",
-                "brand": "brand if identifiable, null otherwise",
-                "estimated_weight_grams": number,
-                "confidence_score": number between 0.1 and 1.0,
-                "nutrition": {{
-                    "calories": number,
-                    "proteins": number,
-                    "carbs": number,
-                    "fats": number,
-                    "fiber": number,
-                    "sodium": number,
-                    "sugars": number
-                }},
-                "serving_description": "description of the portion",
-                "ingredients": ["list", "of", "likely", "ingredients"],
-                "meal_category": "breakfast/lunch/dinner/snack",
-                "analysis_notes": "any important observations"
-            }}
-            
-            BE VERY ACCURATE with nutritional values. If unsure, be conservative with estimates.
-            DO NOT include any text outside the JSON structure.
-            """
-            
-            response = self.client.chat.completions.create(
-                model="gpt-4-vision-preview",
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {"type": "text", "text": prompt},
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:image/jpeg;base64,{image_base64}",
-                                    "detail": "high"
-                                }
-                            }
-                        ]
-                    }
-                ],
-                max_tokens=500,
-                temperature=0.1
-            )
+            response = self.client.chat_completion('analyze_image', **image_analysis_request(image_base64, user_description, detail))
             
             # Parse the JSON response
-            response_text = response.choices[0].message.content.strip()
-            
-            # Clean up response (remove any markdown formatting)
-            if response_text.startswith('```json'):
-                response_text = response_text[7:-3]
-            elif response_text.startswith('```'):
-                response_text = response_text[3:-3]
+            response_text = completion_text(response)
             
             return json.loads(response_text)
             
@@ -102,54 +218,37 @@ class OpenAIService:
                 "details": str(e)
             }
     
+    def analyze_food_image_cached(self, processed_image, user_description="", bypass_cache=False, user_id=None):
+        """
+        Analyze a processed food image (see utils.helpers.process_food_image),
+        reusing stored results for exact and near-duplicate images.
+        Returns a (result, cache_info) tuple; failed analyses are never stored.
+        """
+        content_hash, dhash = compute_image_hashes(
+            processed_image['original_bytes'], processed_image['image']
+        )
+        
+        if not bypass_cache:
+            cached, match = self.image_index.lookup(content_hash, dhash, user_description, user_id)
+            if cached is not None:
+                return cached, dict(hit=True, **match)
+        
+        result = self.analyze_food_image(
+            processed_image['model_base64'], user_description, processed_image['detail']
+        )
+        if 'error' not in result:
+            self.image_index.store(content_hash, dhash, user_description, result, user_id)
+        
+        return result, {'hit': False}
+    
     def search_food_by_name(self, food_name, portion_description=""):
         """
         Get nutritional information for a food item by name
         """
         try:
-            prompt = f"""
-            Provide detailed nutritional information for: {food_name}
-            Portion/serving description: {portion_description}
+            response = self.client.chat_completion('search_food', **food_search_request(food_name, portion_description))
             
-            If no specific portion is mentioned, assume a typical serving size.
-            
-            Respond ONLY with valid JSON in this exact format:
-            {{
-                "food_name": "standardized food name",
-                "serving_size_grams": number,
-                "serving_description": "description of serving size",
-                "nutrition": {{
-                    "calories": number,
-                    "proteins": number,
-                    "carbs": number,
-                    "fats": number,
-                    "fiber": number,
-                    "sodium": number,
-                    "sugars": number
-                }},
-                "confidence_score": number between 0.1 and 1.0,
-                "meal_category": "breakfast/lunch/dinner/snack",
-                "common_brands": ["list", "of", "common", "brands"]
-            }}
-            
-            BE ACCURATE with nutritional values based on USDA or other reliable sources.
-            DO NOT include any text outside the JSON structure.
-            """
-            
-            response = self.client.chat.completions.create(
-                model="gpt-4",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=400,
-                temperature=0.1
-            )
-            
-            response_text = response.choices[0].message.content.strip()
-            
-            # Clean up response
-            if response_text.startswith('```json'):
-                response_text = response_text[7:-3]
-            elif response_text.startswith('```'):
-                response_text = response_text[3:-3]
+            response_text = completion_text(response)
             
             return json.loads(response_text)
             
@@ -164,54 +263,111 @@ class OpenAIService:
                 "details": str(e)
             }
     
-    def analyze_recipe(self, recipe_text, servings=1):
+    def search_cache_key(self, food_name, portion_description=""):
+        """Cache key for a search, based on the normalized name and portion"""
+        return self.search_cache.make_key(
+            clean_food_name(food_name).lower(),
+            ' '.join((portion_description or '').lower().split())
+        )
+    
+    def search_food_cached(self, food_name, portion_description="", bypass_cache=False):
         """
-        Analyze a recipe and calculate nutritional information per serving
+        Search food by name through the persistent response cache.
+        Returns a (result, cache_hit) tuple; failed lookups are never cached.
+        """
+        cache_key = self.search_cache_key(food_name, portion_description)
+        
+        if not bypass_cache:
+            cached = self.search_cache.get(cache_key)
+            if cached is not None:
+                return cached, True
+        
+        def lookup():
+            result = self.search_food_by_name(food_name, portion_description)
+            if 'error' not in result:
+                self.search_cache.set(cache_key, result)
+            return result
+        
+        # Concurrent identical searches share one upstream call
+        result, _ = self.inflight.do(('search_food', cache_key), lookup)
+        return result, False
+    
+    def search_foods_batch(self, items):
+        """
+        Get nutritional information for several foods in a single completion.
+        items is a list of (food_name, portion_description) tuples; returns a
+        list of results in the same order, each shaped like search_food_by_name.
         """
         try:
-            prompt = f"""
-            Analyze this recipe and calculate nutritional information per serving:
+            response = self.client.chat_completion('search_food_batch', **food_batch_search_request(items))
             
-            Recipe: {recipe_text}
-            Number of servings: {servings}
+            response_text = completion_text(response)
             
-            Respond ONLY with valid JSON in this exact format:
-            {{
-                "recipe_name": "recipe name",
-                "total_servings": {servings},
-                "per_serving_nutrition": {{
-                    "calories": number,
-                    "proteins": number,
-                    "carbs": number,
-                    "fats": number,
-                    "fiber": number,
-                    "sodium": number,
-                    "sugars": number
-                }},
-                "ingredients_analyzed": ["list", "of", "main", "ingredients"],
-                "estimated_weight_per_serving": number,
-                "confidence_score": number between 0.1 and 1.0,
-                "cooking_notes": "any relevant cooking adjustments for calories"
-            }}
+            results = json.loads(response_text)
+            if not isinstance(results, list):
+                raise json.JSONDecodeError("Expected a JSON array", response_text, 0)
             
-            Consider cooking methods that might affect caloric content.
-            DO NOT include any text outside the JSON structure.
-            """
+            # Pad or trim so every item gets an answer
+            results = results[:len(items)]
+            while len(results) < len(items):
+                results.append({"error": "Missing from AI response"})
             
-            response = self.client.chat.completions.create(
-                model="gpt-4",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=500,
-                temperature=0.1
-            )
+            return results
             
-            response_text = response.choices[0].message.content.strip()
+        except json.JSONDecodeError as e:
+            error = {"error": "Failed to parse AI response", "details": str(e)}
+        except Exception as e:
+            error = {"error": "Failed to search food", "details": str(e)}
+        
+        return [dict(error) for _ in items]
+    
+    def search_foods_batch_cached(self, items, bypass_cache=False):
+        """
+        Resolve a list of (food_name, portion_description) tuples, answering
+        cached items locally and sending all misses in one batch completion.
+        Returns a list of (result, cache_hit) tuples in input order.
+        """
+        keys = [self.search_cache_key(name, portion) for name, portion in items]
+        resolved = {}
+        
+        if not bypass_cache:
+            for key in set(keys):
+                cached = self.search_cache.get(key)
+                if cached is not None:
+                    resolved[key] = (cached, True)
+        
+        # Identical misses are only asked for once
+        misses = {}
+        for key, item in zip(keys, items):
+            if key not in resolved and key not in misses:
+                misses[key] = item
+        
+        if misses:
+            results = self.search_foods_batch(list(misses.values()))
+            for key, result in zip(misses.keys(), results):
+                if 'error' not in result:
+                    self.search_cache.set(key, result)
+                resolved[key] = (result, False)
+        
+        return [resolved[key] for key in keys]
+    
+    def analyze_recipe_coalesced(self, recipe_text, servings=1):
+        """
+        Analyze a recipe, sharing one upstream call between concurrent
+        identical requests. Returns a (result, coalesced) tuple.
+        """
+        normalized = ' '.join((recipe_text or '').lower().split())
+        key = hashlib.sha256(f"{normalized}\x1f{servings}".encode('utf-8')).hexdigest()
+        return self.inflight.do(('analyze_recipe', key), lambda: self.analyze_recipe(recipe_text, servings))
+    
+    def analyze_recipe(self, recipe_text, servings=1):
+        """
+        Analyze a recipe and calculate nutritional information per serving
+        """
+        try:
+            response = self.client.chat_completion('analyze_recipe', **recipe_analysis_request(recipe_text, servings))
             
-            # Clean up response
-            if response_text.startswith('```json'):
-                response_text = response_text[7:-3]
-            elif response_text.startswith('```'):
-                response_text = response_text[3:-3]
+            response_text = completion_text(response)
             
             return json.loads(response_text)
             
@@ -219,4 +375,4 @@ class OpenAIService:
             return {
                 "error": "Failed to analyze recipe",
                 "details": str(e)
-            }
\ No newline at end of file
+            }
@@ -0,0 +1,146 @@
+import threading
+from collections import OrderedDict
+from datetime import date
+from functools import wraps
+from flask import current_app, g, request
+from flask_jwt_extended import get_jwt_identity
+
+# Rough per-entry bookkeeping cost on top of the body (key tuple, dict slots)
+ENTRY_OVERHEAD_BYTES = 256
+
+class ResponseCache:
+    """
+    In-process LRU cache of JSON response bodies, bounded by total bytes.
+    Keys include the user's data version, so a write anywhere (even in
+    another worker) makes older entries unreachable; writes in this process
+    also drop the user's entries right away to free the memory.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = True
+        self.max_bytes = 32 * 1024 * 1024
+        self._entries = OrderedDict()  # key -> body bytes
+        self._user_keys = {}           # user_id -> set of keys
+        self._lock = threading.Lock()
+        self.size_bytes = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._endpoint_stats = {}      # endpoint -> [hits, misses]
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('ANALYTICS_CACHE_ENABLED', True)
+        self.max_bytes = app.config.get('ANALYTICS_CACHE_MAX_BYTES', self.max_bytes)
+
+    @staticmethod
+    def _entry_size(body):
+        return len(body) + ENTRY_OVERHEAD_BYTES
+
+    def _record(self, endpoint, hit):
+        counters = self._endpoint_stats.setdefault(endpoint, [0, 0])
+        counters[0 if hit else 1] += 1
+
+    def get(self, key):
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            self._record(key[1], body is not None)
+            return body
+
+    def set(self, key, body):
+        size = self._entry_size(body)
+        # One response should never push out most of the cache
+        if size > self.max_bytes // 4:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self.size_bytes -= self._entry_size(self._entries.pop(key))
+            self._entries[key] = body
+            self._user_keys.setdefault(key[0], set()).add(key)
+            self.size_bytes += size
+
+            while self.size_bytes > self.max_bytes and self._entries:
+                old_key, old_body = self._entries.popitem(last=False)
+                self.size_bytes -= self._entry_size(old_body)
+                self._forget_user_key(old_key)
+                self.evictions += 1
+
+    def _forget_user_key(self, key):
+        keys = self._user_keys.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._user_keys[key[0]]
+
+    def invalidate_user(self, user_id):
+        """Drop every cached response for a user"""
+        with self._lock:
+            for key in self._user_keys.pop(int(user_id), ()):
+                body = self._entries.pop(key, None)
+                if body is not None:
+                    self.size_bytes -= self._entry_size(body)
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._user_keys.clear()
+            self.size_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            endpoints = {
+                endpoint: {
+                    'hits': hits,
+                    'misses': misses,
+                    'hit_ratio': round(hits / (hits + misses), 3) if hits + misses else 0
+                }
+                for endpoint, (hits, misses) in self._endpoint_stats.items()
+            }
+            return {
+                'enabled': self.enabled,
+                'entries': len(self._entries),
+                'size_bytes': self.size_bytes,
+                'max_bytes': self.max_bytes,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'endpoints': endpoints
+            }
+
+    def cached(self, view):
+        """
+        Serve a JSON view from the cache, keyed by user, endpoint, sorted
+        query parameters, today's date and the user's data version.
+        Only 200 responses are stored. Apply below @conditional_response.
+        """
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not self.enabled:
+                return view(*args, **kwargs)
+
+            from services.version_service import get_version
+
+            user_id = int(get_jwt_identity())
+            version = g.get('data_version')
+            if version is None:
+                version = get_version(user_id)
+
+            params = tuple(sorted(request.args.items(multi=True))) + tuple(sorted(kwargs.items()))
+            key = (user_id, request.endpoint, params, date.today().isoformat(), version)
+
+            body = self.get(key)
+            if body is not None:
+                return current_app.response_class(body, status=200, mimetype='application/json')
+
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                self.set(key, response.get_data())
+            return response
+
+        return wrapper
+
+response_cache = ResponseCache()
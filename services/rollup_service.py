@@ -0,0 +1,192 @@
+from datetime import date, datetime
+from types import SimpleNamespace
+from sqlalchemy import case, func
+from app import db
+from models.food_log import FoodLog
+from models.daily_summary import DailyNutritionSummary, MEAL_TYPES
+from utils.helpers import safe_float
+from utils.schema import upsert_statement
+
+NUTRIENTS = ['calories', 'proteins', 'carbs', 'fats', 'fiber', 'sodium', 'sugars']
+COUNTERS = ['item_count'] + [f'{meal_type}_count' for meal_type in MEAL_TYPES]
+FLOAT_COLUMNS = NUTRIENTS + [f'{meal_type}_calories' for meal_type in MEAL_TYPES]
+
+# Totals are rebuilt from the same float columns in a different order, so
+# allow a little rounding drift before calling a row inconsistent
+TOLERANCE = 0.01
+
+def _empty_delta():
+    delta = {column: 0.0 for column in FLOAT_COLUMNS}
+    delta.update({column: 0 for column in COUNTERS})
+    return delta
+
+def log_contribution(food_log):
+    """Return the (user_id, day, delta) a food log adds to its daily summary"""
+    # Request values may still be strings such as "200"; non-numeric values
+    # count as 0, as they do in aggregate_from_logs
+    multiplier = safe_float(food_log.servings_consumed) if food_log.servings_consumed is not None else 1.0
+    consumed_at = food_log.consumed_at or datetime.utcnow()
+
+    delta = _empty_delta()
+    for nutrient in NUTRIENTS:
+        delta[nutrient] = safe_float(getattr(food_log, nutrient)) * multiplier
+    delta['item_count'] = 1
+    if food_log.meal_type in MEAL_TYPES:
+        delta[f'{food_log.meal_type}_calories'] = delta['calories']
+        delta[f'{food_log.meal_type}_count'] = 1
+
+    return int(food_log.user_id), consumed_at.date(), delta
+
+def apply_deltas(deltas):
+    """
+    Add per-day deltas to the summary table inside the current transaction.
+    deltas maps (user_id, day) to a dict of column increments (negative to
+    subtract). The increment runs in SQL so concurrent writers for the same
+    day never lose an update.
+    """
+    if not deltas:
+        return
+
+    table = DailyNutritionSummary.__table__
+    now = datetime.utcnow()
+    insert = upsert_statement(db, DailyNutritionSummary)
+    statement = insert.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.day],
+        set_={
+            **{column: table.c[column] + insert.excluded[column] for column in FLOAT_COLUMNS + COUNTERS},
+            'updated_at': insert.excluded.updated_at
+        }
+    )
+
+    rows = [
+        {'user_id': user_id, 'day': day, 'updated_at': now, **delta}
+        for (user_id, day), delta in deltas.items()
+    ]
+    db.session.execute(statement, rows)
+
+    # Days whose last log went away should not count as logged
+    for user_id, day in deltas:
+        DailyNutritionSummary.query.filter(
+            DailyNutritionSummary.user_id == user_id,
+            DailyNutritionSummary.day == day,
+            DailyNutritionSummary.item_count <= 0
+        ).delete(synchronize_session=False)
+
+def _collect(food_logs, sign):
+    deltas = {}
+    for food_log in food_logs:
+        user_id, day, delta = log_contribution(food_log)
+        total = deltas.setdefault((user_id, day), _empty_delta())
+        for column, value in delta.items():
+            total[column] += sign * value
+    return deltas
+
+def add_logs(food_logs):
+    """Count new food logs in their daily summaries"""
+    apply_deltas(_collect(food_logs, 1))
+
+def remove_logs(food_logs):
+    """Take food logs out of their daily summaries (call before changing them)"""
+    apply_deltas(_collect(food_logs, -1))
+
+def add_log_rows(rows):
+    """Count new food logs given as plain column dicts (bulk inserts)"""
+    add_logs(SimpleNamespace(**row) for row in rows)
+
+def add_log(food_log):
+    add_logs([food_log])
+
+def remove_log(food_log):
+    remove_logs([food_log])
+
+def _as_date(value):
+    return value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+
+def aggregate_from_logs(user_id=None):
+    """
+    Recompute daily summaries straight from FoodLog with one GROUP BY.
+    Returns a dict keyed by (user_id, day) in the summary column layout.
+    """
+    total = FoodLog.calories * func.coalesce(FoodLog.servings_consumed, 1.0)
+    day = func.date(FoodLog.consumed_at)
+
+    columns = [
+        FoodLog.user_id,
+        day.label('day'),
+        *[
+            func.sum(func.coalesce(getattr(FoodLog, nutrient), 0) * func.coalesce(FoodLog.servings_consumed, 1.0)).label(nutrient)
+            for nutrient in NUTRIENTS
+        ],
+        func.count(FoodLog.id).label('item_count')
+    ]
+    for meal_type in MEAL_TYPES:
+        columns.append(func.sum(case((FoodLog.meal_type == meal_type, total), else_=0)).label(f'{meal_type}_calories'))
+        columns.append(func.sum(case((FoodLog.meal_type == meal_type, 1), else_=0)).label(f'{meal_type}_count'))
+
+    query = db.session.query(*columns)
+    if user_id is not None:
+        query = query.filter(FoodLog.user_id == user_id)
+
+    rollups = {}
+    for row in query.group_by(FoodLog.user_id, day):
+        values = row._asdict()
+        key = (int(values.pop('user_id')), _as_date(values.pop('day')))
+        rollups[key] = {column: value or 0 for column, value in values.items()}
+    return rollups
+
+def rebuild_rollups(user_id=None):
+    """Replace daily summaries with values recomputed from the raw logs"""
+    rollups = aggregate_from_logs(user_id)
+
+    query = DailyNutritionSummary.query
+    if user_id is not None:
+        query = query.filter_by(user_id=user_id)
+    query.delete(synchronize_session=False)
+
+    now = datetime.utcnow()
+    rows = [
+        {'user_id': key[0], 'day': key[1], 'updated_at': now, **values}
+        for key, values in rollups.items()
+    ]
+    if rows:
+        db.session.execute(db.insert(DailyNutritionSummary), rows)
+    db.session.commit()
+    return len(rows)
+
+def backfill_rollups():
+    """Build summaries once for a database whose logs predate the summary table"""
+    if DailyNutritionSummary.query.first() is None and FoodLog.query.first() is not None:
+        return rebuild_rollups()
+    return 0
+
+def check_rollups(user_id=None):
+    """
+    Compare daily summaries against the raw logs.
+    Returns a list of mismatches, each with the expected and stored values.
+    """
+    expected = aggregate_from_logs(user_id)
+
+    query = DailyNutritionSummary.query
+    if user_id is not None:
+        query = query.filter_by(user_id=user_id)
+    stored = {(summary.user_id, summary.day): summary for summary in query}
+
+    mismatches = []
+    for key in sorted(set(expected) | set(stored)):
+        values = expected.get(key)
+        summary = stored.get(key)
+        if values is None or summary is None:
+            differences = {'row': 'missing' if summary is None else 'unexpected'}
+        else:
+            differences = {
+                column: {'expected': values[column], 'stored': getattr(summary, column)}
+                for column in FLOAT_COLUMNS + COUNTERS
+                if abs((values[column] or 0) - (getattr(summary, column) or 0)) > TOLERANCE
+            }
+        if differences:
+            mismatches.append({
+                'user_id': key[0],
+                'day': key[1].isoformat(),
+                'differences': differences
+            })
+    return mismatches
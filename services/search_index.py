@@ -0,0 +1,142 @@
+import re
+from sqlalchemy import text
+from app import db
+from models.custom_food import CustomFood
+
+FTS_TABLE = 'custom_food_fts'
+
+# Contentless FTS5 table over custom_food, kept in sync by triggers so every
+# write path (ORM, bulk statements, raw SQL) updates the index. The owner
+# column holds a "u<user_id>" token so per-user searches only walk that
+# user's postings instead of matching every user's foods.
+FTS_SCHEMA = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        name, brand, category, owner,
+        content='',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON custom_food BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, brand, category, owner)
+        VALUES (new.id, new.name, new.brand, new.category, 'u' || new.user_id);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON custom_food BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, brand, category, owner)
+        VALUES ('delete', old.id, old.name, old.brand, old.category, 'u' || old.user_id);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF name, brand, category, user_id ON custom_food BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, brand, category, owner)
+        VALUES ('delete', old.id, old.name, old.brand, old.category, 'u' || old.user_id);
+        INSERT INTO {FTS_TABLE}(rowid, name, brand, category, owner)
+        VALUES (new.id, new.name, new.brand, new.category, 'u' || new.user_id);
+    END
+    """
+]
+
+REBUILD_STATEMENTS = [
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('delete-all')",
+    f"""
+    INSERT INTO {FTS_TABLE}(rowid, name, brand, category, owner)
+    SELECT id, name, brand, category, 'u' || user_id FROM custom_food
+    """,
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')"
+]
+
+# bm25 column weights: name matters most, then brand, then category
+RANK_EXPRESSION = f"bm25({FTS_TABLE}, 10.0, 3.0, 1.0, 0.0)"
+
+def build_match_expression(search_text, user_id=None):
+    """
+    Turn free text into an FTS5 query: every word must match name, brand or
+    category, and each word also matches as a prefix ("chick" finds
+    "chicken"). Words are quoted so user input can never inject FTS syntax.
+    """
+    words = re.findall(r'\w+', (search_text or '').lower())
+    if not words:
+        return ''
+
+    match = '{name brand category}: (' + ' '.join(f'"{word}"*' for word in words) + ')'
+    if user_id is not None:
+        match = f'owner: "u{int(user_id)}" AND {match}'
+    return match
+
+class CustomFoodSearchIndex:
+    """
+    Full-text search over CustomFood name, brand and category. Uses SQLite
+    FTS5 when available and falls back to ILIKE on other databases.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = False
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        with app.app_context():
+            if db.engine.dialect.name != 'sqlite' or not app.config.get('CUSTOM_FOOD_FTS_ENABLED', True):
+                self.enabled = False
+                return
+
+            try:
+                with db.engine.begin() as connection:
+                    existed = connection.execute(
+                        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                        {'name': FTS_TABLE}
+                    ).first() is not None
+                    for statement in FTS_SCHEMA:
+                        connection.execute(text(statement))
+                    # Index rows that were created before the index existed
+                    if not existed:
+                        for statement in REBUILD_STATEMENTS:
+                            connection.execute(text(statement))
+                self.enabled = True
+            except Exception as e:
+                # SQLite builds without FTS5 keep working through the ILIKE path
+                app.logger.warning(f"Custom food full-text search disabled: {str(e)}")
+                self.enabled = False
+
+    def rebuild(self):
+        """Rebuild the index from the custom_food table"""
+        if not self.enabled:
+            return 0
+        for statement in REBUILD_STATEMENTS:
+            db.session.execute(text(statement))
+        db.session.commit()
+        return CustomFood.query.count()
+
+    def filter(self, query, search_text, user_id=None, ranked=False):
+        """
+        Restrict a CustomFood query to rows matching search_text across
+        name, brand and category. Pass the owner's user_id so the index
+        only considers that user's foods. With ranked=True results are
+        ordered by relevance (bm25).
+        """
+        if not re.search(r'\w', search_text or ''):
+            return query
+
+        if not self.enabled:
+            pattern = f'%{search_text}%'
+            return query.filter(db.or_(
+                CustomFood.name.ilike(pattern),
+                CustomFood.brand.ilike(pattern),
+                CustomFood.category.ilike(pattern)
+            ))
+
+        matches = text(
+            f"SELECT rowid AS id, {RANK_EXPRESSION} AS rank FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match"
+        ).bindparams(match=build_match_expression(search_text, user_id)).columns(id=db.Integer, rank=db.Float).subquery('fts_matches')
+
+        query = query.join(matches, matches.c.id == CustomFood.id)
+        if ranked:
+            query = query.order_by(matches.c.rank.asc())
+        return query
+
+custom_food_index = CustomFoodSearchIndex()
@@ -0,0 +1,238 @@
+import json
+import os
+import re
+import threading
+import time
+from datetime import date, datetime
+from flask import has_request_context, request
+from sqlalchemy import event
+
+# Prefix that asks each dialect for a plan without running the statement
+EXPLAIN_PREFIXES = {
+    'sqlite': 'EXPLAIN QUERY PLAN ',
+    'postgresql': 'EXPLAIN '
+}
+# Dialects where a failed statement aborts the transaction; EXPLAIN runs in a savepoint there
+SAVEPOINT_DIALECTS = {'postgresql'}
+MAX_PARAM_LENGTH = 200
+MAX_PARAMS = 50
+# Bound parameters whose name matches are never written to disk (user.email, user.password_hash, ...)
+SENSITIVE_PARAM_NAMES = re.compile(r'password|email|token|secret|api_key', re.IGNORECASE)
+REDACTED = '<redacted>'
+
+def normalize_statement(statement):
+    """Collapse whitespace and expanded IN lists so repeats of a query group together"""
+    statement = re.sub(r'\s+', ' ', statement).strip()
+    return re.sub(r'\((?:\s*(?:\?|%s|:\w+)\s*,)+\s*(?:\?|%s|:\w+)\s*\)', '(?, ...)', statement)
+
+def _param_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return f'<{len(value)} bytes>'
+    if isinstance(value, str) and len(value) > MAX_PARAM_LENGTH:
+        return value[:MAX_PARAM_LENGTH] + '...'
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return repr(value)
+
+def _redacted(name, value):
+    return REDACTED if SENSITIVE_PARAM_NAMES.search(name) else _param_value(value)
+
+def serialize_params(parameters, executemany=False, names=None):
+    """
+    JSON-safe, truncated copy of a statement's bound parameters with
+    sensitive values redacted. Positional parameters are matched to names
+    (the compiled statement's bind names); when they can't be, every value
+    is redacted rather than risk logging a password hash.
+    """
+    if executemany:
+        parameters = list(parameters or [])
+        return {'sets': len(parameters), 'first': serialize_params(parameters[0], names=names) if parameters else None}
+    if isinstance(parameters, dict):
+        return {key: _redacted(key, value) for key, value in list(parameters.items())[:MAX_PARAMS]}
+    parameters = list(parameters or ())
+    if names is None or len(names) != len(parameters):
+        return [REDACTED] * min(len(parameters), MAX_PARAMS)
+    return [_redacted(name, value) for name, value in list(zip(names, parameters))[:MAX_PARAMS]]
+
+def bind_names(context):
+    """Bind parameter names of a compiled statement in positional order, or None"""
+    positiontup = getattr(getattr(context, 'compiled', None), 'positiontup', None)
+    return list(positiontup) if positiontup else None
+
+def is_full_scan(plan_line):
+    """SQLite plan lines like 'SCAN food_log' read the whole table (no index)"""
+    return plan_line.startswith('SCAN ') and ' USING ' not in plan_line
+
+class SlowQueryLog:
+    """
+    Engine hook that appends statements slower than a threshold to a JSONL
+    file with their parameters, the route that ran them and the query plan.
+    Plans are captured right after the slow statement on the same
+    connection, so they reflect the indexes the statement actually saw.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.threshold_ms = 200
+        self.explain = True
+        self.log_parameters = False
+        self.path = None
+        self.logger = None
+        self.recorded = 0
+        self._lock = threading.Lock()
+        self._engines = set()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('SLOW_QUERY_LOG_ENABLED', True)
+        self.threshold_ms = app.config.get('SLOW_QUERY_THRESHOLD_MS', 200)
+        self.explain = app.config.get('SLOW_QUERY_EXPLAIN', True)
+        self.log_parameters = app.config.get('SLOW_QUERY_LOG_PARAMETERS', False)
+        self.path = app.config.get('SLOW_QUERY_LOG_PATH') or os.path.join(app.instance_path, 'slow_queries.jsonl')
+        self.logger = app.logger
+        if not self.enabled:
+            return
+
+        from app import db
+        with app.app_context():
+            engine = db.engine
+        if engine not in self._engines:
+            self._engines.add(engine)
+            event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+
+    @staticmethod
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._slow_query_started = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, '_slow_query_started', None)
+        if started is None:
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if elapsed_ms < self.threshold_ms:
+            return
+
+        try:
+            self.record(conn, cursor, statement, parameters, executemany, elapsed_ms, bind_names(context))
+        except Exception as e:
+            # Never fail the request because the slow-query log could not be written
+            self.logger.warning(f"Slow query log failed: {str(e)}")
+
+    def _capture_plan(self, conn, cursor, statement, parameters, executemany):
+        prefix = EXPLAIN_PREFIXES.get(conn.dialect.name)
+        if not self.explain or prefix is None or executemany:
+            return None
+        if not statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+            return None
+
+        # A failed EXPLAIN must not poison the request's transaction: on
+        # PostgreSQL any error aborts it, so roll back to a savepoint
+        savepoint = conn.dialect.name in SAVEPOINT_DIALECTS
+        try:
+            # A separate cursor on the same DBAPI connection leaves the
+            # slow statement's pending rows untouched
+            plan_cursor = cursor.connection.cursor()
+            try:
+                if savepoint:
+                    plan_cursor.execute('SAVEPOINT slow_query_plan')
+                try:
+                    plan_cursor.execute(prefix + statement, parameters)
+                    return [str(row[-1]) for row in plan_cursor.fetchall()]
+                except Exception:
+                    if savepoint:
+                        plan_cursor.execute('ROLLBACK TO SAVEPOINT slow_query_plan')
+                    raise
+                finally:
+                    if savepoint:
+                        plan_cursor.execute('RELEASE SAVEPOINT slow_query_plan')
+            finally:
+                plan_cursor.close()
+        except Exception as e:
+            return [f'EXPLAIN failed: {str(e)}']
+
+    def record(self, conn, cursor, statement, parameters, executemany, elapsed_ms, names=None):
+        entry = {
+            'at': datetime.utcnow().isoformat(),
+            'duration_ms': round(elapsed_ms, 2),
+            'statement': statement,
+            'parameters': serialize_params(parameters, executemany, names) if self.log_parameters else None,
+            'route': request.endpoint if has_request_context() else None,
+            'path': request.path if has_request_context() else None,
+            'method': request.method if has_request_context() else None,
+            'plan': self._capture_plan(conn, cursor, statement, parameters, executemany)
+        }
+
+        with self._lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as log_file:
+                log_file.write(json.dumps(entry) + '\n')
+            self.recorded += 1
+
+        self.logger.warning(
+            f"Slow query ({entry['duration_ms']} ms, {entry['route'] or 'no route'}): "
+            f"{normalize_statement(statement)[:200]}"
+        )
+
+    def read_entries(self):
+        if not self.path or not os.path.exists(self.path):
+            return []
+        entries = []
+        with open(self.path, encoding='utf-8') as log_file:
+            for line in log_file:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue  # partially written line
+        return entries
+
+    def report(self, top=10, since=None, route=None):
+        """
+        Group logged statements by normalized SQL and return the top groups
+        by total time, each with its slowest occurrence's parameters and plan.
+        """
+        groups = {}
+        for entry in self.read_entries():
+            if since and entry['at'] < since.isoformat():
+                continue
+            if route and entry.get('route') != route:
+                continue
+
+            key = normalize_statement(entry['statement'])
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = {
+                    'statement': key,
+                    'count': 0,
+                    'total_ms': 0.0,
+                    'max_ms': 0.0,
+                    'routes': {},
+                    'slowest': None
+                }
+            group['count'] += 1
+            group['total_ms'] += entry['duration_ms']
+            entry_route = entry.get('route') or '(no route)'
+            group['routes'][entry_route] = group['routes'].get(entry_route, 0) + 1
+            if entry['duration_ms'] >= group['max_ms']:
+                group['max_ms'] = entry['duration_ms']
+                group['slowest'] = entry
+
+        ranked = sorted(groups.values(), key=lambda group: group['total_ms'], reverse=True)[:top]
+        for group in ranked:
+            group['total_ms'] = round(group['total_ms'], 2)
+            group['avg_ms'] = round(group['total_ms'] / group['count'], 2)
+            plan = group['slowest'].get('plan') or []
+            group['full_scans'] = [line for line in plan if is_full_scan(line)]
+        return ranked
+
+    def clear(self):
+        with self._lock:
+            if self.path and os.path.exists(self.path):
+                os.remove(self.path)
+
+slow_query_log = SlowQueryLog()
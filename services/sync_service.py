@@ -0,0 +1,81 @@
+import base64
+import json
+from datetime import datetime, timedelta
+from flask import current_app
+from app import db
+from models.food_log import FoodLog
+from models.custom_food import CustomFood
+from models.sync_tombstone import SyncTombstone
+
+SYNC_ENTITIES = {
+    'food_log': FoodLog,
+    'custom_food': CustomFood
+}
+
+def encode_sync_token(timestamp):
+    """Opaque token a client sends back as ?since= on its next sync"""
+    payload = json.dumps({'t': timestamp.isoformat()}, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii').rstrip('=')
+
+def decode_sync_token(token):
+    """Return the timestamp inside a sync token, raising ValueError if malformed"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+        return datetime.fromisoformat(payload['t'])
+    except (ValueError, TypeError, KeyError):
+        raise ValueError("Invalid sync token")
+
+def record_deletion(user_id, entity, entity_id):
+    """Leave a tombstone so syncing devices learn about the delete (same transaction)"""
+    db.session.add(SyncTombstone(user_id=int(user_id), entity=entity, entity_id=entity_id))
+
+def prune_tombstones(retention_days):
+    """Delete tombstones older than the retention window; returns how many"""
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    count = SyncTombstone.query.filter(SyncTombstone.deleted_at < cutoff).delete(synchronize_session=False)
+    db.session.commit()
+    return count
+
+def changes_since(user_id, since=None):
+    """
+    Food logs and custom foods changed since a sync token's time, plus ids
+    deleted since then. Without a token, or with one older than the
+    tombstone retention window, every row is returned and full is True so
+    the client replaces its local copy.
+    """
+    config = current_app.config
+    now = datetime.utcnow()
+    retention = timedelta(days=config.get('SYNC_TOMBSTONE_RETENTION_DAYS', 90))
+
+    full = since is None or since < now - retention
+    # Re-send rows stamped shortly before the last sync: a transaction that
+    # stamped updated_at earlier may have committed after that sync read
+    window_start = None if full else since - timedelta(seconds=config.get('SYNC_OVERLAP_SECONDS', 5))
+
+    changes = {}
+    for entity, model in SYNC_ENTITIES.items():
+        query = model.query.filter(model.user_id == user_id)
+        if window_start is not None:
+            query = query.filter(model.updated_at > window_start)
+        changes[entity] = query.order_by(model.updated_at, model.id).all()
+
+    deleted = {entity: [] for entity in SYNC_ENTITIES}
+    if window_start is not None:
+        tombstones = SyncTombstone.query.filter(
+            SyncTombstone.user_id == user_id,
+            SyncTombstone.deleted_at > window_start
+        ).order_by(SyncTombstone.deleted_at).all()
+        for tombstone in tombstones:
+            deleted.setdefault(tombstone.entity, []).append(tombstone.entity_id)
+
+    return {
+        'full': full,
+        'food_logs': [food_log.to_dict() for food_log in changes['food_log']],
+        'custom_foods': [custom_food.to_dict() for custom_food in changes['custom_food']],
+        'deleted': {
+            'food_logs': deleted['food_log'],
+            'custom_foods': deleted['custom_food']
+        },
+        'next_token': encode_sync_token(now),
+        'server_time': now.isoformat()
+    }
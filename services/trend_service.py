@@ -0,0 +1,124 @@
+import math
+import numpy as np
+
+# Series a client can request from /api/analytics/progress
+SERIES = ['daily', 'rolling_7', 'rolling_30', 'ewma', 'macros', 'adherence']
+DEFAULT_SERIES = ['daily']
+
+EWMA_SPAN = 7
+ADHERENCE_TOLERANCE = 0.1  # within 10% of the calorie goal counts as on target
+MACRO_CALORIES = {'proteins': 4, 'carbs': 4, 'fats': 9}
+
+# Largest exponent we let the EWMA closed form reach before starting a new block
+_MAX_EXPONENT = 200
+
+def load_arrays(days_data, start_date, days):
+    """
+    Turn per-day rows (as returned by aggregation_service.daily_totals) into
+    dense NumPy arrays indexed by day offset from start_date. Days without
+    logs are zero with logged=False.
+    """
+    arrays = {column: np.zeros(days) for column in ('calories', 'proteins', 'carbs', 'fats')}
+    arrays['item_count'] = np.zeros(days, dtype=int)
+
+    if days_data:
+        # Transpose the rows once instead of reading attributes row by row
+        columns = dict(zip(next(iter(days_data.values()))._fields, zip(*days_data.values())))
+        offsets = (np.array(columns['day'], dtype='datetime64[D]') - np.datetime64(start_date, 'D')).astype(int)
+        for column in arrays:
+            arrays[column][offsets] = columns[column]
+
+    arrays['logged'] = arrays['item_count'] > 0
+    return arrays
+
+def date_labels(start_date, days):
+    """YYYY-MM-DD strings for each day of the period"""
+    return np.arange(np.datetime64(start_date, 'D'), np.datetime64(start_date, 'D') + days).astype(str).tolist()
+
+def rolling_average(values, mask, window):
+    """Trailing mean over the logged days in each window; NaN where the window is empty"""
+    sums = np.concatenate(([0.0], np.cumsum(np.where(mask, values, 0.0))))
+    counts = np.concatenate(([0], np.cumsum(mask)))
+    window_starts = np.maximum(np.arange(1, len(values) + 1) - window, 0)
+    window_sums = sums[1:] - sums[window_starts]
+    window_counts = counts[1:] - counts[window_starts]
+    return np.where(window_counts > 0, window_sums / np.maximum(window_counts, 1), np.nan)
+
+def ewma(values, mask, span=EWMA_SPAN):
+    """
+    Exponentially weighted moving average over the logged days, carried
+    forward across days without logs (NaN before the first logged day).
+    Uses the closed form e[t] = d^t * (e[0] + a * sum(x[k] / d^k)), in
+    blocks small enough that d^-k never overflows.
+    """
+    result = np.full(len(values), np.nan)
+    observed = values[mask]
+    if not len(observed):
+        return result
+
+    alpha = 2.0 / (span + 1)
+    decay = 1.0 - alpha
+    block = max(1, int(_MAX_EXPONENT * math.log(10) / -math.log(decay)))
+
+    smoothed = np.empty(len(observed))
+    previous = observed[0]
+    for start in range(0, len(observed), block):
+        chunk = observed[start:start + block]
+        powers = decay ** np.arange(1, len(chunk) + 1)
+        smoothed[start:start + len(chunk)] = powers * (previous + alpha * np.cumsum(chunk / powers))
+        previous = smoothed[start + len(chunk) - 1]
+
+    positions = np.cumsum(mask) - 1
+    started = positions >= 0
+    result[started] = smoothed[positions[started]]
+    return result
+
+def linear_slope(values, mask):
+    """Least-squares slope of the logged days, in units per day"""
+    x = np.flatnonzero(mask)
+    if len(x) < 2:
+        return 0.0
+    return float(np.polyfit(x, values[mask], 1)[0])
+
+def goal_adherence(calories, mask, goal, tolerance=ADHERENCE_TOLERANCE):
+    """
+    Per-day calories / goal ratios (NaN on days without logs) and a summary
+    of how many logged days were within, over or under the goal.
+    """
+    if not goal or goal <= 0:
+        return np.full(len(calories), np.nan), None
+
+    ratios = np.where(mask, calories / goal, np.nan)
+    logged_ratios = ratios[mask]
+    within = np.abs(logged_ratios - 1) <= tolerance
+    over = logged_ratios > 1 + tolerance
+    logged_days = int(mask.sum())
+
+    return ratios, {
+        'goal': goal,
+        'tolerance_percentage': round(tolerance * 100, 1),
+        'days_within_goal': int(within.sum()),
+        'days_over_goal': int(over.sum()),
+        'days_under_goal': int(logged_days - within.sum() - over.sum()),
+        'adherence_rate': round(float(within.mean()) * 100, 1) if logged_days else 0,
+        'avg_goal_ratio': round(float(logged_ratios.mean()), 3) if logged_days else 0
+    }
+
+def macro_percentages(arrays):
+    """Share of calories from each macro per day and over the whole period"""
+    calories = arrays['calories']
+    daily, period = {}, {}
+    total_calories = calories.sum()
+
+    for macro, factor in MACRO_CALORIES.items():
+        macro_calories = arrays[macro] * factor
+        with np.errstate(invalid='ignore', divide='ignore'):
+            daily[macro] = np.where(calories > 0, macro_calories / calories * 100, np.nan)
+        period[macro] = round(float(macro_calories.sum() / total_calories * 100), 1) if total_calories > 0 else 0
+
+    return daily, period
+
+def to_json_list(values, digits=2):
+    """Round an array for JSON, turning NaN into null"""
+    rounded = np.round(values, digits)
+    return np.where(np.isnan(rounded), None, rounded).tolist()
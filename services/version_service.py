@@ -0,0 +1,83 @@
+import hashlib
+from datetime import date, datetime
+from functools import wraps
+from flask import current_app, g, make_response, request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import event, inspect
+from app import db
+from models.user import User
+from models.user_data_version import UserDataVersion
+from services.response_cache import response_cache
+from utils.schema import upsert_statement
+
+def bump_version(user_id):
+    """
+    Advance a user's data version inside the current transaction.
+    Call from every write that changes what the user's read endpoints return.
+    """
+    table = UserDataVersion.__table__
+    insert = upsert_statement(db, UserDataVersion)
+    statement = insert.values(user_id=int(user_id), version=1, updated_at=datetime.utcnow()).on_conflict_do_update(
+        index_elements=[table.c.user_id],
+        set_={'version': table.c.version + 1, 'updated_at': insert.excluded.updated_at}
+    )
+    db.session.execute(statement)
+    # Cached responses are keyed by version and already unreachable; free them now
+    response_cache.invalidate_user(user_id)
+
+# User columns that no read endpoint returns; changing only these keeps the version
+_UNVERSIONED_USER_COLUMNS = {'password_hash', 'updated_at'}
+
+@event.listens_for(db.session, 'before_flush')
+def _bump_on_user_change(session, flush_context, instances):
+    """
+    Bump the version of every user whose profile or goals are about to be
+    written, so each path that edits a User (auth and user routes, the CLI)
+    invalidates ETags and cached responses in the same transaction.
+    """
+    for obj in list(session.dirty):
+        if not isinstance(obj, User) or obj.id is None:
+            continue
+        state = inspect(obj)
+        if any(state.attrs[column.key].history.has_changes()
+               for column in state.mapper.column_attrs if column.key not in _UNVERSIONED_USER_COLUMNS):
+            bump_version(obj.id)
+
+def get_version(user_id):
+    """Current data version for a user (0 before their first write)"""
+    return db.session.query(UserDataVersion.version).filter_by(user_id=int(user_id)).scalar() or 0
+
+def make_etag(user_id, version):
+    """
+    ETag for the current request: the data version plus a digest of the
+    path, query string and today's date (several endpoints default to
+    "this week" or count back from today).
+    """
+    params = '&'.join(f'{key}={value}' for key, value in sorted(request.args.items(multi=True)))
+    digest = hashlib.sha1(f'{user_id}|{request.path}|{params}|{date.today().isoformat()}'.encode('utf-8')).hexdigest()
+    return f'{version}-{digest[:16]}'
+
+def conditional_response(view):
+    """
+    Answer 304 Not Modified when the client's If-None-Match still matches the
+    user's data version, without running the view. Successful responses get
+    the ETag. Apply below @jwt_required().
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        user_id = get_jwt_identity()
+        g.data_version = get_version(user_id)
+        etag = make_etag(user_id, g.data_version)
+
+        if request.if_none_match.contains_weak(etag):
+            response = current_app.response_class(status=304)
+        else:
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+
+        response.set_etag(etag, weak=True)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+
+    return wrapper
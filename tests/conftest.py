@@ -0,0 +1,108 @@
+import os
+
+# Settings are read from the environment when config is imported
+os.environ['OPENAI_API_KEY'] = 'test'
+os.environ['OPENAI_MAX_RETRIES'] = '0'
+os.environ['REFERENCE_FOODS_AUTO_IMPORT'] = 'false'
+os.environ['SLOW_QUERY_LOG_ENABLED'] = 'false'
+os.environ['JOB_RESUME_ON_START'] = 'false'
+
+import pytest
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from config import Config
+from models.user import User
+from services.cache_service import AICache, ImageAnalysisIndex
+
+FOOD_RESULT = {
+    'food_name': 'Test Food',
+    'serving_size_grams': 100,
+    'serving_description': '1 serving',
+    'nutrition': {'calories': 200, 'proteins': 10, 'carbs': 20, 'fats': 8, 'fiber': 2, 'sodium': 150, 'sugars': 4},
+    'confidence_score': 0.9,
+    'meal_category': 'lunch',
+    'common_brands': []
+}
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """A fresh app on its own SQLite database"""
+    monkeypatch.setattr(Config, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'test.db'}")
+    monkeypatch.setattr(Config, 'UPLOAD_FOLDER', str(tmp_path / 'uploads'))
+
+    # The shared AI service keeps in-memory indexes keyed by row id
+    from routes.food import openai_service
+    monkeypatch.setattr(openai_service, 'search_cache', AICache('food_search'))
+    monkeypatch.setattr(openai_service, 'image_index', ImageAnalysisIndex())
+
+    app = create_app()
+    app.config['TESTING'] = True
+
+    from services.response_cache import response_cache
+    response_cache.clear()
+
+    yield app
+
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def user(app):
+    """A user with a complete profile; returns the user id"""
+    with app.app_context():
+        user = User(
+            email='test@example.com', name='Test', age=30, weight=70, height=175,
+            gender='male', activity_level='moderate', goal_type='maintain', daily_calorie_goal=2000
+        )
+        user.set_password('Passw0rdX')
+        db.session.add(user)
+        db.session.commit()
+        return user.id
+
+@pytest.fixture
+def auth_headers(app, user):
+    with app.app_context():
+        return {'Authorization': f'Bearer {create_access_token(identity=user)}'}
+
+@pytest.fixture
+def fake_ai(monkeypatch):
+    """Replace OpenAI calls on the shared service with canned results; returns the call log"""
+    from routes.food import openai_service
+    calls = []
+
+    def search_food_by_name(food_name, portion_description=''):
+        calls.append(('search', food_name, portion_description))
+        return dict(FOOD_RESULT, food_name=food_name.title())
+
+    def search_foods_batch(items):
+        calls.append(('batch', list(items)))
+        return [dict(FOOD_RESULT, food_name=name.title()) for name, _ in items]
+
+    def analyze_food_image(image_data, user_description='', detail='high'):
+        calls.append(('image', user_description, detail))
+        return dict(FOOD_RESULT, estimated_weight_grams=150)
+
+    def analyze_recipe(recipe_text, servings=1):
+        calls.append(('recipe', recipe_text, servings))
+        return {'recipe_name': 'Test Recipe', 'total_servings': servings, 'per_serving_nutrition': {'calories': 300}}
+
+    monkeypatch.setattr(openai_service, 'search_food_by_name', search_food_by_name)
+    monkeypatch.setattr(openai_service, 'search_foods_batch', search_foods_batch)
+    monkeypatch.setattr(openai_service, 'analyze_food_image', analyze_food_image)
+    monkeypatch.setattr(openai_service, 'analyze_recipe', analyze_recipe)
+    return calls
+
+@pytest.fixture
+def log_food(client, auth_headers):
+    """Log food through the API (keeps daily summaries in step); returns the created entry"""
+    def log(food_name='Toast', calories=100, consumed_at='2024-03-05T08:00:00', **fields):
+        entry = dict(food_name=food_name, serving_size=100, calories=calories, consumed_at=consumed_at, **fields)
+        response = client.post('/api/food/log', json=entry, headers=auth_headers)
+        assert response.status_code == 201, response.json
+        return response.json['food_log']
+    return log
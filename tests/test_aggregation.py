@@ -0,0 +1,70 @@
+from datetime import date, timedelta
+from services.aggregation_service import daily_totals, day_totals, meal_foods, streaks, top_foods
+from utils.helpers import month_range
+
+def test_day_totals_and_meal_foods(app, user, log_food):
+    log_food('Oatmeal', 300, '2024-03-05T07:30:00', meal_type='breakfast', proteins=10)
+    log_food('Banana', 100, '2024-03-05T10:00:00', meal_type='snack', servings_consumed=2)
+    log_food('Soup', 250, '2024-03-04T23:59:59', meal_type='dinner')
+
+    with app.app_context():
+        totals = day_totals(user, date(2024, 3, 5))
+        assert (totals.calories, totals.proteins, totals.item_count) == (500, 10, 2)
+        assert (totals.snack_calories, totals.snack_count, totals.dinner_count) == (200, 1, 0)
+        assert day_totals(user, date(2024, 3, 6)) is None
+
+        assert meal_foods(user, date(2024, 3, 5)) == {'breakfast': ['Oatmeal'], 'lunch': [], 'dinner': [], 'snack': ['Banana']}
+
+        rows = daily_totals(user, date(2024, 3, 1), date(2024, 3, 31))
+        assert {day: row.calories for day, row in rows.items()} == {date(2024, 3, 4): 250, date(2024, 3, 5): 500}
+
+def test_top_foods_ties_keep_first_logged_order(app, user, log_food):
+    for name in ['Tea', 'Apple', 'Apple', 'Tea', 'Rice']:
+        log_food(name, 50, '2024-03-10T12:00:00')
+    log_food('Tea', 50, '2024-04-01T00:00:00')
+
+    with app.app_context():
+        assert top_foods(user, month_range(2024, 3)) == [('Tea', 2), ('Apple', 2), ('Rice', 1)]
+        assert top_foods(user, month_range(2024, 3), limit=1) == [('Tea', 2)]
+
+def test_daily_and_monthly_routes(client, auth_headers, log_food):
+    log_food('Oatmeal', 300, '2024-03-05T07:30:00', meal_type='breakfast', proteins=10)
+    log_food('Oatmeal', 300, '2024-03-06T07:30:00', meal_type='breakfast')
+
+    daily = client.get('/api/analytics/daily/2024-03-05', headers=auth_headers).json
+    assert daily['calorie_progress'] == {'consumed': 300, 'goal': 2000, 'remaining': 1700, 'percentage': 15.0}
+    assert daily['meal_breakdown']['breakfast'] == {'calories': 300, 'count': 1, 'foods': ['Oatmeal']}
+    assert daily['macro_breakdown']['proteins']['calories'] == 40
+
+    monthly = client.get('/api/analytics/monthly?month=2024-03', headers=auth_headers).json
+    assert monthly['monthly_stats']['days_logged'] == 2
+    assert monthly['top_foods'] == [{'name': 'Oatmeal', 'count': 2}]
+
+def test_streaks_from_gaps_and_islands():
+    days = [date(2024, 3, day) for day in (1, 2, 3, 5, 6, 8, 9, 10, 11)]
+
+    assert streaks(days, date(2024, 3, 11)) == (4, 4)
+    assert streaks(days, date(2024, 3, 12)) == (0, 4)
+    assert streaks(days[:3], date(2024, 3, 3)) == (3, 3)
+    assert streaks([], date(2024, 3, 3)) == (0, 0)
+
+def test_summary_streaks(client, auth_headers, log_food):
+    today = date.today()
+    for offset in (0, 1, 2, 5, 6):
+        log_food('Tea', 50, (today - timedelta(days=offset)).isoformat() + 'T09:00:00')
+    log_food('Tea', 50, today.isoformat() + 'T10:00:00')
+
+    stats = client.get('/api/analytics/summary', headers=auth_headers).json['logging_stats']
+    assert (stats['current_streak'], stats['longest_streak']) == (3, 3)
+    assert (stats['total_food_logs'], stats['unique_days_logged'], stats['days_since_start']) == (6, 5, 7)
+
+def test_daily_remaining_is_rounded_like_the_totals(client, auth_headers, log_food):
+    # Incremental rollup upserts leave float drift behind (123.45600000000002 here)
+    removed = [log_food('Mint', 0.1), log_food('Gum', 0.1)]
+    log_food('Stew', 123.456)
+    for food_log in removed:
+        client.delete(f"/api/food/logs/{food_log['id']}", headers=auth_headers)
+
+    progress = client.get('/api/analytics/daily/2024-03-05', headers=auth_headers).json['calorie_progress']
+    assert progress['consumed'] == 123.46
+    assert progress['remaining'] == 1876.54
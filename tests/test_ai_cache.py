@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import text
+from app import db
+from models.ai_cache import AICacheEntry
+from services.cache_service import AICache
+
+def test_hit_and_miss(app):
+    cache = AICache('food_search')
+    with app.app_context():
+        key = cache.make_key('apple', '')
+        assert cache.get(key) is None
+        cache.set(key, {'food_name': 'Apple'})
+        assert cache.get(key) == {'food_name': 'Apple'}
+        assert (cache.hits, cache.misses) == (1, 1)
+
+@pytest.mark.filterwarnings('error')
+def test_expired_entry_already_deleted_by_another_request(app, monkeypatch):
+    app.config['AI_CACHE_TTL_SECONDS'] = 60
+    cache = AICache('food_search')
+    with app.app_context():
+        key = cache.make_key('apple', '')
+        cache.set(key, {'food_name': 'Apple'})
+        AICacheEntry.query.filter_by(cache_key=key).update({'created_at': datetime.utcnow() - timedelta(hours=1)})
+        db.session.commit()
+
+        # Another request removes the row between this one's read and its delete
+        def expired_and_gone(entry, ttl_seconds):
+            with db.engine.begin() as connection:
+                connection.execute(text('DELETE FROM ai_cache_entry WHERE cache_key = :key'), {'key': key})
+            return True
+        monkeypatch.setattr(AICacheEntry, 'is_expired', expired_and_gone)
+
+        assert cache.get(key) is None
+        assert AICacheEntry.query.count() == 0
+
+def test_eviction_runs_every_interval_writes(app):
+    app.config.update(AI_CACHE_MAX_ENTRIES=3, AI_CACHE_EVICT_INTERVAL=5)
+    cache = AICache('food_search')
+    with app.app_context():
+        for index in range(4):
+            cache.set(cache.make_key(f'food {index}'), {'index': index})
+        assert cache.size() == 4
+
+        cache.set(cache.make_key('food 4'), {'index': 4})
+        assert cache.size() == 3
+        assert cache.get(cache.make_key('food 0')) is None
+        assert cache.get(cache.make_key('food 4')) == {'index': 4}
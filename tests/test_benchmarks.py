@@ -0,0 +1,76 @@
+import random
+from datetime import date
+import routes.food
+from app import db
+from benchmarks.endpoints import QueryCounter, compare, endpoint_cases, percentile, run_case
+from benchmarks.fake_openai import FakeOpenAIService
+from benchmarks.seed import food_log_rows, seed
+from models.custom_food import CustomFood
+from models.food_log import FoodLog
+from services.rollup_service import check_rollups
+
+def test_food_log_rows_are_deterministic():
+    first = list(food_log_rows(1, 50, 1, date(2024, 3, 31), random.Random(42)))
+    second = list(food_log_rows(1, 50, 1, date(2024, 3, 31), random.Random(42)))
+
+    assert first == second
+    assert first[0]['consumed_at'].date() == date(2023, 4, 2)
+    assert first[-1]['consumed_at'].date() <= date(2024, 3, 31)
+    assert [row['consumed_at'].date() for row in first] == sorted(row['consumed_at'].date() for row in first)
+
+def test_seed_populates_users_logs_and_rollups(app):
+    with app.app_context():
+        user_id = seed(200, users=3, background_logs=20, custom_foods=30, years=1, end_date=date(2024, 3, 31))
+
+        assert FoodLog.query.filter_by(user_id=user_id).count() == 200
+        assert FoodLog.query.count() == 240
+        assert CustomFood.query.filter_by(user_id=user_id).count() == 30
+        assert CustomFood.query.count() == 36
+        assert check_rollups(user_id) == []
+
+def test_compare_flags_slower_and_chattier_endpoints(capsys):
+    baseline = {'results': {
+        'steady': {'median_ms': 10.0, 'queries': 3},
+        'slower': {'median_ms': 10.0, 'queries': 3},
+        'noisy': {'median_ms': 0.2, 'queries': 1},
+        'chattier': {'median_ms': 10.0, 'queries': 3}
+    }}
+    current = {'results': {
+        'steady': {'median_ms': 10.5, 'queries': 3},
+        'slower': {'median_ms': 15.0, 'queries': 3},
+        'noisy': {'median_ms': 0.4, 'queries': 1},
+        'chattier': {'median_ms': 9.0, 'queries': 4},
+        'added': {'median_ms': 1.0, 'queries': 1}
+    }}
+
+    assert compare(current, baseline, threshold=0.2, min_delta_ms=1.0) == ['slower', 'chattier']
+    assert 'new' in capsys.readouterr().out
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert (percentile(values, 0.5), percentile(values, 0.95), percentile([7], 0.95)) == (51, 95, 7)
+
+def test_run_case_measures_timings_and_queries(app, client, auth_headers, log_food):
+    log_food()
+    with app.app_context():
+        counter = QueryCounter(db.engine)
+    case = ('food.logs', 'GET', '/api/food/logs?limit=50', None)
+
+    result = run_case(client, auth_headers, counter, case, runs=3, warmup=1)
+    assert (result['status'], result['runs']) == (200, 3)
+    assert result['queries'] > 0 and result['bytes'] > 0
+    assert result['min_ms'] <= result['median_ms'] <= result['max_ms']
+
+def test_endpoint_cases_run_against_the_fake_service(app, client, auth_headers, log_food, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    service = FakeOpenAIService()
+    monkeypatch.setattr(routes.food, 'openai_service', service)
+    with app.app_context():
+        counter = QueryCounter(db.engine)
+
+    for case in endpoint_cases(date.today()):
+        result = run_case(client, auth_headers, counter, case, runs=1, warmup=0)
+        assert result['status'] in (200, 201), case[0]
+
+    assert service.calls['search_food'] >= 1
+    assert service.calls['analyze_recipe'] == 1
@@ -0,0 +1,63 @@
+import pytest
+from app import db
+from models.user import User
+
+def etag_for(client, url, auth_headers):
+    response = client.get(url, headers=auth_headers)
+    assert response.status_code == 200
+    return response.headers['ETag']
+
+def test_unchanged_data_returns_not_modified(client, auth_headers, log_food):
+    log_food()
+    etag = etag_for(client, '/api/analytics/daily/2024-03-05', auth_headers)
+
+    response = client.get('/api/analytics/daily/2024-03-05', headers={**auth_headers, 'If-None-Match': etag})
+    assert response.status_code == 304
+
+def test_food_log_write_invalidates_etag(client, auth_headers, log_food):
+    etag = etag_for(client, '/api/analytics/daily/2024-03-05', auth_headers)
+    log_food()
+
+    response = client.get('/api/analytics/daily/2024-03-05', headers={**auth_headers, 'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.json['calorie_progress']['consumed'] == 100
+
+@pytest.mark.parametrize('url, method', [
+    ('/api/auth/profile', 'put'),
+    ('/api/user/profile', 'put'),
+    ('/api/user/goals', 'put')
+])
+def test_goal_change_invalidates_etags(client, auth_headers, log_food, url, method):
+    log_food()
+    profile_etag = etag_for(client, '/api/user/profile', auth_headers)
+    daily_etag = etag_for(client, '/api/analytics/daily/2024-03-05', auth_headers)
+
+    response = getattr(client, method)(url, json={'daily_calorie_goal': 2500}, headers=auth_headers)
+    assert response.status_code == 200
+
+    response = client.get('/api/user/profile', headers={**auth_headers, 'If-None-Match': profile_etag})
+    assert response.status_code == 200
+    assert response.json['user']['daily_calorie_goal'] == 2500
+
+    response = client.get('/api/analytics/daily/2024-03-05', headers={**auth_headers, 'If-None-Match': daily_etag})
+    assert response.status_code == 200
+    assert response.json['calorie_progress']['goal'] == 2500
+
+def test_direct_user_update_bumps_version(app, client, auth_headers, user):
+    etag = etag_for(client, '/api/user/profile', auth_headers)
+    with app.app_context():
+        db.session.get(User, user).name = 'Renamed'
+        db.session.commit()
+
+    response = client.get('/api/user/profile', headers={**auth_headers, 'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.json['user']['name'] == 'Renamed'
+
+def test_password_change_keeps_etag(app, client, auth_headers, user):
+    etag = etag_for(client, '/api/user/profile', auth_headers)
+    with app.app_context():
+        db.session.get(User, user).password_hash = 'rehashed'
+        db.session.commit()
+
+    response = client.get('/api/user/profile', headers={**auth_headers, 'If-None-Match': etag})
+    assert response.status_code == 304
@@ -0,0 +1,72 @@
+import pytest
+from sqlalchemy import text
+from app import db
+from models.custom_food import CustomFood
+from models.user import User
+from services.search_index import build_match_expression, custom_food_index
+
+def add_food(user_id, name, brand=None, category=None):
+    food = CustomFood(user_id=user_id, name=name, brand=brand, category=category, calories_per_100g=100)
+    db.session.add(food)
+    db.session.commit()
+    return food
+
+def search(user_id, search_text, ranked=True):
+    query = CustomFood.query.filter(CustomFood.user_id == user_id)
+    return [food.name for food in custom_food_index.filter(query, search_text, user_id, ranked=ranked).all()]
+
+def test_match_expression_quotes_user_input():
+    assert build_match_expression('Chick "OR" *', 7) == 'owner: "u7" AND {name brand category}: ("chick"* "or"*)'
+    assert build_match_expression('  ') == ''
+
+def test_prefix_diacritics_and_ranking(app, user):
+    with app.app_context():
+        assert custom_food_index.enabled
+        add_food(user, 'Granola bar', category='Chicken-free snacks')
+        add_food(user, 'Chicken curry', brand='Home')
+        add_food(user, 'Crème brûlée')
+
+        assert search(user, 'chick') == ['Chicken curry', 'Granola bar']
+        assert search(user, 'creme brulee') == ['Crème brûlée']
+        assert search(user, 'home curry') == ['Chicken curry']
+        assert search(user, '"); DROP TABLE custom_food; --') == []
+
+def test_triggers_follow_every_write_path(app, user):
+    with app.app_context():
+        food = add_food(user, 'Oat milk')
+        food.name = 'Almond milk'
+        db.session.commit()
+        assert search(user, 'oat') == []
+        assert search(user, 'almond') == ['Almond milk']
+
+        db.session.execute(text(
+            "INSERT INTO custom_food (user_id, name, calories_per_100g) VALUES (:user_id, 'Soy milk', 50)"
+        ), {'user_id': user})
+        CustomFood.query.filter_by(name='Almond milk').delete()
+        db.session.commit()
+        assert search(user, 'milk') == ['Soy milk']
+
+def test_searches_are_scoped_to_the_owner(app, user):
+    with app.app_context():
+        other = User(email='other@example.com', name='Other', password_hash='x')
+        db.session.add(other)
+        db.session.commit()
+        add_food(other.id, 'Protein shake')
+        add_food(user, 'Protein bar')
+
+        assert search(user, 'protein') == ['Protein bar']
+
+def test_like_fallback_when_fts_is_disabled(app, user, monkeypatch):
+    monkeypatch.setattr(custom_food_index, 'enabled', False)
+    with app.app_context():
+        add_food(user, 'Chicken curry')
+        assert search(user, 'icken', ranked=False) == ['Chicken curry']
+
+def test_custom_foods_route_search(client, auth_headers, app, user):
+    with app.app_context():
+        add_food(user, 'Chicken curry')
+        add_food(user, 'Beef stew')
+
+    response = client.get('/api/user/custom-foods?search=chick&sort_by=relevance', headers=auth_headers)
+    assert response.status_code == 200
+    assert [food['name'] for food in response.json['custom_foods']] == ['Chicken curry']
@@ -0,0 +1,62 @@
+import csv
+import gzip
+import io
+import json
+from services import export_service
+from services.export_service import EXPORT_COLUMNS, csv_chunks, ndjson_chunks
+
+def export(client, auth_headers, query=''):
+    response = client.get(f'/api/food/logs/export{query}', headers=auth_headers)
+    assert response.status_code == 200
+    return response
+
+def test_ndjson_export_is_oldest_first(client, auth_headers, log_food):
+    log_food('Dinner', 600, '2024-03-06T19:00:00')
+    log_food('Breakfast', 300, '2024-03-05T08:00:00')
+
+    response = export(client, auth_headers)
+    assert response.mimetype == 'application/x-ndjson'
+    assert response.headers['Content-Disposition'] == 'attachment; filename="food_logs.ndjson"'
+
+    rows = [json.loads(line) for line in response.data.decode('utf-8').splitlines()]
+    assert [row['food_name'] for row in rows] == ['Breakfast', 'Dinner']
+    assert list(rows[0]) == EXPORT_COLUMNS
+    assert rows[0]['consumed_at'] == '2024-03-05T08:00:00'
+
+def test_csv_export_with_date_range_and_gzip(client, auth_headers, log_food):
+    for day in (4, 5, 6, 7):
+        log_food(f'Day {day}', consumed_at=f'2024-03-0{day}T23:30:00')
+
+    response = export(client, auth_headers, '?format=csv&start_date=2024-03-05&end_date=2024-03-06&gzip=true')
+    assert response.mimetype == 'application/gzip'
+    assert response.headers['Content-Disposition'] == 'attachment; filename="food_logs.csv.gz"'
+
+    rows = list(csv.DictReader(io.StringIO(gzip.decompress(response.data).decode('utf-8'))))
+    assert [row['food_name'] for row in rows] == ['Day 5', 'Day 6']
+
+def test_open_ended_ranges(client, auth_headers, log_food):
+    for day in (4, 5, 6):
+        log_food(f'Day {day}', consumed_at=f'2024-03-0{day}T12:00:00')
+
+    since = export(client, auth_headers, '?start_date=2024-03-05').data.decode('utf-8').splitlines()
+    until = export(client, auth_headers, '?end_date=2024-03-05').data.decode('utf-8').splitlines()
+    assert [json.loads(line)['food_name'] for line in since] == ['Day 5', 'Day 6']
+    assert [json.loads(line)['food_name'] for line in until] == ['Day 4', 'Day 5']
+
+def test_invalid_parameters(client, auth_headers):
+    assert client.get('/api/food/logs/export?format=xml', headers=auth_headers).status_code == 400
+    assert client.get('/api/food/logs/export?start_date=03/05/2024', headers=auth_headers).status_code == 400
+    response = client.get('/api/food/logs/export?start_date=2024-03-06&end_date=2024-03-05', headers=auth_headers)
+    assert response.status_code == 400
+
+def test_chunks_are_bounded(monkeypatch):
+    monkeypatch.setattr(export_service, 'CHUNK_BYTES', 200)
+    rows = [tuple(range(len(EXPORT_COLUMNS)))] * 20
+
+    ndjson = list(ndjson_chunks(iter(rows)))
+    assert len(ndjson) > 1
+    assert b''.join(ndjson).count(b'\n') == 20
+
+    chunks = list(csv_chunks(iter(rows)))
+    assert len(chunks) > 1
+    assert b''.join(chunks).decode('utf-8').splitlines()[0] == ','.join(EXPORT_COLUMNS)
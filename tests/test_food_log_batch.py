@@ -0,0 +1,80 @@
+from app import db
+from models.food_log import FoodLog
+from services.rollup_service import check_rollups
+
+ENTRY = {'food_name': 'Toast', 'serving_size': 30, 'calories': 100, 'meal_type': 'breakfast', 'consumed_at': '2024-03-05T08:00:00'}
+
+def test_batch_inserts_valid_entries_in_order(app, client, auth_headers, user):
+    entries = [
+        dict(ENTRY, client_id='a'),
+        dict(ENTRY, client_id='b', calories=-5),
+        dict(ENTRY, client_id='c', food_name='Eggs', calories=200, servings_consumed=2, consumed_at='2024-03-06T08:00:00'),
+        'not an entry',
+        dict(ENTRY, client_id='e', consumed_at='yesterday')
+    ]
+    response = client.post('/api/food/log/batch', json={'entries': entries}, headers=auth_headers)
+    assert response.status_code == 201
+    assert (response.json['created'], response.json['failed']) == (2, 3)
+
+    results = response.json['results']
+    assert [result['status'] for result in results] == ['created', 'error', 'created', 'error', 'error']
+    assert [result['client_id'] for result in results] == ['a', 'b', 'c', None, 'e']
+    assert results[4]['errors'] == ['consumed_at must be an ISO 8601 timestamp']
+
+    with app.app_context():
+        assert db.session.get(FoodLog, results[0]['id']).food_name == 'Toast'
+        assert db.session.get(FoodLog, results[2]['id']).food_name == 'Eggs'
+        assert check_rollups(user) == []
+
+    daily = client.get('/api/analytics/daily/2024-03-06', headers=auth_headers).json
+    assert daily['calorie_progress']['consumed'] == 400
+
+def test_batch_bumps_data_version(client, auth_headers):
+    etag = client.get('/api/analytics/daily/2024-03-05', headers=auth_headers).headers['ETag']
+    client.post('/api/food/log/batch', json=[ENTRY], headers=auth_headers)
+
+    response = client.get('/api/analytics/daily/2024-03-05', headers={**auth_headers, 'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.json['calorie_progress']['consumed'] == 100
+
+def test_all_invalid_batch_writes_nothing(app, client, auth_headers, user):
+    response = client.post('/api/food/log/batch', json={'entries': [{'food_name': 'Toast'}]}, headers=auth_headers)
+    assert response.status_code == 400
+    assert response.json['created'] == 0
+
+    with app.app_context():
+        assert FoodLog.query.filter_by(user_id=user).count() == 0
+
+def test_batch_limits(app, client, auth_headers):
+    assert client.post('/api/food/log/batch', json={'entries': []}, headers=auth_headers).status_code == 400
+
+    app.config['FOOD_LOG_BATCH_MAX_ITEMS'] = 2
+    response = client.post('/api/food/log/batch', json=[ENTRY] * 3, headers=auth_headers)
+    assert response.status_code == 400
+    assert response.json['error'] == 'At most 2 entries per batch'
+
+def test_wrongly_typed_fields_fail_only_their_entry(app, client, auth_headers, user):
+    entries = [
+        dict(ENTRY, food_name=5),
+        dict(ENTRY, food_name=['Toast']),
+        dict(ENTRY, food_name=None),
+        dict(ENTRY, brand={'name': 'Acme'}, meal_type=3),
+        dict(ENTRY, calories=True),
+        dict(ENTRY, confidence_score='high'),
+        dict(ENTRY, client_id='ok', confidence_score='0.9')
+    ]
+    response = client.post('/api/food/log/batch', json={'entries': entries}, headers=auth_headers)
+    assert response.status_code == 201
+
+    results = response.json['results']
+    assert [result['status'] for result in results] == ['error'] * 6 + ['created']
+    assert [result['errors'] for result in results[:6]] == [
+        ['food_name must be a string'],
+        ['food_name must be a string'],
+        ['food_name is required'],
+        ['brand must be a string', 'meal_type must be a string'],
+        ['calories must be a valid number'],
+        ['confidence_score must be a valid number']
+    ]
+    with app.app_context():
+        assert [(log.food_name, log.confidence_score) for log in FoodLog.query.filter_by(user_id=user)] == [('Toast', 0.9)]
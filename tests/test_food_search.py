@@ -0,0 +1,50 @@
+import json
+from types import SimpleNamespace
+from services.openai_service import OpenAIService
+from tests.conftest import FOOD_RESULT
+
+class CannedClient:
+    """Answers every chat_completion with the given text"""
+
+    def __init__(self, content):
+        self.content = content
+        self.operations = []
+
+    def chat_completion(self, operation, **kwargs):
+        self.operations.append(operation)
+        message = SimpleNamespace(content=self.content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+def test_batch_search_sends_unique_misses_in_one_call(client, auth_headers, fake_ai):
+    items = ['apple pie', {'name': 'Apple  Pie', 'portion': ''}, {'name': 'kale chips', 'portion': '1 bag'}]
+
+    response = client.post('/api/food/search-batch', json={'items': items}, headers=auth_headers)
+    assert response.status_code == 200
+    assert [result['source'] for result in response.json['results']] == ['ai', 'ai', 'ai']
+    assert fake_ai == [('batch', [('apple pie', ''), ('kale chips', '1 bag')])]
+
+    response = client.post('/api/food/search-batch', json={'items': items}, headers=auth_headers)
+    assert response.json['cached_count'] == 3
+    assert len(fake_ai) == 1
+
+def test_batch_search_validates_items(client, auth_headers, app):
+    app.config['FOOD_SEARCH_BATCH_MAX_ITEMS'] = 2
+    assert client.post('/api/food/search-batch', json={'items': []}, headers=auth_headers).status_code == 400
+    assert client.post('/api/food/search-batch', json={'items': ['a', 'b', 'c']}, headers=auth_headers).status_code == 400
+    assert client.post('/api/food/search-batch', json={'items': ['a', {'portion': '1 cup'}]}, headers=auth_headers).status_code == 400
+
+def test_batch_completion_is_padded_to_the_item_count():
+    service = OpenAIService(client=CannedClient(json.dumps([FOOD_RESULT])))
+
+    results = service.search_foods_batch([('rice', ''), ('beans', '')])
+
+    assert results[0] == FOOD_RESULT
+    assert results[1] == {'error': 'Missing from AI response'}
+    assert service.client.operations == ['search_food_batch']
+
+def test_unparseable_batch_completion_fails_every_item():
+    service = OpenAIService(client=CannedClient('not json'))
+
+    results = service.search_foods_batch([('rice', ''), ('beans', '')])
+
+    assert [result['error'] for result in results] == ['Failed to parse AI response'] * 2
@@ -0,0 +1,77 @@
+import json
+import os
+import runpy
+import subprocess
+import sys
+from services.job_service import job_runner
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONF = os.path.join(ROOT, 'gunicorn.conf.py')
+OVERRIDES = ('GUNICORN_POOL', 'WEB_CONCURRENCY', 'GUNICORN_THREADS', 'GUNICORN_TIMEOUT', 'GUNICORN_GRACEFUL_TIMEOUT', 'GUNICORN_BIND', 'PORT')
+SETTINGS = ['bind', 'workers', 'threads', 'worker_class', 'timeout', 'graceful_timeout', 'preload_app', 'proc_name']
+
+def load_settings(**env):
+    """Evaluate gunicorn.conf.py in a fresh interpreter (it reads Config and the environment at import)"""
+    base = {name: value for name, value in os.environ.items() if name not in OVERRIDES and not name.startswith('OPENAI_TIMEOUT')}
+    env = dict(base, OPENAI_MAX_RETRIES='2', OPENAI_DEFAULT_TIMEOUT='30', OPENAI_BACKOFF_MAX='8', OPENAI_QUEUE_TIMEOUT='10', **env)
+    code = (
+        'import json, multiprocessing, os, runpy; '
+        'conf = runpy.run_path("gunicorn.conf.py"); '
+        f'settings = {{name: conf[name] for name in {SETTINGS!r}}}; '
+        'settings.update(cpus=multiprocessing.cpu_count(), budget=conf["ai_request_budget"](), resume=os.environ["JOB_RESUME_ON_START"]); '
+        'print(json.dumps(settings))'
+    )
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def test_ai_request_budget_covers_every_retry():
+    # Slowest timeout 60s x 3 attempts + 8s backoff x 2 retries + 10s queueing
+    assert load_settings()['budget'] == 206
+
+def test_pool_profiles():
+    web = load_settings(GUNICORN_POOL='web')
+    assert (web['workers'], web['threads'], web['timeout'], web['graceful_timeout']) == (web['cpus'] * 2 + 1, 4, 30, 30)
+    assert (web['bind'], web['proc_name']) == ('0.0.0.0:8000', 'calorie-api-web')
+
+    ai = load_settings(GUNICORN_POOL='ai', OPENAI_MAX_CONCURRENCY='8')
+    assert (ai['workers'], ai['threads']) == (max(2, ai['cpus']), 16)
+    assert ai['timeout'] == ai['graceful_timeout'] == ai['budget']
+    assert ai['bind'] == '0.0.0.0:8001'
+
+    # The single pool serves AI routes too, so shutdown waits out a full retry cycle
+    combined = load_settings()
+    assert (combined['timeout'], combined['graceful_timeout']) == (30, combined['budget'])
+    assert combined['preload_app'] is True and combined['worker_class'] == 'gthread'
+
+def test_environment_overrides():
+    settings = load_settings(GUNICORN_POOL='ai', WEB_CONCURRENCY='3', GUNICORN_THREADS='32', GUNICORN_TIMEOUT='90', PORT='9000')
+    assert (settings['workers'], settings['threads'], settings['timeout'], settings['bind']) == (3, 32, 90, '0.0.0.0:9000')
+
+def test_master_does_not_resume_jobs():
+    assert load_settings(JOB_RESUME_ON_START='true')['resume'] == 'false'
+
+def test_ai_routes_exist(app):
+    rules = {rule.rule for rule in app.url_map.iter_rules()}
+    conf = runpy.run_path(CONF)
+    assert set(conf['AI_ROUTES']) <= rules
+
+def test_post_fork_resumes_jobs_in_worker(app, monkeypatch):
+    monkeypatch.setenv('JOB_RESUME_ON_START', 'false')
+    conf = runpy.run_path(CONF)
+    monkeypatch.setattr(job_runner, 'after_fork', lambda: 2)
+    messages = []
+
+    class Server:
+        class app:
+            @staticmethod
+            def wsgi():
+                return app
+
+        class log:
+            info = messages.append
+
+    class Worker:
+        pid = 1234
+
+    conf['post_fork'](Server, Worker)
+    assert messages == ['Worker 1234 resumed 2 analysis jobs']
@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from app import db
+from models.image_analysis import ImageAnalysis
+from models.user import User
+from services.cache_service import ImageAnalysisIndex
+
+def other_user(app):
+    with app.app_context():
+        user = User(email='other@example.com', name='Other')
+        user.set_password('Passw0rdX')
+        db.session.add(user)
+        db.session.commit()
+        return user.id
+
+def test_exact_and_perceptual_matches(app, user):
+    index = ImageAnalysisIndex()
+    with app.app_context():
+        index.store('a' * 64, '00000000000000ff', 'lunch', {'food_name': 'Pizza'}, user)
+
+        result, match = index.lookup('a' * 64, '00000000000000ff', 'Lunch ', user)
+        assert result == {'food_name': 'Pizza'} and match['match'] == 'exact'
+
+        result, match = index.lookup('b' * 64, '00000000000000fe', 'lunch', user)
+        assert result == {'food_name': 'Pizza'} and match == {'match': 'perceptual', 'distance': 1, 'analysis_id': 1}
+
+        assert index.lookup('b' * 64, '00000000000000fe', 'dinner', user) == (None, None)
+
+def test_near_duplicates_are_scoped_to_the_uploader(app, user):
+    stranger = other_user(app)
+    index = ImageAnalysisIndex()
+    with app.app_context():
+        index.store('a' * 64, '00000000000000ff', 'my lunch', {'food_name': 'Pizza'}, user)
+
+        # Identical bytes and description are the same request, so exact hits are shared
+        result, match = index.lookup('a' * 64, '00000000000000ff', 'my lunch', stranger)
+        assert match['match'] == 'exact'
+
+        assert index.lookup('b' * 64, '00000000000000fe', 'my lunch', stranger) == (None, None)
+        assert index.lookup('b' * 64, '00000000000000fe', 'my lunch') == (None, None)
+        assert index.lookup('b' * 64, '00000000000000fe', 'my lunch', user)[1]['match'] == 'perceptual'
+
+def test_expired_analyses_are_misses(app, user):
+    app.config['IMAGE_DEDUP_TTL_SECONDS'] = 60
+    index = ImageAnalysisIndex()
+    with app.app_context():
+        index.store('a' * 64, '00000000000000ff', '', {'food_name': 'Pizza'}, user)
+        ImageAnalysis.query.update({'created_at': datetime.utcnow() - timedelta(hours=1)})
+        db.session.commit()
+
+        assert index.lookup('a' * 64, '00000000000000ff', '', user) == (None, None)
+        assert index.lookup('b' * 64, '00000000000000ff', '', user) == (None, None)
+
+def test_size_limit_evicts_least_recently_used(app, user):
+    app.config.update(IMAGE_DEDUP_MAX_ENTRIES=2, AI_CACHE_EVICT_INTERVAL=1)
+    index = ImageAnalysisIndex()
+    with app.app_context():
+        index.store('a' * 64, '0000000000000000', '', {'food_name': 'A'}, user)
+        index.store('b' * 64, '00000000ffffffff', '', {'food_name': 'B'}, user)
+        ImageAnalysis.query.filter_by(content_hash='a' * 64).update({'last_accessed_at': datetime.utcnow()})
+        ImageAnalysis.query.filter_by(content_hash='b' * 64).update({'last_accessed_at': datetime(2000, 1, 1)})
+        db.session.commit()
+        index.lookup('x' * 64, '0000000000000000', '', user)
+        assert index._size == 2
+
+        index.store('c' * 64, 'ffffffffffffffff', '', {'food_name': 'C'}, user)
+        assert index.size() == 2
+        assert index.evictions == 1
+        assert index.lookup('x' * 64, '00000000ffffffff', '', user) == (None, None)
+        assert index._size == 2
+
+def test_in_memory_index_follows_evictions_by_other_workers(app, user):
+    app.config.update(IMAGE_DEDUP_MAX_ENTRIES=1, AI_CACHE_EVICT_INTERVAL=1000)
+    this_worker, other_worker = ImageAnalysisIndex(), ImageAnalysisIndex()
+    with app.app_context():
+        for value in range(5):
+            this_worker.store(f'{value}' * 64, f'{value:016x}', '', {'value': value}, user)
+        this_worker.lookup('x' * 64, '0000000000000000', '', user)
+        assert this_worker._size == 5
+
+        other_worker.evict()
+        statements = []
+        event.listen(db.engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+
+        # A match on an evicted row is a miss and drops that hash right away
+        assert this_worker.lookup('x' * 64, '0000000000000000', '', user) == (None, None)
+        assert this_worker._size == 4
+        assert not any('count(' in statement.lower() for statement in statements)
+
+        # The periodic reload forgets the rest
+        this_worker._loaded_at -= app.config['IMAGE_DEDUP_RESYNC_SECONDS']
+        this_worker.lookup('x' * 64, '0000000000000000', '', user)
+        assert this_worker._size == 1
+
+def test_deleting_a_user_removes_their_analyses(app, client, auth_headers, user):
+    index = ImageAnalysisIndex()
+    with app.app_context():
+        index.store('a' * 64, '00000000000000ff', '', {'food_name': 'Pizza'}, user)
+
+    response = client.delete('/api/user/delete-account', json={'confirm_deletion': True}, headers=auth_headers)
+    assert response.status_code == 200
+    with app.app_context():
+        assert ImageAnalysis.query.count() == 0
@@ -0,0 +1,55 @@
+from io import BytesIO
+from PIL import Image
+from utils.helpers import process_food_image
+
+def jpeg_bytes(size, exif_orientation=None):
+    buffer = BytesIO()
+    image = Image.linear_gradient('L').convert('RGB').resize(size)
+    if exif_orientation:
+        exif = Image.Exif()
+        exif[0x0112] = exif_orientation
+        image.save(buffer, 'JPEG', exif=exif)
+    else:
+        image.save(buffer, 'JPEG')
+    return buffer.getvalue()
+
+def test_large_image_is_downscaled_for_storage_and_model():
+    processed = process_food_image(jpeg_bytes((3000, 2000)))
+
+    assert processed['detail'] == 'high'
+    assert processed['image'].size == (1024, 683)
+    assert processed['stats']['model_size'] == [1024, 683]
+    assert processed['stats']['original_bytes'] == len(processed['original_bytes'])
+    assert Image.open(BytesIO(processed['storage_bytes'])).size == (1024, 683)
+
+def test_small_image_uses_low_detail():
+    processed = process_food_image(jpeg_bytes((400, 300)))
+
+    assert processed['detail'] == 'low'
+    assert processed['stats']['model_size'] == [400, 300]
+
+def test_exif_orientation_is_applied_once():
+    processed = process_food_image(jpeg_bytes((600, 300), exif_orientation=6))
+
+    assert processed['image'].size == (300, 600)
+
+def test_payload_quality_steps_down_to_fit_target():
+    processed = process_food_image(jpeg_bytes((1024, 1024)), detail='high', target_bytes=1)
+
+    assert processed['stats']['jpeg_quality'] == 50
+
+def test_analyze_image_stores_the_processed_copy(client, auth_headers, fake_ai, tmp_path, monkeypatch):
+    # Uploads are saved under the working directory
+    monkeypatch.chdir(tmp_path)
+    response = client.post(
+        '/api/food/analyze-image',
+        data={'image': (BytesIO(jpeg_bytes((2000, 1500))), 'meal.jpg'), 'description': 'pasta'},
+        headers=auth_headers,
+        content_type='multipart/form-data'
+    )
+
+    assert response.status_code == 200
+    assert response.json['image_processing']['detail'] == 'high'
+    assert fake_ai == [('image', 'pasta', 'high')]
+    with Image.open(response.json['image_path']) as stored:
+        assert stored.size == (1024, 768)
@@ -0,0 +1,96 @@
+import os
+import subprocess
+import sys
+import time
+import pytest
+from sqlalchemy import event
+import routes.food
+from app import create_app, db
+from config import Config
+from models.analysis_job import AnalysisJob
+from models.image_analysis import ImageAnalysis
+from services.job_service import job_runner
+
+def wait_for_job(client, headers, job_id, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = client.get(f'/api/food/jobs/{job_id}', headers=headers).json['job']
+        if job['status'] in ('succeeded', 'failed'):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f'Job {job_id} did not finish')
+
+def test_recipe_analysis_job(client, auth_headers, fake_ai):
+    response = client.post('/api/food/analyze-recipe?async=true', json={'recipe_text': 'rice and beans', 'servings': 2}, headers=auth_headers)
+    assert response.status_code == 202
+    assert response.headers['Location'] == response.json['status_url']
+
+    job = wait_for_job(client, auth_headers, response.json['job_id'])
+    assert job['status'] == 'succeeded'
+    assert fake_ai == [('recipe', 'rice and beans', 2)]
+
+def test_create_app_resumes_jobs_only_when_enabled(app, user, monkeypatch):
+    with app.app_context():
+        db.session.add(AnalysisJob(id='a' * 32, user_id=user, job_type='analyze_recipe', params='{}'))
+        db.session.commit()
+
+    resumed = []
+    monkeypatch.setattr(job_runner, 'resume_pending', lambda: resumed.append(True))
+
+    create_app()
+    assert resumed == []
+
+    monkeypatch.setattr(Config, 'JOB_RESUME_ON_START', True)
+    create_app()
+    assert resumed == [True]
+
+def test_only_serving_entry_points_resume_jobs(tmp_path):
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{tmp_path / 'entry.db'}")
+    env.pop('JOB_RESUME_ON_START')
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    def resume_flag(code):
+        result = subprocess.run([sys.executable, '-c', code], cwd=root, env=env, capture_output=True, text=True, check=True)
+        return result.stdout.strip().splitlines()[-1]
+
+    assert resume_flag("from app import create_app; print(create_app().config['JOB_RESUME_ON_START'])") == 'False'
+    assert resume_flag("import wsgi; print(wsgi.app.config['JOB_RESUME_ON_START'])") == 'True'
+
+@pytest.fixture
+def enforce_foreign_keys(app):
+    """Make SQLite enforce foreign keys like PostgreSQL does"""
+    def enable(dbapi_connection, connection_record):
+        dbapi_connection.execute('PRAGMA foreign_keys=ON')
+
+    with app.app_context():
+        event.listen(db.engine, 'connect', enable)
+        db.engine.dispose()
+
+def test_deleting_a_user_removes_their_jobs(app, client, auth_headers, user, enforce_foreign_keys):
+    with app.app_context():
+        db.session.add(AnalysisJob(id='a' * 32, user_id=user, job_type='analyze_recipe', params='{}'))
+        db.session.add(ImageAnalysis(user_id=user, content_hash='a' * 64, dhash='0' * 16, description_key='k', result='{}'))
+        db.session.commit()
+
+    response = client.delete('/api/user/delete-account', json={'confirm_deletion': True}, headers=auth_headers)
+    assert response.status_code == 200
+    with app.app_context():
+        assert AnalysisJob.query.count() == 0
+        assert ImageAnalysis.query.count() == 0
+
+def test_stream_ends_with_error_when_job_disappears(app, client, auth_headers, user, monkeypatch):
+    with app.app_context():
+        db.session.add(AnalysisJob(id='a' * 32, user_id=user, job_type='analyze_recipe', params='{}'))
+        db.session.commit()
+
+    def delete_job(seconds):
+        AnalysisJob.query.filter_by(id='a' * 32).delete()
+        db.session.commit()
+
+    monkeypatch.setattr(routes.food.time, 'sleep', delete_job)
+    response = client.get(f"/api/food/jobs/{'a' * 32}?stream=true", headers=auth_headers)
+    events = response.data.decode('utf-8').strip().split('\n\n')
+
+    assert len(events) == 2
+    assert events[0].startswith('event: status\ndata: ') and '"status": "queued"' in events[0]
+    assert events[1] == 'event: error\ndata: {"error": "Job not found"}'
@@ -0,0 +1,65 @@
+import os
+import subprocess
+import sys
+import pytest
+from services.metrics_service import metrics
+
+METRICS_HEADERS = {'Authorization': 'Bearer scrape-token'}
+
+def stage_count(client, stage, operation):
+    prefix = f'calorie_api_stage_duration_seconds_count{{stage="{stage}",operation="{operation}"}} '
+    for line in client.get('/api/metrics', headers=METRICS_HEADERS).data.decode('utf-8').splitlines():
+        if line.startswith(prefix):
+            return int(line[len(prefix):])
+    return 0
+
+@pytest.fixture
+def fresh_metrics(app):
+    app.config['METRICS_TOKEN'] = 'scrape-token'
+    metrics.reset()
+    yield metrics
+    metrics.reset()
+
+def test_login_times_password_check(client, user, fresh_metrics):
+    response = client.post('/api/auth/login', json={'email': 'test@example.com', 'password': 'Passw0rdX'})
+    assert response.status_code == 200
+    response = client.post('/api/auth/login', json={'email': 'test@example.com', 'password': 'wrong'})
+    assert response.status_code == 401
+    response = client.post('/api/auth/login', json={'email': 'nobody@example.com', 'password': 'wrong'})
+    assert response.status_code == 401
+
+    assert stage_count(client, 'bcrypt', 'check') == 2
+    assert stage_count(client, 'bcrypt', 'hash') == 0
+
+def test_change_password_times_check_and_hash(client, auth_headers, fresh_metrics):
+    response = client.put('/api/auth/change-password', json={'current_password': 'Passw0rdX', 'new_password': 'NewPassw0rdY'}, headers=auth_headers)
+    assert response.status_code == 200
+
+    assert stage_count(client, 'bcrypt', 'check') == 1
+    assert stage_count(client, 'bcrypt', 'hash') == 1
+    response = client.post('/api/auth/login', json={'email': 'test@example.com', 'password': 'NewPassw0rdY'})
+    assert response.status_code == 200
+
+def test_request_metrics_recorded(client, auth_headers, fresh_metrics):
+    client.get('/api/food/logs', headers=auth_headers)
+    body = client.get('/api/metrics', headers=METRICS_HEADERS).data.decode('utf-8')
+    assert 'calorie_api_http_requests_total{endpoint="food.get_food_logs",method="GET",status="200"} 1' in body
+
+def test_metrics_endpoint_requires_the_token(app, client, auth_headers):
+    assert client.get('/api/metrics').status_code == 404
+    assert client.get('/api/metrics', headers=METRICS_HEADERS).status_code == 404
+
+    app.config['METRICS_TOKEN'] = 'scrape-token'
+    assert client.get('/api/metrics').status_code == 401
+    assert client.get('/api/metrics', headers=auth_headers).status_code == 401
+    assert client.get('/api/metrics', headers={'Authorization': 'Bearer scrape-tokeñ'}).status_code == 401
+
+    response = client.get('/api/metrics', headers=METRICS_HEADERS)
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+
+def test_user_model_does_not_import_metrics():
+    code = 'import sys, models.user; print("services.metrics_service" in sys.modules)'
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, '-c', code], cwd=root, env=dict(os.environ), capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == 'False'
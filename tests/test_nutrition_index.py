@@ -0,0 +1,45 @@
+import pytest
+from services.nutrition_service import nutrition_index, parse_portion_grams, tokenize
+
+@pytest.fixture
+def reference_foods(app):
+    with app.app_context():
+        nutrition_index.import_csv(app.config['REFERENCE_FOODS_PATH'])
+    return nutrition_index
+
+@pytest.mark.parametrize('portion, grams', [
+    ('', 118), ('150g', 150), ('6 oz', 170.1), ('2', 236), ('2 servings', 236), ('a handful', None)
+])
+def test_parse_portion_grams(portion, grams):
+    result = parse_portion_grams(portion, 118)
+    assert result == (pytest.approx(grams) if grams is not None else None)
+
+def test_tokenize_folds_plurals():
+    assert tokenize('Bananas, Cherries & Potatoes') == ['banana', 'cherry', 'potato']
+
+def test_lookup_scales_nutrition_to_the_portion(reference_foods):
+    result = reference_foods.lookup('Bananas', '200 g')
+
+    assert result['food_name'] == 'Banana, raw'
+    assert result['source'] == 'reference'
+    assert result['serving_size_grams'] == 200
+    assert result['nutrition']['calories'] == pytest.approx(178)
+
+def test_lookup_leaves_unclear_queries_to_the_ai(reference_foods):
+    assert reference_foods.lookup('banana', 'a handful') is None
+    assert reference_foods.lookup('banana split with hot fudge') is None
+
+def test_prefix_search(reference_foods):
+    names = [food['name'] for _, _, food in reference_foods.search('orange ju')]
+    assert names[0] == 'Orange juice, raw'
+
+def test_search_route_answers_from_reference_without_ai(client, auth_headers, reference_foods, fake_ai):
+    response = client.get('/api/food/search?q=banana', headers=auth_headers)
+
+    assert response.json['source'] == 'reference'
+    assert response.json['ai_result']['food_name'] == 'Banana, raw'
+    assert fake_ai == []
+
+    response = client.get('/api/food/search?q=dragon%20fruit%20smoothie', headers=auth_headers)
+    assert response.json['source'] == 'ai'
+    assert fake_ai == [('search', 'dragon fruit smoothie', '')]
@@ -0,0 +1,94 @@
+from types import SimpleNamespace
+import httpx
+import openai
+import pytest
+from services.openai_client import CircuitBreaker, CircuitOpenError, ResilientOpenAIClient, UpstreamBusyError
+
+def timeout_error():
+    return openai.APITimeoutError(request=httpx.Request('POST', 'https://api.openai.com/v1/chat/completions'))
+
+class FakeCompletions:
+    """Stands in for client.chat.completions: raises queued errors, then succeeds"""
+
+    def __init__(self, errors=()):
+        self.errors = list(errors)
+        self.calls = []
+
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        if self.errors:
+            raise self.errors.pop(0)
+        return SimpleNamespace(choices=[], usage=None)
+
+def make_client(app, completions, **settings):
+    app.config.update(OPENAI_BACKOFF_BASE=0, **settings)
+    client = ResilientOpenAIClient(app)
+    client._client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return client
+
+def test_breaker_opens_then_allows_one_trial():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.state == 'closed'
+    breaker.record_failure()
+    assert breaker.state == 'open'
+
+    # reset_timeout has passed: exactly one trial call gets through
+    assert breaker.allow() is True
+    assert breaker.state == 'half_open'
+    assert breaker.allow() is False
+
+    breaker.record_success()
+    assert breaker.state == 'closed' and breaker.allow() is True
+
+def test_failed_trial_reopens_breaker():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.allow() is True
+    breaker.record_failure()
+    assert breaker.state == 'open' and breaker.times_opened == 2
+
+def test_retries_timeouts_with_the_operation_timeout(app):
+    completions = FakeCompletions([timeout_error(), timeout_error()])
+    client = make_client(app, completions, OPENAI_MAX_RETRIES=2)
+
+    client.chat_completion('search_food', model='gpt-4', messages=[])
+
+    assert len(completions.calls) == 3
+    assert completions.calls[0]['timeout'] == app.config['OPENAI_TIMEOUTS']['search_food']
+    assert (client.calls, client.retries, client.failures) == (1, 2, 0)
+    assert client.in_flight == 0
+
+def test_open_circuit_fails_fast(app):
+    completions = FakeCompletions([timeout_error()])
+    client = make_client(app, completions, OPENAI_MAX_RETRIES=0, OPENAI_BREAKER_THRESHOLD=1)
+
+    with pytest.raises(openai.APITimeoutError):
+        client.chat_completion('search_food', model='gpt-4', messages=[])
+    with pytest.raises(CircuitOpenError):
+        client.chat_completion('search_food', model='gpt-4', messages=[])
+
+    assert len(completions.calls) == 1
+    assert client.stats()['circuit_breaker']['state'] == 'open'
+
+def test_client_errors_do_not_trip_the_breaker(app):
+    response = httpx.Response(400, request=httpx.Request('POST', 'https://api.openai.com/v1/chat/completions'))
+    completions = FakeCompletions([openai.BadRequestError('bad request', response=response, body=None)])
+    client = make_client(app, completions, OPENAI_MAX_RETRIES=2, OPENAI_BREAKER_THRESHOLD=1)
+
+    with pytest.raises(openai.BadRequestError):
+        client.chat_completion('search_food', model='gpt-4', messages=[])
+
+    assert len(completions.calls) == 1
+    assert client.breaker.state == 'closed'
+
+def test_saturated_client_rejects_after_queue_timeout(app):
+    client = make_client(app, FakeCompletions(), OPENAI_MAX_CONCURRENCY=1, OPENAI_QUEUE_TIMEOUT=0.05)
+    client._acquire_slot()
+
+    with pytest.raises(UpstreamBusyError):
+        client.chat_completion('search_food', model='gpt-4', messages=[])
+
+    client._release_slot()
+    assert client.rejected == 1
+    client.chat_completion('search_food', model='gpt-4', messages=[])
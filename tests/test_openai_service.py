@@ -0,0 +1,81 @@
+import base64
+import json
+from types import SimpleNamespace
+import pytest
+from services.openai_service import (
+    OpenAIService, completion_text, food_batch_search_request, food_search_request, image_analysis_request,
+    recipe_analysis_request
+)
+
+class RecordingClient:
+    """Records each chat_completion call and answers with the given text"""
+
+    def __init__(self, content):
+        self.content = content
+        self.requests = []
+
+    def chat_completion(self, operation, **kwargs):
+        self.requests.append((operation, kwargs))
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=self.content))])
+
+RECIPE = {'recipe_name': 'Pancakes', 'total_servings': 4, 'per_serving_nutrition': {'calories': 220}}
+
+@pytest.mark.parametrize('content', [
+    '{"a": 1}',
+    '```json\n{"a": 1}\n```',
+    '```\n{"a": 1}\n```'
+])
+def test_completion_text_strips_code_fences(content):
+    response = SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+    assert json.loads(completion_text(response)) == {'a': 1}
+
+def test_recipe_analysis_sends_builder_request(app):
+    client = RecordingClient('```json\n' + json.dumps(RECIPE) + '\n```')
+    with app.app_context():
+        result = OpenAIService(client=client).analyze_recipe('flour, eggs, milk', 4)
+
+    assert result == RECIPE
+    assert client.requests == [('analyze_recipe', recipe_analysis_request('flour, eggs, milk', 4))]
+    assert 'Number of servings: 4' in client.requests[0][1]['messages'][0]['content']
+
+def test_food_search_sends_builder_request(app):
+    client = RecordingClient('not json')
+    with app.app_context():
+        result = OpenAIService(client=client).search_food_by_name('apple', '1 medium')
+
+    assert result['error'] == 'Failed to parse AI response'
+    assert client.requests == [('search_food', food_search_request('apple', '1 medium'))]
+
+def test_batch_search_sends_builder_request(app):
+    client = RecordingClient('[{"food_name": "Apple"}]')
+    items = [('apple', '1 medium'), ('rice', '')]
+    with app.app_context():
+        results = OpenAIService(client=client).search_foods_batch(items)
+
+    assert results == [{'food_name': 'Apple'}, {'error': 'Missing from AI response'}]
+    assert client.requests == [('search_food_batch', food_batch_search_request(items))]
+    prompt = client.requests[0][1]['messages'][0]['content']
+    assert '1. apple | portion: 1 medium' in prompt
+    assert '2. rice | portion: typical serving' in prompt
+    assert client.requests[0][1]['max_tokens'] == 600
+
+def test_image_analysis_encodes_bytes(app):
+    client = RecordingClient('{"food_name": "Toast"}')
+    with app.app_context():
+        result = OpenAIService(client=client).analyze_food_image(b'jpeg bytes', 'breakfast', 'low')
+
+    assert result == {'food_name': 'Toast'}
+    encoded = base64.b64encode(b'jpeg bytes').decode('utf-8')
+    assert client.requests == [('analyze_image', image_analysis_request(encoded, 'breakfast', 'low'))]
+    image_part = client.requests[0][1]['messages'][0]['content'][1]['image_url']
+    assert image_part == {'url': f'data:image/jpeg;base64,{encoded}', 'detail': 'low'}
+
+def test_recipe_route(client, auth_headers, fake_ai):
+    response = client.post('/api/food/analyze-recipe', json={'recipe_text': 'rice and beans', 'servings': 2}, headers=auth_headers)
+    assert response.status_code == 200
+    assert fake_ai == [('recipe', 'rice and beans', 2)]
+
+def test_ai_routes_are_served_by_the_threaded_app_only(app):
+    rules = {rule.rule for rule in app.url_map.iter_rules()}
+    assert '/api/food/analyze-recipe' in rules
+    assert not any(rule.startswith('/api/food/async') for rule in rules)
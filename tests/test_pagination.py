@@ -0,0 +1,59 @@
+import base64
+import json
+import pytest
+from models.food_log import FoodLog
+from utils.helpers import decode_cursor, encode_cursor
+
+ORDER_BY = [(FoodLog.consumed_at, True), (FoodLog.id, True)]
+SIGNATURE = 'consumed_at:desc,id:desc'
+
+def raw_cursor(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode('utf-8')).decode('ascii').rstrip('=')
+
+def test_cursor_round_trip(app):
+    with app.app_context():
+        cursor = encode_cursor(['2024-03-05T08:00:00', 7], ORDER_BY, backward=True)
+        values, backward = decode_cursor(cursor, ORDER_BY)
+    assert values[0].isoformat() == '2024-03-05T08:00:00'
+    assert (values[1], backward) == (7, True)
+
+def test_pages_walk_forward_and_back_through_ties(client, auth_headers, log_food):
+    for index in range(7):
+        log_food(f'Food {index}', consumed_at='2024-03-05T08:00:00' if index < 4 else f'2024-03-0{index + 2}T08:00:00')
+
+    seen, cursor = [], None
+    pages = []
+    while True:
+        url = '/api/food/logs?limit=3' + (f'&cursor={cursor}' if cursor else '')
+        page = client.get(url, headers=auth_headers).json
+        pages.append(page)
+        seen += [log['food_name'] for log in page['food_logs']]
+        cursor = page['pagination']['next_cursor']
+        if not cursor:
+            break
+
+    assert seen == ['Food 6', 'Food 5', 'Food 4', 'Food 3', 'Food 2', 'Food 1', 'Food 0']
+
+    previous = client.get(f"/api/food/logs?limit=3&cursor={pages[-1]['pagination']['prev_cursor']}", headers=auth_headers).json
+    assert [log['food_name'] for log in previous['food_logs']] == ['Food 3', 'Food 2', 'Food 1']
+
+@pytest.mark.parametrize('cursor', [
+    'not-a-cursor!',
+    raw_cursor([1, 2]),
+    raw_cursor('text'),
+    raw_cursor({'s': SIGNATURE, 'd': 'n'}),
+    raw_cursor({'s': SIGNATURE, 'd': 'n', 'v': 5}),
+    raw_cursor({'s': SIGNATURE, 'd': 'n', 'v': 'ab'}),
+    raw_cursor({'s': SIGNATURE, 'd': 'n', 'v': ['yesterday', 1]}),
+    raw_cursor({'s': SIGNATURE, 'd': 'n', 'v': [20240305, 1]}),
+    raw_cursor({'s': SIGNATURE, 'd': 'n', 'v': ['2024-03-05T08:00:00', {'id': 1}]}),
+    raw_cursor({'s': 'name:asc,id:asc', 'd': 'n', 'v': ['2024-03-05T08:00:00', 1]}),
+    raw_cursor({'s': SIGNATURE, 'd': 'n', 'v': ['2024-03-05T08:00:00']})
+])
+def test_malformed_cursors_are_rejected(client, auth_headers, cursor):
+    response = client.get(f'/api/food/logs?cursor={cursor}', headers=auth_headers)
+    assert response.status_code == 400
+    assert 'cursor' in response.json['error'].lower()
+
+    response = client.get(f'/api/user/custom-foods?cursor={cursor}', headers=auth_headers)
+    assert response.status_code == 400
@@ -0,0 +1,43 @@
+from services.response_cache import response_cache
+
+def endpoint_counts(client, auth_headers, endpoint):
+    stats = client.get('/api/analytics/cache-stats', headers=auth_headers).json['endpoints'].get(endpoint, {})
+    return stats.get('hits', 0), stats.get('misses', 0)
+
+def test_repeat_reads_are_served_from_cache(client, auth_headers, log_food):
+    log_food()
+    hits, misses = endpoint_counts(client, auth_headers, 'analytics.get_daily_analytics')
+    first = client.get('/api/analytics/daily/2024-03-05', headers=auth_headers)
+    second = client.get('/api/analytics/daily/2024-03-05', headers=auth_headers)
+
+    assert first.json == second.json
+    assert endpoint_counts(client, auth_headers, 'analytics.get_daily_analytics') == (hits + 1, misses + 1)
+
+def test_food_log_write_invalidates_cached_bodies(client, auth_headers, log_food):
+    log_food()
+    client.get('/api/analytics/daily/2024-03-05', headers=auth_headers)
+    log_food('Jam', 50)
+
+    daily = client.get('/api/analytics/daily/2024-03-05', headers=auth_headers).json
+    assert daily['calorie_progress']['consumed'] == 150
+
+def test_profile_change_invalidates_cached_bodies(client, auth_headers, log_food):
+    log_food()
+    client.get('/api/analytics/daily/2024-03-05', headers=auth_headers)
+    client.get('/api/analytics/summary', headers=auth_headers)
+    assert response_cache.stats()['entries'] == 2
+
+    response = client.put('/api/auth/profile', json={'daily_calorie_goal': 2500}, headers=auth_headers)
+    assert response.status_code == 200
+    assert response_cache.stats()['entries'] == 0
+
+    daily = client.get('/api/analytics/daily/2024-03-05', headers=auth_headers).json
+    assert daily['calorie_progress']['goal'] == 2500
+    summary = client.get('/api/analytics/summary', headers=auth_headers).json
+    assert summary['user_info']['daily_calorie_goal'] == 2500
+
+def test_disabled_cache_stores_nothing(client, auth_headers, log_food, monkeypatch):
+    monkeypatch.setattr(response_cache, 'enabled', False)
+    log_food()
+    client.get('/api/analytics/daily/2024-03-05', headers=auth_headers)
+    assert response_cache.stats()['entries'] == 0
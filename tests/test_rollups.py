@@ -0,0 +1,52 @@
+from datetime import date
+from app import db
+from models.daily_summary import DailyNutritionSummary
+from services.rollup_service import check_rollups, rebuild_rollups
+
+LOG = {'food_name': 'Toast', 'serving_size': 30, 'calories': 100, 'proteins': 4, 'meal_type': 'breakfast', 'consumed_at': '2024-03-05T08:00:00'}
+
+def summary(app, user_id, day=date(2024, 3, 5)):
+    with app.app_context():
+        row = db.session.get(DailyNutritionSummary, (user_id, day))
+        return row.to_dict() if row else None
+
+def test_writes_keep_rollups_consistent(app, client, auth_headers, user):
+    first = client.post('/api/food/log', json=LOG, headers=auth_headers).json['food_log']
+    client.post('/api/food/log', json=dict(LOG, calories=300, meal_type='lunch', servings_consumed=2), headers=auth_headers)
+
+    row = summary(app, user)
+    assert (row['calories'], row['item_count']) == (700, 2)
+    assert row['meal_breakdown']['lunch'] == {'calories': 600, 'count': 1}
+
+    client.put(f"/api/food/logs/{first['id']}", json={'consumed_at': '2024-03-06T08:00:00'}, headers=auth_headers)
+    assert summary(app, user)['calories'] == 600
+    assert summary(app, user, date(2024, 3, 6))['calories'] == 100
+
+    client.delete(f"/api/food/logs/{first['id']}", headers=auth_headers)
+    assert summary(app, user, date(2024, 3, 6)) is None
+
+    with app.app_context():
+        assert check_rollups(user) == []
+
+def test_numeric_strings_are_accepted(app, client, auth_headers, user):
+    response = client.post('/api/food/log', json=dict(LOG, calories='200', proteins='4.5', servings_consumed='2'), headers=auth_headers)
+    assert response.status_code == 201
+    assert summary(app, user)['calories'] == 400
+
+    response = client.put(f"/api/food/logs/{response.json['food_log']['id']}", json={'servings_consumed': '3'}, headers=auth_headers)
+    assert response.status_code == 200
+    assert summary(app, user)['calories'] == 600
+    assert summary(app, user)['proteins'] == 13.5
+
+    with app.app_context():
+        assert check_rollups(user) == []
+
+def test_rebuild_repairs_drift(app, client, auth_headers, user):
+    client.post('/api/food/log', json=LOG, headers=auth_headers)
+    with app.app_context():
+        DailyNutritionSummary.query.update({'calories': 1})
+        db.session.commit()
+        assert list(check_rollups(user)[0]['differences']) == ['calories']
+
+        assert rebuild_rollups(user) == 1
+        assert check_rollups(user) == []
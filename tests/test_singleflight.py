@@ -0,0 +1,67 @@
+import threading
+import pytest
+from services.singleflight import SingleFlight
+
+def run_concurrently(flight, key, fn, callers):
+    results = [None] * callers
+    errors = [None] * callers
+
+    def call(index):
+        try:
+            results[index] = flight.do(key, fn)
+        except Exception as e:
+            errors[index] = e
+
+    threads = [threading.Thread(target=call, args=(index,)) for index in range(callers)]
+    for thread in threads:
+        thread.start()
+    return threads, results, errors
+
+def test_concurrent_callers_share_one_execution():
+    flight = SingleFlight()
+    release = threading.Event()
+    executions = []
+
+    def lookup():
+        executions.append(1)
+        release.wait(5)
+        return {'food_name': 'Apple'}
+
+    threads, results, errors = run_concurrently(flight, 'apple', lookup, 5)
+    while flight.executed + flight.coalesced < 5:
+        threading.Event().wait(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert executions == [1]
+    assert all(result == {'food_name': 'Apple'} for result, _ in results)
+    assert sorted(coalesced for _, coalesced in results) == [False, True, True, True, True]
+    # Waiters get copies, so one caller mutating its result affects no one else
+    assert len({id(result) for result, _ in results}) == 5
+    assert flight.stats()['in_flight'] == 0
+
+def test_leader_error_reaches_every_waiter():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def lookup():
+        release.wait(5)
+        raise RuntimeError('upstream down')
+
+    threads, results, errors = run_concurrently(flight, 'apple', lookup, 3)
+    while flight.executed + flight.coalesced < 3:
+        threading.Event().wait(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert [str(error) for error in errors] == ['upstream down'] * 3
+
+def test_sequential_calls_run_again():
+    flight = SingleFlight()
+    assert flight.do('apple', lambda: 1) == (1, False)
+    assert flight.do('apple', lambda: 2) == (2, False)
+    with pytest.raises(ValueError):
+        flight.do('apple', lambda: int('x'))
+    assert flight.stats()['executed'] == 3
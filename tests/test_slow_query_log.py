@@ -0,0 +1,124 @@
+import json
+import os
+from datetime import datetime
+import pytest
+from app import db
+from models.user import User
+from services import slow_query_log as slow_query_log_module
+from services.slow_query_log import REDACTED, is_full_scan, normalize_statement, serialize_params, slow_query_log
+
+@pytest.fixture
+def slow_log(app, tmp_path):
+    """Log every statement (threshold 0) to a file under tmp_path"""
+    app.config.update(
+        SLOW_QUERY_LOG_ENABLED=True,
+        SLOW_QUERY_THRESHOLD_MS=0,
+        SLOW_QUERY_LOG_PARAMETERS=True,
+        SLOW_QUERY_LOG_PATH=str(tmp_path / 'slow.jsonl')
+    )
+    slow_query_log.init_app(app)
+    return slow_query_log
+
+def food_log_entries(log):
+    return [entry for entry in log.read_entries() if entry['statement'].lstrip().startswith('SELECT') and 'FROM food_log' in entry['statement']]
+
+def test_slow_statements_are_logged_with_route_and_plan(client, auth_headers, log_food, slow_log):
+    log_food()
+    client.get('/api/food/logs?date=2024-03-05', headers=auth_headers)
+
+    entries = [entry for entry in food_log_entries(slow_log) if entry['route'] == 'food.get_food_logs']
+    assert entries
+    entry = entries[0]
+    assert (entry['method'], entry['path']) == ('GET', '/api/food/logs')
+    assert entry['duration_ms'] >= 0
+    assert '2024-03-05 00:00:00.000000' in entry['parameters']
+    assert any('ix_food_log_user_consumed_at' in line for line in entry['plan'])
+
+def test_writes_are_logged_without_plans(client, auth_headers, slow_log, log_food):
+    log_food()
+    inserts = [entry for entry in slow_log.read_entries() if entry['statement'].startswith('INSERT INTO food_log')]
+    assert inserts and inserts[0]['plan'] is None
+
+def test_user_credentials_are_redacted(app, client, auth_headers, user, slow_log):
+    response = client.put('/api/auth/change-password', headers=auth_headers,
+                          json={'current_password': 'Passw0rdX', 'new_password': 'N3wPassw0rd'})
+    assert response.status_code == 200
+    with app.app_context():
+        second = User(email='second@example.com', name='Second')
+        second.set_password('Passw0rdX')
+        db.session.add(second)
+        db.session.commit()
+
+    writes = [entry for entry in slow_log.read_entries() if entry['statement'].startswith(('INSERT INTO user', 'UPDATE user'))]
+    assert {entry['statement'].split()[0] for entry in writes} == {'INSERT', 'UPDATE'}
+    for entry in writes:
+        assert REDACTED in entry['parameters']
+    logged = open(slow_log.path, encoding='utf-8').read()
+    assert 'second@example.com' not in logged
+    assert '$2b$' not in logged
+
+def test_parameters_are_not_logged_by_default(app, client, auth_headers, log_food, slow_log):
+    app.config['SLOW_QUERY_LOG_PARAMETERS'] = False
+    slow_query_log.init_app(app)
+    slow_log.clear()
+    log_food()
+    entries = slow_log.read_entries()
+    assert entries and all(entry['parameters'] is None for entry in entries)
+
+def test_failed_explain_rolls_back_to_a_savepoint(client, auth_headers, log_food, slow_log, monkeypatch):
+    # Exercise the PostgreSQL path on SQLite with an EXPLAIN that cannot parse
+    monkeypatch.setitem(slow_query_log_module.EXPLAIN_PREFIXES, 'sqlite', 'EXPLAIN NONSENSE ')
+    monkeypatch.setattr(slow_query_log_module, 'SAVEPOINT_DIALECTS', {'sqlite'})
+    log_food()
+
+    response = client.get('/api/food/logs?date=2024-03-05', headers=auth_headers)
+    assert response.status_code == 200
+    assert len(response.get_json()['food_logs']) == 1
+    entries = [entry for entry in food_log_entries(slow_log) if entry['route'] == 'food.get_food_logs']
+    assert entries and entries[0]['plan'][0].startswith('EXPLAIN failed')
+    # The request's own transaction is still usable afterwards
+    assert client.post('/api/food/log', headers=auth_headers, json={
+        'food_name': 'Apple', 'calories': 52, 'serving_size': 100, 'consumed_at': '2024-03-05T09:00:00'
+    }).status_code == 201
+
+def test_report_groups_statements_and_flags_full_scans(app, slow_log):
+    slow_log.clear()
+    with open(slow_log.path, 'w', encoding='utf-8') as log_file:
+        for duration, value, route in [(50, 2, 'food.get_food_logs'), (300, 3, 'food.get_food_logs'), (20, 4, None)]:
+            log_file.write(json.dumps({
+                'at': datetime(2024, 3, 5, 8).isoformat(),
+                'duration_ms': duration,
+                'statement': f'SELECT * FROM food_log WHERE id IN ({", ".join("?" * value)})',
+                'parameters': [value],
+                'route': route,
+                'plan': ['SCAN food_log']
+            }) + '\n')
+        log_file.write('{"truncated')
+
+    groups = slow_log.report()
+    assert len(groups) == 1
+    group = groups[0]
+    assert group['statement'] == 'SELECT * FROM food_log WHERE id IN (?, ...)'
+    assert (group['count'], group['total_ms'], group['max_ms']) == (3, 370, 300)
+    assert group['routes'] == {'food.get_food_logs': 2, '(no route)': 1}
+    assert group['slowest']['parameters'] == [3]
+    assert group['full_scans'] == ['SCAN food_log']
+
+    assert slow_log.report(route='food.get_food_logs')[0]['count'] == 2
+    assert slow_log.report(since=datetime(2024, 3, 6)) == []
+
+    result = app.test_cli_runner().invoke(args=['slow-queries', '--clear'])
+    assert '<- full table scan' in result.output
+    assert not os.path.exists(slow_log.path)
+
+def test_helpers():
+    assert normalize_statement('SELECT *\n  FROM t WHERE id IN (?, ?, ?)') == 'SELECT * FROM t WHERE id IN (?, ...)'
+    assert serialize_params([datetime(2024, 3, 5), b'abc', 'x' * 300], names=['a', 'b', 'c'])[:2] == ['2024-03-05T00:00:00', '<3 bytes>']
+    assert serialize_params([(1,), (2,)], executemany=True, names=['id']) == {'sets': 2, 'first': [1]}
+    assert serialize_params(['a@b.c', 'hash', 3], names=['email', 'password_hash', 'id_1']) == [REDACTED, REDACTED, 3]
+    assert serialize_params({'email_1': 'a@b.c', 'id': 3}) == {'email_1': REDACTED, 'id': 3}
+    # Unnamed positional values can't be checked, so none of them are written
+    assert serialize_params([1, 2]) == [REDACTED, REDACTED]
+    assert is_full_scan('SCAN food_log')
+    assert not is_full_scan('SCAN food_log USING INDEX ix_food_log_user_consumed_at')
+    assert not is_full_scan('SEARCH food_log USING INDEX ix_food_log_user_consumed_at (user_id=?)')
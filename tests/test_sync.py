@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta
+from app import db
+from models.sync_tombstone import SyncTombstone
+from services.sync_service import decode_sync_token, encode_sync_token, prune_tombstones
+
+def sync(client, auth_headers, token=None):
+    response = client.get('/api/sync' + (f'?since={token}' if token else ''), headers=auth_headers)
+    assert response.status_code == 200
+    return response.json
+
+def test_full_then_delta_sync(app, client, auth_headers, log_food):
+    app.config['SYNC_OVERLAP_SECONDS'] = 0
+    kept = log_food('Toast')
+    removed = log_food('Jam')
+    client.post('/api/food/custom', json={'name': 'Granola', 'calories_per_100g': 450}, headers=auth_headers)
+
+    first = sync(client, auth_headers)
+    assert first['full'] is True
+    assert [log['food_name'] for log in first['food_logs']] == ['Toast', 'Jam']
+    assert [food['name'] for food in first['custom_foods']] == ['Granola']
+
+    client.put(f"/api/food/logs/{kept['id']}", json={'servings_consumed': 2}, headers=auth_headers)
+    added = log_food('Eggs')
+    client.delete(f"/api/food/logs/{removed['id']}", headers=auth_headers)
+
+    delta = sync(client, auth_headers, first['next_token'])
+    assert delta['full'] is False
+    assert [(log['id'], log['servings_consumed']) for log in delta['food_logs']] == [(kept['id'], 2), (added['id'], 1)]
+    assert delta['custom_foods'] == []
+    assert delta['deleted'] == {'food_logs': [removed['id']], 'custom_foods': []}
+
+    assert sync(client, auth_headers, delta['next_token'])['food_logs'] == []
+
+def test_overlap_window_resends_recent_rows(app, client, auth_headers, log_food):
+    log_food()
+    token = encode_sync_token(datetime.utcnow())
+    assert sync(client, auth_headers, token)['food_logs'] != []
+
+    app.config['SYNC_OVERLAP_SECONDS'] = 0
+    assert sync(client, auth_headers, token)['food_logs'] == []
+
+def test_expired_token_forces_full_sync(app, client, auth_headers, log_food):
+    log_food()
+    token = encode_sync_token(datetime.utcnow() - timedelta(days=app.config['SYNC_TOMBSTONE_RETENTION_DAYS'] + 1))
+
+    response = sync(client, auth_headers, token)
+    assert response['full'] is True
+    assert len(response['food_logs']) == 1
+
+def test_invalid_token(client, auth_headers):
+    response = client.get('/api/sync?since=garbage', headers=auth_headers)
+    assert response.status_code == 400
+    assert response.json['error'] == 'Invalid sync token'
+
+def test_token_round_trip_and_pruning(app, user):
+    now = datetime(2024, 3, 5, 8, 30)
+    assert decode_sync_token(encode_sync_token(now)) == now
+
+    with app.app_context():
+        db.session.add(SyncTombstone(user_id=user, entity='food_log', entity_id=1, deleted_at=datetime.utcnow() - timedelta(days=100)))
+        db.session.add(SyncTombstone(user_id=user, entity='food_log', entity_id=2))
+        db.session.commit()
+
+        assert prune_tombstones(90) == 1
+        assert [tombstone.entity_id for tombstone in SyncTombstone.query.all()] == [2]
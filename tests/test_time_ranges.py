@@ -0,0 +1,62 @@
+from contextlib import contextmanager
+from datetime import date, datetime
+import pytest
+from sqlalchemy import event
+from app import db
+from services.aggregation_service import meal_foods, top_foods
+from utils.helpers import day_range, month_range
+
+INDEX = 'ix_food_log_user_consumed_at'
+
+@contextmanager
+def captured_food_log_queries():
+    """Collect (statement, parameters) for every SELECT on food_log"""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT') and 'FROM food_log' in statement:
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', capture)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', capture)
+
+def query_plan(statement, parameters):
+    rows = db.session.connection().exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).all()
+    return ' | '.join(row[-1] for row in rows)
+
+def test_day_and_month_ranges_are_half_open():
+    assert day_range(date(2024, 2, 28), 2) == (datetime(2024, 2, 28), datetime(2024, 3, 1))
+    assert month_range(2024, 12) == (datetime(2024, 12, 1), datetime(2025, 1, 1))
+
+def test_day_listing_uses_the_user_time_index(app, client, auth_headers):
+    response = client.post('/api/food/log', json={
+        'food_name': 'Toast', 'serving_size': 30, 'calories': 100, 'consumed_at': '2024-03-05T23:59:59'
+    }, headers=auth_headers)
+    assert response.status_code == 201
+
+    with app.app_context():
+        with captured_food_log_queries() as statements:
+            response = client.get('/api/food/logs?date=2024-03-05', headers=auth_headers)
+        assert [log['food_name'] for log in response.json['food_logs']] == ['Toast']
+        assert statements
+
+        for statement, parameters in statements:
+            plan = query_plan(statement, parameters)
+            assert f'USING INDEX {INDEX} (user_id=? AND consumed_at>? AND consumed_at<?)' in plan, plan
+
+@pytest.mark.parametrize('run_query', [
+    lambda user_id: top_foods(user_id, month_range(2024, 3)),
+    lambda user_id: meal_foods(user_id, date(2024, 3, 5))
+])
+def test_range_queries_use_the_user_time_index(app, user, run_query):
+    with app.app_context():
+        with captured_food_log_queries() as statements:
+            run_query(user)
+        assert len(statements) == 1
+
+        plan = query_plan(*statements[0])
+        assert f'USING INDEX {INDEX} (user_id=? AND consumed_at>? AND consumed_at<?)' in plan, plan
+        assert 'SCAN food_log' not in plan
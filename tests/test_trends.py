@@ -0,0 +1,68 @@
+from datetime import date, timedelta
+import numpy as np
+import pytest
+from services.trend_service import ewma, goal_adherence, linear_slope, rolling_average, to_json_list
+
+def naive_rolling(values, mask, window):
+    result = []
+    for index in range(len(values)):
+        logged = [values[k] for k in range(max(0, index - window + 1), index + 1) if mask[k]]
+        result.append(sum(logged) / len(logged) if logged else np.nan)
+    return np.array(result)
+
+def naive_ewma(values, mask, span=7):
+    alpha = 2.0 / (span + 1)
+    result, current = [], None
+    for value, logged in zip(values, mask):
+        if logged:
+            current = value if current is None else alpha * value + (1 - alpha) * current
+        result.append(np.nan if current is None else current)
+    return np.array(result)
+
+@pytest.fixture
+def series():
+    generator = np.random.default_rng(7)
+    values = generator.uniform(1200, 3000, 3000)
+    mask = generator.random(3000) > 0.3
+    mask[:5] = False
+    return np.where(mask, values, 0.0), mask
+
+def test_rolling_average_matches_a_plain_loop(series):
+    values, mask = series
+    for window in (7, 30):
+        np.testing.assert_allclose(rolling_average(values, mask, window), naive_rolling(values, mask, window), equal_nan=True)
+
+def test_ewma_matches_the_recursive_definition_across_blocks(series):
+    values, mask = series
+    np.testing.assert_allclose(ewma(values, mask), naive_ewma(values, mask), rtol=1e-9, equal_nan=True)
+    assert np.isnan(ewma(values, np.zeros(len(values), dtype=bool))).all()
+
+def test_slope_and_adherence():
+    mask = np.array([True, True, False, True])
+    calories = np.array([1800.0, 2000.0, 0.0, 2400.0])
+
+    assert linear_slope(calories, mask) == pytest.approx(200)
+    assert linear_slope(calories, np.array([True, False, False, False])) == 0.0
+
+    ratios, summary = goal_adherence(calories, mask, 2000)
+    assert to_json_list(ratios) == [0.9, 1.0, None, 1.2]
+    assert (summary['days_within_goal'], summary['days_over_goal'], summary['days_under_goal']) == (2, 1, 0)
+    assert goal_adherence(calories, mask, 0)[1] is None
+
+def test_progress_route_series(client, auth_headers, log_food):
+    today = date.today()
+    for offset, calories in ((0, 2000), (1, 1800), (3, 2200)):
+        log_food('Meal', calories, (today - timedelta(days=offset)).isoformat() + 'T12:00:00', proteins=50)
+
+    response = client.get('/api/analytics/progress?period=7&series=daily,ewma,rolling_7,macros', headers=auth_headers)
+    assert response.status_code == 200
+    series = response.json['series']
+    assert len(series['dates']) == len(series['ewma']) == len(series['rolling_7']) == 7
+    assert series['dates'][-1] == today.isoformat()
+    assert series['rolling_7'][-1] == 2000
+    assert series['macros']['period']['proteins'] == 10.0
+    assert [day['calories'] for day in response.json['daily_progress']][-4:] == [2200, 0, 1800, 2000]
+
+    response = client.get('/api/analytics/progress?series=median', headers=auth_headers)
+    assert response.status_code == 400
+    assert response.json['available_series']
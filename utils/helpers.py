@@ -1,62 +1,152 @@
 import os
 import uuid
-from PIL import Image
+import math
+import hashlib
+from PIL import Image, ImageOps
 from werkzeug.utils import secure_filename
-from datetime import datetime
+from datetime import datetime, date, time, timedelta
 import base64
+import json
+from sqlalchemy import DateTime, and_, or_
 from io import BytesIO
 
 # Allowed image extensions
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
 MAX_IMAGE_SIZE = (1024, 1024)  # Max dimensions for processed images
 
+# Vision model payload settings
+VISION_LOW_DETAIL_MAX_SIDE = 512  # Low detail images are downsampled to 512px by the model
+VISION_TARGET_BYTES = 250 * 1024  # Lower JPEG quality until the payload fits
+VISION_BASE_TOKENS = 85
+VISION_TILE_TOKENS = 170
+
 def allowed_file(filename):
     """Check if file extension is allowed"""
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def save_uploaded_image(image_file, user_id):
+def _convert_to_rgb(image):
+    """Flatten transparent and palette images onto a white background"""
+    if image.mode in ('RGBA', 'LA', 'P'):
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        if image.mode == 'P':
+            image = image.convert('RGBA')
+        background.paste(image, mask=image.split()[-1] if 'A' in image.mode else None)
+        return background
+    if image.mode != 'RGB':
+        return image.convert('RGB')
+    return image
+
+def _encode_jpeg(image, quality):
+    buffer = BytesIO()
+    image.save(buffer, 'JPEG', optimize=True, quality=quality)
+    return buffer.getvalue()
+
+def estimate_vision_tokens(width, height, detail='high'):
     """
-    Save uploaded image file and return the file path
+    Estimate the prompt tokens a vision model charges for an image.
+    Low detail is a flat cost; high detail fits the image in 2048x2048,
+    scales the shortest side down to 768 and charges per 512px tile.
     """
-    if not image_file or not allowed_file(image_file.filename):
-        raise ValueError("Invalid image file")
+    if detail == 'low':
+        return VISION_BASE_TOKENS
     
-    # Create unique filename
-    filename = secure_filename(image_file.filename)
-    name, ext = os.path.splitext(filename)
-    unique_filename = f"{user_id}_{uuid.uuid4().hex[:8]}{ext}"
+    scale = min(1.0, 2048 / max(width, height))
+    width, height = width * scale, height * scale
+    scale = min(1.0, 768 / min(width, height))
+    width, height = width * scale, height * scale
     
-    # Create uploads directory if it doesn't exist
-    upload_dir = os.path.join(os.getcwd(), 'uploads', 'images')
-    os.makedirs(upload_dir, exist_ok=True)
-    
-    # Full path to save the file
-    file_path = os.path.join(upload_dir, unique_filename)
+    tiles = math.ceil(width / 512) * math.ceil(height / 512)
+    return VISION_BASE_TOKENS + VISION_TILE_TOKENS * tiles
+
+def process_food_image(image_data, detail='auto', target_bytes=VISION_TARGET_BYTES,
+                       max_quality=85, min_quality=50):
+    """
+    Decode an uploaded image once and derive both the stored copy and the
+    payload sent to the vision model.
     
+    detail is 'low', 'high' or 'auto'. In auto mode small images use low
+    detail, larger ones are downscaled to the resolution the model actually
+    uses. JPEG quality steps down until the payload fits target_bytes.
+    """
     try:
-        # Open and process image
-        image = Image.open(image_file)
-        
-        # Convert to RGB if necessary (handles RGBA, P modes)
-        if image.mode in ('RGBA', 'LA', 'P'):
-            background = Image.new('RGB', image.size, (255, 255, 255))
-            if image.mode == 'P':
-                image = image.convert('RGBA')
-            background.paste(image, mask=image.split()[-1] if 'A' in image.mode else None)
-            image = background
+        image = Image.open(BytesIO(image_data))
+        image = ImageOps.exif_transpose(image)
+        original_size = image.size
+        image = _convert_to_rgb(image)
         
-        # Resize if too large
+        # Stored copy
         image.thumbnail(MAX_IMAGE_SIZE, Image.Resampling.LANCZOS)
-        
-        # Save optimized image
-        image.save(file_path, optimize=True, quality=85)
-        
-        # Return relative path
-        return f"uploads/images/{unique_filename}"
-        
+        storage_bytes = _encode_jpeg(image, 85)
     except Exception as e:
         raise ValueError(f"Failed to process image: {str(e)}")
+    
+    if detail == 'auto':
+        detail = 'low' if max(image.size) <= VISION_LOW_DETAIL_MAX_SIDE else 'high'
+    
+    # Model copy: nothing beyond the low-detail box or a 768px shortest side is used
+    model_image = image
+    if detail == 'low':
+        box = (VISION_LOW_DETAIL_MAX_SIDE, VISION_LOW_DETAIL_MAX_SIDE)
+        if max(image.size) > VISION_LOW_DETAIL_MAX_SIDE:
+            model_image = image.copy()
+            model_image.thumbnail(box, Image.Resampling.LANCZOS)
+    elif min(image.size) > 768:
+        scale = 768 / min(image.size)
+        model_image = image.resize(
+            (round(image.width * scale), round(image.height * scale)),
+            Image.Resampling.LANCZOS
+        )
+    
+    quality = max_quality
+    model_bytes = storage_bytes if model_image is image and quality == 85 else _encode_jpeg(model_image, quality)
+    while len(model_bytes) > target_bytes and quality > min_quality:
+        quality = max(min_quality, quality - 10)
+        model_bytes = _encode_jpeg(model_image, quality)
+    
+    tokens_original = estimate_vision_tokens(*original_size, detail='high')
+    tokens_sent = estimate_vision_tokens(*model_image.size, detail=detail)
+    
+    return {
+        'image': image,
+        'original_bytes': image_data,
+        'storage_bytes': storage_bytes,
+        'model_base64': base64.b64encode(model_bytes).decode('utf-8'),
+        'detail': detail,
+        'stats': {
+            'original_size': list(original_size),
+            'model_size': list(model_image.size),
+            'detail': detail,
+            'jpeg_quality': quality,
+            'original_bytes': len(image_data),
+            'model_bytes': len(model_bytes),
+            'bytes_saved': max(0, len(image_data) - len(model_bytes)),
+            'estimated_tokens': tokens_sent,
+            'tokens_saved': max(0, tokens_original - tokens_sent)
+        }
+    }
+
+def save_processed_image(processed_image, user_id):
+    """Write the stored copy of a processed image and return its relative path"""
+    unique_filename = f"{user_id}_{uuid.uuid4().hex[:8]}.jpg"
+    
+    # Create uploads directory if it doesn't exist
+    upload_dir = os.path.join(os.getcwd(), 'uploads', 'images')
+    os.makedirs(upload_dir, exist_ok=True)
+    
+    with open(os.path.join(upload_dir, unique_filename), 'wb') as image_file:
+        image_file.write(processed_image['storage_bytes'])
+    
+    return f"uploads/images/{unique_filename}"
+
+def save_uploaded_image(image_file, user_id):
+    """
+    Save uploaded image file and return the file path
+    """
+    if not image_file or not allowed_file(image_file.filename):
+        raise ValueError("Invalid image file")
+    
+    return save_processed_image(process_food_image(image_file.read()), user_id)
 
 def image_to_base64(image_path):
     """Convert image file to base64 string"""
@@ -66,44 +156,49 @@ def image_to_base64(image_path):
     except Exception as e:
         raise ValueError(f"Failed to convert image to base64: {str(e)}")
 
-def base64_to_image(base64_string, user_id):
-    """Convert base64 string to image file and save it"""
+def decode_base64_image(base64_string):
+    """Decode a base64 image, stripping any data URL prefix"""
     try:
-        # Remove data URL prefix if present
         if base64_string.startswith('data:image'):
             base64_string = base64_string.split(',')[1]
-        
-        # Decode base64
-        image_data = base64.b64decode(base64_string)
-        
-        # Open image from bytes
-        image = Image.open(BytesIO(image_data))
-        
-        # Create unique filename
-        unique_filename = f"{user_id}_{uuid.uuid4().hex[:8]}.jpg"
-        
-        # Create uploads directory if it doesn't exist
-        upload_dir = os.path.join(os.getcwd(), 'uploads', 'images')
-        os.makedirs(upload_dir, exist_ok=True)
-        
-        file_path = os.path.join(upload_dir, unique_filename)
-        
-        # Convert to RGB and resize
-        if image.mode in ('RGBA', 'LA', 'P'):
-            background = Image.new('RGB', image.size, (255, 255, 255))
-            if image.mode == 'P':
-                image = image.convert('RGBA')
-            background.paste(image, mask=image.split()[-1] if 'A' in image.mode else None)
-            image = background
-        
-        image.thumbnail(MAX_IMAGE_SIZE, Image.Resampling.LANCZOS)
-        image.save(file_path, 'JPEG', optimize=True, quality=85)
-        
-        return f"uploads/images/{unique_filename}"
-        
+        return base64.b64decode(base64_string)
+    except Exception as e:
+        raise ValueError(f"Failed to decode base64 image: {str(e)}")
+
+def base64_to_image(base64_string, user_id):
+    """Convert base64 string to image file and save it"""
+    try:
+        return save_processed_image(process_food_image(decode_base64_image(base64_string)), user_id)
     except Exception as e:
         raise ValueError(f"Failed to process base64 image: {str(e)}")
 
+def compute_image_hashes(image_bytes, image=None, hash_size=8):
+    """
+    Fingerprint an image for deduplication.
+    Returns (content_hash, dhash): the sha256 of the raw bytes and a 64-bit
+    perceptual difference hash as a hex string. Pass an already decoded
+    image to skip decoding the bytes again.
+    """
+    content_hash = hashlib.sha256(image_bytes).hexdigest()
+    
+    try:
+        if image is None:
+            image = Image.open(BytesIO(image_bytes))
+        image = image.convert('L').resize((hash_size + 1, hash_size), Image.Resampling.LANCZOS)
+        pixels = list(image.getdata())
+    except Exception as e:
+        raise ValueError(f"Failed to hash image: {str(e)}")
+    
+    # Each bit records whether brightness increases from left to right
+    value = 0
+    for row in range(hash_size):
+        for col in range(hash_size):
+            left = pixels[row * (hash_size + 1) + col]
+            right = pixels[row * (hash_size + 1) + col + 1]
+            value = (value << 1) | (1 if right > left else 0)
+    
+    return content_hash, f"{value:0{hash_size * hash_size // 4}x}"
+
 def calculate_macro_percentages(proteins, carbs, fats, total_calories):
     """Calculate macronutrient percentages"""
     if total_calories <= 0:
@@ -182,6 +277,106 @@ def paginate_query(query, page, per_page=20, max_per_page=100):
         'prev_page': page - 1 if has_prev else None
     }
 
+def _cursor_signature(order_by):
+    return ','.join(f"{column.key}:{'desc' if descending else 'asc'}" for column, descending in order_by)
+
+def encode_cursor(values, order_by, backward=False):
+    """Opaque cursor for a row's sort key values"""
+    payload = {
+        's': _cursor_signature(order_by),
+        'd': 'p' if backward else 'n',
+        'v': [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    }
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor, order_by):
+    """
+    Return (values, backward) from a cursor made by encode_cursor.
+    Raises ValueError for malformed cursors or cursors from another sort order.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        values = payload['v']
+        backward = payload['d'] == 'p'
+        if not isinstance(values, list) or not all(
+            value is None or isinstance(value, (str, int, float)) for value in values
+        ):
+            raise ValueError("Invalid cursor")
+
+        matches = payload.get('s') == _cursor_signature(order_by) and len(values) == len(order_by)
+        decoded = []
+        if matches:
+            for (column, descending), value in zip(order_by, values):
+                if value is not None and isinstance(column.type, DateTime):
+                    value = datetime.fromisoformat(value)
+                decoded.append(value)
+    except (ValueError, TypeError, KeyError, AttributeError):
+        raise ValueError("Invalid cursor")
+
+    if not matches:
+        raise ValueError("Cursor does not match the requested sort order")
+    return decoded, backward
+
+def _keyset_condition(order_by, values, forward):
+    """Rows strictly after values when walking order_by forward (or before, backward)"""
+    (column, descending), value = order_by[0], values[0]
+    if descending == forward:
+        strict, inclusive = column < value, column <= value
+    else:
+        strict, inclusive = column > value, column >= value
+
+    if len(order_by) == 1:
+        return strict
+    # The inclusive bound on the leading column keeps the predicate index friendly
+    return and_(inclusive, or_(strict, _keyset_condition(order_by[1:], values[1:], forward)))
+
+def keyset_paginate(query, order_by, cursor=None, limit=20, max_limit=100, with_count=False):
+    """
+    Cursor (keyset) pagination for a SQLAlchemy query.
+    order_by is a list of (column, descending) pairs ending in a unique
+    column. Unlike paginate_query each page costs the same however deep it
+    is, and the COUNT(*) query only runs when with_count is True.
+    Raises ValueError for an invalid cursor.
+    """
+    try:
+        limit = min(max_limit, max(1, int(limit)))
+    except (ValueError, TypeError):
+        limit = 20
+
+    total = query.order_by(None).count() if with_count else None
+
+    backward = False
+    if cursor:
+        values, backward = decode_cursor(cursor, order_by)
+        query = query.filter(_keyset_condition(order_by, values, not backward))
+
+    query = query.order_by(*[
+        column.desc() if descending != backward else column.asc()
+        for column, descending in order_by
+    ])
+    items = query.limit(limit + 1).all()
+
+    has_more = len(items) > limit
+    items = items[:limit]
+    if backward:
+        items.reverse()
+
+    def key(item):
+        return [getattr(item, column.key) for column, _ in order_by]
+
+    has_next = has_more if not backward else True
+    has_prev = has_more if backward else bool(cursor)
+
+    return {
+        'items': items,
+        'limit': limit,
+        'total': total,
+        'has_next': has_next and bool(items),
+        'has_prev': has_prev and bool(items),
+        'next_cursor': encode_cursor(key(items[-1]), order_by) if has_next and items else None,
+        'prev_cursor': encode_cursor(key(items[0]), order_by, backward=True) if has_prev and items else None
+    }
+
 def safe_float(value, default=0.0):
     """Safely convert value to float with default"""
     try:
@@ -231,6 +426,26 @@ def validate_date_string(date_str):
     except ValueError:
         raise ValueError("Invalid date format. Use YYYY-MM-DD")
 
+def day_range(start_date, days=1):
+    """
+    Half-open [start, end) timestamp range covering whole days from start_date.
+    Comparing the raw column against these bounds lets the database use the
+    (user_id, consumed_at) index, unlike func.date(column) == day.
+    """
+    start = datetime.combine(start_date, time.min)
+    return start, start + timedelta(days=days)
+
+def month_range(year, month):
+    """Timestamp range for a calendar month"""
+    start_date = date(year, month, 1)
+    next_month = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return day_range(start_date, (next_month - start_date).days)
+
+def filter_time_range(query, column, time_range):
+    """Restrict a query to rows whose column falls inside a half-open range"""
+    start, end = time_range
+    return query.filter(column >= start, column < end)
+
 def calculate_age_from_birthdate(birthdate):
     """Calculate age from birthdate"""
     today = datetime.now().date()
@@ -0,0 +1,60 @@
+from sqlalchemy import inspect, text
+
+def upsert_statement(db, model):
+    """INSERT statement for model supporting on_conflict_do_update on this database"""
+    if db.engine.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(model)
+
+def ensure_columns(db, backfill=None):
+    """
+    Add columns declared on the models that are missing from existing tables
+    (db.create_all() never alters a table). Columns are added as nullable;
+    backfill maps "table.column" to a SQL expression used to fill existing
+    rows, e.g. {'food_log.updated_at': 'created_at'}.
+    """
+    backfill = backfill or {}
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    added = []
+
+    with db.engine.begin() as connection:
+        for table in db.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                column_type = column.type.compile(dialect=db.engine.dialect)
+                connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+
+                name = f'{table.name}.{column.name}'
+                if name in backfill:
+                    connection.execute(text(f'UPDATE {table.name} SET {column.name} = {backfill[name]}'))
+                added.append(name)
+
+    return added
+
+def ensure_indexes(db):
+    """
+    Create indexes declared on the models that are missing from the database.
+    db.create_all() only creates indexes together with new tables, so tables
+    created by an older version of the app never receive them.
+    """
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    created = []
+
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(bind=db.engine)
+                created.append(index.name)
+
+    return created
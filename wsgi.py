@@ -0,0 +1,19 @@
+"""
+WSGI entry point for production servers.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+
+import os
+
+# A serving process resumes unfinished analysis jobs (gunicorn.conf.py turns
+# this off in the master and resumes in each worker instead)
+os.environ.setdefault('JOB_RESUME_ON_START', 'true')
+
+from dotenv import load_dotenv
+from app import create_app
+
+# Load environment variables from .env file
+load_dotenv()
+
+app = create_app()